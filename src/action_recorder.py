@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import json
+from typing import List, Optional, TextIO, Tuple, TYPE_CHECKING
+
+from map_objects import Point
+
+if TYPE_CHECKING:
+    from game import Game
+
+
+RECORDING_VERSION = 1
+
+# the actions that carry a map or screen point instead of a flag or a number
+POINT_KEYS = {"move", "left_click", "right_click"}
+
+
+def encode_action(action: dict) -> dict:
+    return {
+        key: [value.x, value.y] if key in POINT_KEYS else value
+        for key, value in action.items()
+    }
+
+
+def decode_action(json_data: dict) -> dict:
+    return {
+        key: Point(*value) if key in POINT_KEYS else value
+        for key, value in json_data.items()
+    }
+
+
+class ActionRecorder:
+    """
+    Writes the actions play_game resolves from input to a JSON lines file
+
+    The first line holds the whole game as it was when recording started,
+    random streams included, and every line after it one action and mouse
+    action. Input that resolved to nothing is left out. Since the game only
+    changes through these actions, replaying them from the first line gives
+    the same session again.
+    """
+
+    def __init__(self, path: str, game: Game):
+        self.path: str = path
+        self.file: Optional[TextIO] = open(path, "w")
+        self.actions: int = 0
+
+        header = {"version": RECORDING_VERSION, "seed": game.seed, "game": game.to_json()}
+        self.file.write(json.dumps(header, separators=(",", ":")) + "\n")
+
+    def record(self, action: dict, mouse_action: dict):
+        if not (action or mouse_action):
+            return
+
+        line = {"action": encode_action(action), "mouse": encode_action(mouse_action)}
+        self.file.write(json.dumps(line, separators=(",", ":")) + "\n")
+        self.file.flush()
+        self.actions += 1
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+def read_recording(path: str) -> Tuple[dict, List[Tuple[dict, dict]]]:
+    """ Returns the header of a recording and its actions, in the order they were taken """
+    with open(path) as recording_file:
+        header = json.loads(recording_file.readline())
+        if header.get("version") != RECORDING_VERSION:
+            raise ValueError(f"Unsupported recording version {header.get('version')}")
+
+        actions = []
+        for line in recording_file:
+            try:
+                json_data = json.loads(line)
+            except ValueError:
+                # the last line of a session that crashed may be cut short
+                break
+            actions.append((decode_action(json_data["action"]), decode_action(json_data["mouse"])))
+
+    return header, actions
+
@@ -0,0 +1,121 @@
+"""
+Plays many seeded games in parallel and sums up how far they got
+
+    python batch.py --games 1000 --floors 10 --json results.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Iterable, Iterator, List, Optional
+
+from game import Game
+from headless import ExplorerPolicy, RunStats, run
+
+
+def play(seed: int, max_turns: Optional[int], max_floors: Optional[int]) -> RunStats:
+    """ Plays one game headless, in whatever process this is called from """
+    game = Game.new_game(seed=seed)
+    # every worker already plays a game of its own, so floors are not prefetched
+    game.floor_pipeline.background = False
+    game.first_floor()
+
+    try:
+        return run(
+            game=game,
+            policy=ExplorerPolicy(seed=seed),
+            max_turns=max_turns,
+            max_floors=max_floors,
+        )
+    finally:
+        game.floor_pipeline.close()
+
+
+def run_batch(
+    seeds: Iterable[int],
+    max_turns: Optional[int] = None,
+    max_floors: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> Iterator[RunStats]:
+    """ Plays a game for every seed across a pool of processes, yielding each result as soon as it is done """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(play, seed, max_turns, max_floors) for seed in seeds
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+class BatchSummary:
+    def __init__(self):
+        self.games: int = 0
+        self.deaths: int = 0
+        self.turns: int = 0
+        self.seconds: float = 0.0
+        self.dungeon_levels: Counter = Counter()
+        self.kills: Counter = Counter()
+        self.items_used: Counter = Counter()
+
+    def add(self, stats: RunStats):
+        self.games += 1
+        self.deaths += stats.player_died
+        self.turns += stats.turns
+        self.seconds += stats.seconds
+        self.dungeon_levels[stats.dungeon_level] += 1
+        self.kills.update(stats.kills)
+        self.items_used.update(stats.items_used)
+
+    @property
+    def mean_dungeon_level(self) -> float:
+        if not self.games:
+            return 0.0
+        return sum(level * count for level, count in self.dungeon_levels.items()) / self.games
+
+    def to_json(self) -> dict:
+        json_data = {
+            "games": self.games,
+            "deaths": self.deaths,
+            "turns": self.turns,
+            "seconds": self.seconds,
+            "mean_dungeon_level": self.mean_dungeon_level,
+            "dungeon_levels": {
+                str(level): count for level, count in sorted(self.dungeon_levels.items())
+            },
+            "kills": dict(self.kills.most_common()),
+            "items_used": dict(self.items_used.most_common()),
+        }
+
+        return json_data
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game, the rest count up from it")
+    parser.add_argument("--turns", type=int, default=5000, help="turn limit of every game")
+    parser.add_argument("--floors", type=int, default=10, help="floor limit of every game")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--json", default=None, help="file to write the summary to")
+    args = parser.parse_args(argv)
+
+    summary = BatchSummary()
+    seeds = range(args.seed, args.seed + args.games)
+
+    for stats in run_batch(
+        seeds=seeds, max_turns=args.turns, max_floors=args.floors, workers=args.workers
+    ):
+        summary.add(stats)
+        print(f"[{summary.games}/{args.games}] seed {stats.seed}: level {stats.dungeon_level}, {stats}")
+
+    json_data = summary.to_json()
+    print(json.dumps(json_data, indent=4))
+
+    if args.json:
+        with open(args.json, "w") as json_file:
+            json.dump(json_data, json_file, indent=4)
+
+
+if __name__ == "__main__":
+    main()
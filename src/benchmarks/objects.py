@@ -0,0 +1,122 @@
+"""
+Measures the memory and construction time of the slotted game objects
+
+    python -m benchmarks.objects --count 20000
+
+Every class is compared with a subclass of itself that leaves out __slots__
+and so carries a __dict__ per instance again, the way all of them used to.
+"""
+from __future__ import annotations
+
+import argparse
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks.save_formats import best_time
+from colors import Colors
+from components import BasicMonster, Fighter, Item
+from entity import Entity
+from map_objects import Point
+from map_objects.tile import Tile, TileType
+from render_functions import RenderLayer
+
+
+class DictPoint(Point):
+    pass
+
+
+class DictTile(Tile):
+    pass
+
+
+class DictEntity(Entity):
+    pass
+
+
+class DictFighter(Fighter):
+    pass
+
+
+class DictBasicMonster(BasicMonster):
+    pass
+
+
+class DictItem(Item):
+    pass
+
+
+def monster_factory(entity_class: type, fighter_class: type, ai_class: type) -> Callable[[int], object]:
+    def make(i: int) -> Entity:
+        return entity_class(
+            position=Point(i % 500, i // 500),
+            char="o",
+            color=Colors.LIGHT_GREEN,
+            name="Orc",
+            blocks=True,
+            render_order=RenderLayer.ACTOR,
+            fighter=fighter_class(hp=20, defense=0, power=4, xp=35),
+            ai=ai_class(),
+        )
+
+    return make
+
+
+def item_factory(entity_class: type, item_class: type) -> Callable[[int], object]:
+    def make(i: int) -> Entity:
+        return entity_class(
+            position=Point(i % 500, i // 500),
+            char="!",
+            color=Colors.VIOLET,
+            name="Healing Potion",
+            render_order=RenderLayer.ITEM,
+            item=item_class(),
+        )
+
+    return make
+
+
+# name: (slotted factory, factory of the same objects with a __dict__)
+CASES: Dict[str, Tuple[Callable[[int], object], Callable[[int], object]]] = {
+    "Point": (lambda i: Point(i, i), lambda i: DictPoint(i, i)),
+    "Tile": (
+        lambda i: Tile(x=i, y=i, label=TileType.FLOOR, walkable=True, transparent=True),
+        lambda i: DictTile(x=i, y=i, label=TileType.FLOOR, walkable=True, transparent=True),
+    ),
+    "monster": (
+        monster_factory(Entity, Fighter, BasicMonster),
+        monster_factory(DictEntity, DictFighter, DictBasicMonster),
+    ),
+    "item": (item_factory(Entity, Item), item_factory(DictEntity, DictItem)),
+}
+
+
+def bytes_per_object(factory: Callable[[int], object], count: int) -> float:
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    objects: List[object] = [factory(i) for i in range(count)]
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    del objects
+    return (end - start) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=20000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{args.count} objects each")
+    print(f"{'object':<10}{'bytes':>8}{'dict bytes':>12}{'create us':>12}{'dict us':>10}")
+    for name, (slotted, with_dict) in CASES.items():
+        sizes = [bytes_per_object(factory, args.count) for factory in (slotted, with_dict)]
+        times = [
+            best_time(lambda: [factory(i) for i in range(args.count)], args.repeats) / args.count * 1e6
+            for factory in (slotted, with_dict)
+        ]
+        print(f"{name:<10}{sizes[0]:>8.0f}{sizes[1]:>12.0f}{times[0]:>12.2f}{times[1]:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Compares the binary save directory with the JSON export
+
+    python -m benchmarks.save_formats --width 500 --height 500
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Callable
+
+from floor_pipeline import FloorPipeline
+from game import Game
+
+
+def build_game(width: int, height: int, seed: int) -> Game:
+    game = Game.new_game(seed=seed)
+    floor = FloorPipeline(width=width, height=height, min_monsters=5).generate(
+        seed=seed, dungeon_level=1
+    )
+    game.enter_floor(floor, prefetch=False)
+    game.game_map.explore(game.player.position)
+    return game
+
+
+def best_time(function: Callable[[], object], repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def size_on_disk(path: str) -> int:
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--width", type=int, default=500)
+    parser.add_argument("--height", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    game = build_game(width=args.width, height=args.height, seed=args.seed)
+
+    with tempfile.TemporaryDirectory() as directory:
+        binary_path = os.path.join(directory, "save_game")
+        json_path = os.path.join(directory, "save_game.json")
+        missing_path = os.path.join(directory, "missing")
+
+        results = {
+            "binary": (
+                best_time(lambda: game.save_game(path=binary_path), args.repeats),
+                best_time(lambda: Game.load_game(path=binary_path), args.repeats),
+                size_on_disk(binary_path),
+            ),
+            "json": (
+                best_time(lambda: game.export_json(path=json_path), args.repeats),
+                best_time(
+                    lambda: Game.load_game(path=missing_path, json_path=json_path),
+                    args.repeats,
+                ),
+                size_on_disk(json_path),
+            ),
+        }
+
+    print(f"{args.width}x{args.height} map, {len(game.entities)} entities")
+    print(f"{'format':<8}{'save ms':>10}{'load ms':>10}{'size KiB':>12}")
+    for name, (save_time, load_time, size) in results.items():
+        print(f"{name:<8}{save_time * 1000:>10.1f}{load_time * 1000:>10.1f}{size / 1024:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+"""
+Times the hot paths of the game and keeps the results as a JSON baseline
+
+    python -m benchmarks.suite --output baseline.json
+    python -m benchmarks.suite --compare baseline.json
+
+Compared to a baseline, every benchmark more than --threshold times slower
+than before is reported and the exit status is 1.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from bearlibterminal import terminal as blt
+
+from benchmarks.save_formats import build_game
+from colors import Colors
+from components import BasicMonster, Fighter
+from constants import CONSTANTS
+from entity import Entity
+from entity_registry import EntityRegistry
+from fov_functions import recompute_fov
+from game import Game
+from item_functions import cast_fireball
+from map_objects import MapGenerator, Point
+from render_functions import RenderLayer, ScreenBuffer, render_all
+from rng import RandomStreams
+from turn_functions import start_play, take_turn, update_fov
+
+BASELINE_VERSION = 1
+
+Benchmark = Callable[[], Callable[[], object]]
+
+# every benchmark sets up its own state and returns the function to time
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str) -> Callable[[Benchmark], Benchmark]:
+    def register(setup: Benchmark) -> Benchmark:
+        BENCHMARKS[name] = setup
+        return setup
+
+    return register
+
+
+class RecordingTerminal:
+    """
+    Replaces the drawing calls of bearlibterminal with ones that only count themselves
+
+    Used as a context manager, so rendering can be timed without a window.
+    """
+
+    names = ("put", "puts", "printf", "layer", "color", "bkcolor", "font", "clear_area", "refresh")
+
+    def __init__(self):
+        self.calls: Counter = Counter()
+        self.originals: Dict[str, Callable] = {}
+
+    def record(self, name: str) -> Callable:
+        def call(*args, **kwargs):
+            self.calls[name] += 1
+
+        return call
+
+    def __enter__(self) -> RecordingTerminal:
+        for name in self.names:
+            self.originals[name] = getattr(blt, name)
+            setattr(blt, name, self.record(name))
+        return self
+
+    def __exit__(self, *exc_info):
+        for name, original in self.originals.items():
+            setattr(blt, name, original)
+        self.originals = {}
+
+
+def playing_game(width: int = CONSTANTS.map_width, height: int = CONSTANTS.map_height) -> Game:
+    game = build_game(width=width, height=height, seed=1234)
+    start_play(game)
+    update_fov(game)
+    return game
+
+
+def make_map_benchmark(width: int, height: int) -> Benchmark:
+    def setup() -> Callable[[], object]:
+        def make_map():
+            MapGenerator(map_width=width, map_height=height, rng=RandomStreams(1234)).make_map(
+                width=width, height=height, entities=EntityRegistry(), min_monsters=CONSTANTS.min_monsters
+            )
+
+        return make_map
+
+    return setup
+
+
+for map_width, map_height in ((80, 80), (160, 160), (320, 320)):
+    benchmark(f"generation/make_map/{map_width}x{map_height}")(make_map_benchmark(map_width, map_height))
+
+
+@benchmark("fov/recompute_fov")
+def fov_benchmark() -> Callable[[], object]:
+    game = playing_game()
+
+    def compute():
+        recompute_fov(
+            fov_map=game.fov_map,
+            point=game.player.position,
+            radius=CONSTANTS.fov_radius,
+            light_walls=CONSTANTS.fov_light_walls,
+            algorithm=CONSTANTS.fov_algorithm,
+        )
+
+    return compute
+
+
+def add_orcs(game: Game, count: int, rng: random.Random) -> List[Entity]:
+    """ Places count orcs on random floor cells and returns them """
+    cave = np.argwhere(game.game_map.walkable)
+    orcs = []
+    for _ in range(count):
+        x, y = cave[rng.randrange(len(cave))].tolist()
+        orc = Entity(
+            position=Point(x=x, y=y),
+            char="o",
+            color=Colors.LIGHT_GREEN,
+            name="Orc",
+            blocks=True,
+            render_order=RenderLayer.ACTOR,
+            fighter=Fighter(hp=20, defense=0, power=4, xp=35),
+            ai=BasicMonster(),
+        )
+        game.entities.append(orc)
+        orcs.append(orc)
+
+    return orcs
+
+
+def move_astar_benchmark(monsters: int) -> Benchmark:
+    def setup() -> Callable[[], object]:
+        game = playing_game()
+        rng = random.Random(1234)
+
+        hunters = [entity for entity in game.entities if entity.ai][:monsters]
+        hunters += add_orcs(game=game, count=monsters - len(hunters), rng=rng)
+
+        starts = [hunter.position for hunter in hunters]
+
+        def move():
+            for hunter, start in zip(hunters, starts):
+                hunter.position = start
+            game.game_map.navigation.sync(game.entities)
+            for hunter in hunters:
+                hunter.move_astar(target=game.player, entities=game.entities, game_map=game.game_map)
+
+        return move
+
+    return setup
+
+
+for monster_count in (5, 20, 80):
+    benchmark(f"pathfinding/move_astar/{monster_count}")(move_astar_benchmark(monster_count))
+
+
+def fireball_benchmark(monsters: int) -> Benchmark:
+    def setup() -> Callable[[], object]:
+        game = playing_game()
+        add_orcs(game=game, count=monsters, rng=random.Random(1234))
+        for entity in game.entities:
+            if entity.fighter:
+                entity.fighter.hp = 10 ** 9
+
+        return lambda: cast_fireball(
+            entities=game.entities,
+            fov_map=game.fov_map,
+            damage=1,
+            radius=max(game.game_map.width, game.game_map.height),
+            target_position=game.player.position,
+        )
+
+    return setup
+
+
+for monster_count in (100, 2000):
+    benchmark(f"combat/cast_fireball/{monster_count}")(fireball_benchmark(monster_count))
+
+
+def render_benchmark(full_redraw: bool) -> Benchmark:
+    def setup() -> Callable[[], object]:
+        game = playing_game()
+        screen_buffer = ScreenBuffer()
+
+        def render():
+            if full_redraw:
+                screen_buffer.invalidate()
+
+            with RecordingTerminal():
+                render_all(
+                    entities=game.entities,
+                    player=game.player,
+                    game_map=game.game_map,
+                    fov_map=game.fov_map,
+                    camera=game.camera,
+                    message_log=game.message_log,
+                    ui_panel=CONSTANTS.ui_panel,
+                    bar_width=CONSTANTS.bar_width,
+                    mouse_position=Point(0, 0),
+                    game_state=game.game_state,
+                    screen_buffer=screen_buffer,
+                )
+
+        return render
+
+    return setup
+
+
+benchmark("rendering/render_all/full")(render_benchmark(full_redraw=True))
+benchmark("rendering/render_all/unchanged")(render_benchmark(full_redraw=False))
+
+
+def save_benchmark(load: bool) -> Benchmark:
+    def setup() -> Callable[[], object]:
+        game = playing_game()
+        path = f"{tempfile.mkdtemp()}/save_game"
+        game.save_game(path=path)
+
+        if load:
+            return lambda: Game.load_game(path=path)
+        return lambda: game.save_game(path=path)
+
+    return setup
+
+
+benchmark("serialization/save_game")(save_benchmark(load=False))
+benchmark("serialization/load_game")(save_benchmark(load=True))
+
+
+@benchmark("turn/enemy_turn")
+def enemy_turn_benchmark() -> Callable[[], object]:
+    game = playing_game()
+    # a radius of 0 sees the whole cave, so every monster takes part in the turn
+    recompute_fov(fov_map=game.fov_map, point=game.player.position, radius=0)
+    # the monsters keep fighting, but the player never dies
+    game.player.fighter.base_max_hp = game.player.fighter.hp = 10 ** 9
+
+    return lambda: take_turn(game=game, action={"wait": True}, mouse_action={})
+
+
+def time_benchmark(setup: Benchmark, repeats: int) -> dict:
+    function = setup()
+    function()
+
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "min_ms": min(times),
+        "median_ms": statistics.median(times),
+        "repeats": repeats,
+    }
+
+
+def run_suite(repeats: int, name_filter: Optional[str] = None) -> dict:
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if name_filter and name_filter not in name:
+            continue
+        results[name] = time_benchmark(setup, repeats)
+        print(f"{name:<40}{results[name]['min_ms']:>10.3f} ms", file=sys.stderr)
+
+    return {
+        "version": BASELINE_VERSION,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> List[Tuple[str, float]]:
+    """ Returns the benchmarks whose best time grew by more than threshold times, with how much it grew """
+    if baseline.get("version") != BASELINE_VERSION:
+        raise ValueError(f"Unsupported baseline version {baseline.get('version')}")
+
+    regressions = []
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None or before["min_ms"] <= 0:
+            continue
+
+        ratio = result["min_ms"] / before["min_ms"]
+        if ratio > threshold:
+            regressions.append((name, ratio))
+
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--filter", default=None, help="only run benchmarks whose name contains this")
+    parser.add_argument("--output", default=None, help="file to write the results to")
+    parser.add_argument("--compare", default=None, help="baseline file to compare the results with")
+    parser.add_argument("--threshold", type=float, default=1.5)
+    args = parser.parse_args(argv)
+
+    current = run_suite(repeats=args.repeats, name_filter=args.filter)
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(current, output_file, indent=4)
+    else:
+        print(json.dumps(current, indent=4))
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+
+        regressions = compare(baseline=baseline, current=current, threshold=args.threshold)
+        for name, ratio in regressions:
+            print(f"{name} is {ratio:.2f}x slower than the baseline", file=sys.stderr)
+
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,6 +5,7 @@ from typing import List, TYPE_CHECKING
 
 from colors import Colors
 from components.entity_component import EntityComponent
+from constants import CONSTANTS
 from game_messages import Message
 from map_objects.point import Point
 
@@ -15,17 +16,22 @@ if TYPE_CHECKING:
 
 
 class AI(EntityComponent):
+    __slots__ = ()
+
     def take_turn(
         self,
         target: Entity,
         fov_map: tcod.map.Map,
         game_map: GameMap,
         entities: List[Entity],
+        rng: random.Random,
     ):
         raise NotImplementedError
 
 
 class BasicMonster(AI):
+    __slots__ = ()
+
     def __init__(self):
         super(BasicMonster, self).__init__()
 
@@ -35,13 +41,17 @@ class BasicMonster(AI):
         fov_map: tcod.map.Map,
         game_map: GameMap,
         entities: List[Entity],
+        rng: random.Random,
     ):
         results = []
 
         monster = self.owner
         if fov_map.fov[monster.x, monster.y]:
             if monster.position.distance_to(target) >= 2:
-                monster.move_astar(target=target, game_map=game_map, entities=entities)
+                if CONSTANTS.monster_chase_map:
+                    monster.move_downhill(target=target, game_map=game_map, entities=entities)
+                else:
+                    monster.move_astar(target=target, game_map=game_map, entities=entities)
             elif target.fighter.hp > 0:
                 attack_results = monster.fighter.attack(target=target)
                 results.extend(attack_results)
@@ -63,7 +73,10 @@ class BasicMonster(AI):
 
 
 class ConfusedMonster(AI):
+    __slots__ = ("previous_ai", "number_of_turns")
+
     def __init__(self, previous_ai: AI, number_of_turns: int = 10):
+        super(ConfusedMonster, self).__init__()
         self.previous_ai: AI = previous_ai
         self.number_of_turns: int = number_of_turns
 
@@ -73,12 +86,13 @@ class ConfusedMonster(AI):
         fov_map: tcod.map.Map,
         game_map: GameMap,
         entities: List[Entity],
+        rng: random.Random,
     ):
         results = []
 
         if self.number_of_turns > 0:
-            random_x = self.owner.x + random.randint(0, 2) - 1
-            random_y = self.owner.y + random.randint(0, 2) - 1
+            random_x = self.owner.x + rng.randint(0, 2) - 1
+            random_y = self.owner.y + rng.randint(0, 2) - 1
 
             if random_x != self.owner.x and random_y != self.owner.y:
                 self.owner.move_towards(
@@ -88,6 +102,8 @@ class ConfusedMonster(AI):
                 )
 
             self.number_of_turns -= 1
+            if self.owner.registry is not None:
+                self.owner.registry.touch(self.owner)
         else:
             self.owner.ai = self.previous_ai
             results.append(
@@ -7,7 +7,10 @@ if TYPE_CHECKING:
 
 
 class EntityComponent:
-    owner: Optional[Entity] = None
+    __slots__ = ("owner",)
+
+    def __init__(self):
+        self.owner: Optional[Entity] = None
 
     def to_json(self) -> dict:
         raise NotImplementedError
@@ -10,6 +10,8 @@ if TYPE_CHECKING:
 
 
 class Equipment(EntityComponent):
+    __slots__ = ("main_hand", "off_hand")
+
     def __init__(self, main_hand=None, off_hand=None):
         super(Equipment, self).__init__()
 
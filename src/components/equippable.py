@@ -7,6 +7,8 @@ from equipment_slots import EquipmentSlots
 
 
 class Equippable(EntityComponent):
+    __slots__ = ("slot", "power_bonus", "defense_bonus", "max_hp_bonus")
+
     def __init__(
         self,
         slot: EquipmentSlots,
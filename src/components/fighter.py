@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from typing import List, TYPE_CHECKING
+from typing import Dict, List, Optional, TYPE_CHECKING
+
+import numpy as np
 
 from colors import Colors
 from components.entity_component import EntityComponent
@@ -10,21 +12,87 @@ if TYPE_CHECKING:
     from entity import Entity
 
 
+# a fighter with twice this speed acts twice for every action of the player
+NORMAL_SPEED = 100
+
+# the attributes an EntityRegistry keeps in one NumPy column per name for all of its fighters
+FIGHTER_COLUMNS = ("hp", "base_max_hp", "base_defense", "base_power", "xp")
+
+
+class FighterColumn:
+    """
+    A Fighter attribute that lives in its registry's column while the owner is registered
+
+    Outside a registry the value is kept on the fighter itself, so a Fighter
+    works the same whether or not its entity is on a floor.
+    """
+
+    def __set_name__(self, owner: type, name: str):
+        self.name: str = name
+
+    def __get__(self, fighter: Optional[Fighter], owner: type = None):
+        if fighter is None:
+            return self
+        if fighter.columns is None:
+            return fighter.values[self.name]
+        return int(fighter.columns[self.name][fighter.slot])
+
+    def __set__(self, fighter: Fighter, value: int):
+        if fighter.columns is None:
+            fighter.values[self.name] = value
+        else:
+            fighter.columns[self.name][fighter.slot] = value
+            owner = fighter.owner
+            if owner is not None and owner.registry is not None:
+                owner.registry.touch(owner)
+
+
 class Fighter(EntityComponent):
+    hp = FighterColumn()
+    base_max_hp = FighterColumn()
+    base_defense = FighterColumn()
+    base_power = FighterColumn()
+    xp = FighterColumn()
+
+    __slots__ = ("columns", "slot", "values", "speed")
+
     def __init__(
-        self, hp: int, defense: int, power: int, max_hp: int = None, xp: int = 0
+        self,
+        hp: int,
+        defense: int,
+        power: int,
+        max_hp: int = None,
+        xp: int = 0,
+        speed: int = NORMAL_SPEED,
     ):
         super(Fighter, self).__init__()
+        self.columns: Optional[Dict[str, np.ndarray]] = None
+        self.slot: int = 0
+        self.values: Dict[str, int] = {}
+
         self.hp: int = hp
         self.base_defense: int = defense
         self.base_power: int = power
         self.xp: int = xp
+        self.speed: int = speed
 
         if max_hp is None:
             self.base_max_hp: int = hp
         else:
             self.base_max_hp: int = max_hp
 
+    def attach(self, columns: Dict[str, np.ndarray], slot: int):
+        """ Moves the column attributes into slot of columns """
+        values = {name: getattr(self, name) for name in FIGHTER_COLUMNS}
+        self.columns, self.slot = columns, slot
+        for name, value in values.items():
+            setattr(self, name, value)
+
+    def detach(self):
+        """ Takes the column attributes back out of the columns they were attached to """
+        self.values = {name: getattr(self, name) for name in FIGHTER_COLUMNS}
+        self.columns = None
+
     @property
     def max_hp(self):
         if self.owner and self.owner.equipment:
@@ -100,6 +168,7 @@ class Fighter(EntityComponent):
             "base_defense": self.base_defense,
             "base_power": self.base_power,
             "xp": self.xp,
+            "speed": self.speed,
         }
 
         return json_data
@@ -112,6 +181,7 @@ class Fighter(EntityComponent):
             power=json_data.get("base_power"),
             max_hp=json_data.get("base_max_hp"),
             xp=json_data.get("xp", 0),
+            speed=json_data.get("speed", NORMAL_SPEED),
         )
 
         return fighter
@@ -13,6 +13,8 @@ if TYPE_CHECKING:
 
 
 class Inventory(EntityComponent):
+    __slots__ = ("capacity", "items")
+
     def __init__(self, capacity: int = None, items: List[Entity] = None):
         super(Inventory, self).__init__()
 
@@ -11,6 +11,8 @@ if TYPE_CHECKING:
 
 
 class Item(EntityComponent):
+    __slots__ = ("use_function", "targeting", "targeting_message", "function_kwargs")
+
     def __init__(
         self,
         use_function=None,
@@ -18,6 +20,7 @@ class Item(EntityComponent):
         targeting_message: Optional[Message] = None,
         **kwargs
     ):
+        super(Item, self).__init__()
         self.use_function = use_function
         self.targeting: bool = targeting
         self.targeting_message: Optional[Message] = targeting_message
@@ -5,6 +5,8 @@ from constants import CONSTANTS
 
 
 class Level(EntityComponent):
+    __slots__ = ("current_level", "current_xp", "level_up_base", "level_up_factor")
+
     def __init__(
         self,
         current_level: int = 1,
@@ -12,6 +14,7 @@ class Level(EntityComponent):
         level_up_base: int = CONSTANTS.level_up_base,
         level_up_factor: int = CONSTANTS.level_up_factor,
     ):
+        super(Level, self).__init__()
         self.current_level: int = current_level
         self.current_xp: int = current_xp
         self.level_up_base: int = level_up_base
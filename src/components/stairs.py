@@ -4,10 +4,19 @@ from components.entity_component import EntityComponent
 
 
 class Stairs(EntityComponent):
+    __slots__ = ("floor",)
+
     def __init__(self, floor: int):
+        super(Stairs, self).__init__()
         self.floor: int = floor
 
     def to_json(self) -> dict:
         json_data = {"floor": self.floor}
 
         return json_data
+
+    @classmethod
+    def from_json(cls, json_data: dict) -> Stairs:
+        stairs = cls(floor=json_data["floor"])
+
+        return stairs
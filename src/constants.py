@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from typing import Optional
 
 from map_objects.point import Point
 from rect import Rect
@@ -34,6 +35,28 @@ class Constants:
     fov_algorithm: int = 0
     fov_light_walls: bool = True
     fov_radius: int = 10
+    # how many computed fields of view to keep for when the player returns to a spot
+    fov_cache_size: int = 256
+
+    # the main loop sleeps until there is input, or until input_timeout milliseconds pass
+    blocking_input: bool = True
+    input_timeout: Optional[int] = None
+    max_fps: int = 60
+
+    # append each turn's changes to the save, and rewrite it in full every autosave_compact_turns turns
+    autosave: bool = True
+    autosave_compact_turns: int = 200
+
+    # monsters follow one shared distance map to the player instead of each running A*
+    monster_chase_map: bool = False
+
+    # time the phases of every turn, optionally drawn in the sidebar and written as a Chrome trace on exit
+    profile: bool = False
+    profile_overlay: bool = False
+    profile_trace: Optional[str] = None
+
+    # write every action taken to this file, for replay.py to play back
+    record_actions: Optional[str] = None
 
     player_hp: int = 100
     player_defense: int = 1
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import Optional, TYPE_CHECKING
 
 from colors import Colors
 from game_messages import Message
@@ -8,6 +8,7 @@ from render_functions import RenderLayer
 
 if TYPE_CHECKING:
     from entity import Entity
+    from turn_scheduler import TurnScheduler
 
 
 def kill_player(player: Entity):
@@ -17,7 +18,7 @@ def kill_player(player: Entity):
     return Message("You died!", Colors.RED)
 
 
-def kill_monster(monster: Entity):
+def kill_monster(monster: Entity, scheduler: Optional[TurnScheduler] = None):
     death_message = Message(f"{monster.name.capitalize()} is dead!", Colors.ORANGE)
 
     monster.char = "%"
@@ -28,4 +29,7 @@ def kill_monster(monster: Entity):
     monster.name = f"remains of {monster.name}"
     monster.render_order = RenderLayer.CORPSE
 
+    if scheduler is not None:
+        scheduler.remove(monster)
+
     return death_message
@@ -3,17 +3,24 @@ from __future__ import annotations
 from typing import List, Optional, TYPE_CHECKING
 
 from bearlibterminal import terminal as blt
-import tcod
 
 from colors import Colors
 import components
+from entity_registry import EntityRegistry
 from map_objects.game_map import GameMap
+from map_objects.navigation import CHASE_CARDINAL_COST
 from map_objects.point import Point
+from palette import PALETTE
 from render_functions import RenderLayer
 
 if TYPE_CHECKING:
     from components.entity_component import EntityComponent
-    import tcod.map
+
+
+# chase map distances are weighted, a cardinal step costs 2 and a diagonal one 3
+# This allows 25 cardinal steps, but only about 16 diagonal ones, so it is not
+# the 25-step limit move_astar puts on its path length
+MAX_CHASE_DISTANCE = 25 * CHASE_CARDINAL_COST
 
 
 class Entity:
@@ -21,6 +28,24 @@ class Entity:
     A generic object to represent players, enemies, items, etc.
     """
 
+    __slots__ = (
+        "registry",
+        "_position",
+        "char",
+        "color",
+        "name",
+        "blocks",
+        "render_order",
+        "_fighter",
+        "_ai",
+        "item",
+        "inventory",
+        "stairs",
+        "level",
+        "equipment",
+        "equippable",
+    )
+
     def __init__(
         self,
         position: Point,
@@ -38,14 +63,15 @@ class Entity:
         equipment: Optional[components.Equipment] = None,
         equippable: Optional[components.Equippable] = None
     ):
-        self.position: Point = position
+        self.registry: Optional[EntityRegistry] = None
+        self._position: Point = position
         self.char: str = char
         self.color: Colors = color
         self.name: str = name
         self.blocks: bool = blocks
         self.render_order: RenderLayer = render_order
-        self.fighter: Optional[components.Fighter] = fighter
-        self.ai: Optional[EntityComponent] = ai
+        self._fighter: Optional[components.Fighter] = fighter
+        self._ai: Optional[EntityComponent] = ai
         self.item: Optional[components.Item] = item
         self.inventory: Optional[components.Inventory] = inventory
         self.stairs: Optional[components.Stairs] = stairs
@@ -82,6 +108,41 @@ class Entity:
                 self.item = item
                 self.item.owner = self
 
+    @property
+    def position(self) -> Point:
+        return self._position
+
+    @position.setter
+    def position(self, value: Point):
+        old = self._position
+        self._position = value
+
+        if self.registry is not None:
+            self.registry.moved(self, old, value)
+
+    @property
+    def fighter(self) -> Optional[components.Fighter]:
+        return self._fighter
+
+    @fighter.setter
+    def fighter(self, value: Optional[components.Fighter]):
+        old = self._fighter
+        self._fighter = value
+
+        if self.registry is not None:
+            self.registry.fighter_changed(self, old)
+
+    @property
+    def ai(self) -> Optional[EntityComponent]:
+        return self._ai
+
+    @ai.setter
+    def ai(self, value: Optional[EntityComponent]):
+        self._ai = value
+
+        if self.registry is not None:
+            self.registry.touch(self)
+
     @property
     def x(self) -> int:
         return self.position.x
@@ -117,46 +178,25 @@ class Entity:
             or get_blocking_entities_at_location(entities, self.position + movement)
         ):
             self.move(movement)
+            game_map.navigation.update(self)
 
     def move_astar(self, target: "Entity", entities: List["Entity"], game_map: GameMap):
-        # Create a FOV map that has the dimensions of the map
-        fov: tcod.map.Map = tcod.map.Map(
-            width=game_map.width, height=game_map.height, order="F"
-        )
-
-        # Scan the current map each turn and set all the walls as unwalkable
-        for tile in game_map.tiles:
-            fov.transparent[tile.x, tile.y] = not tile.blocks_sight
-            fov.walkable[tile.x, tile.y] = not tile.blocked
-
-        # Scan all the objects to see if there are objects that must be navigated around
-        # Check also that the object isn't self or the target (so that the start and the end points are free)
-        # The AI class handles the situation is self is next to the target so it will not use this A* function anyway
-        for entity in entities:
-            if entity.blocks and entity != self and entity != target:
-                # Set the tile as a wall so it must be navigated around
-                fov.transparent[entity.x, entity.y] = True
-                fov.walkable[entity.x, entity.y] = False
+        navigation = game_map.navigation
 
-        # Allocate an A* path
-        # The 1.41 is the normal diagonal cost of moving, it can be set as 0.0 if diagonal moves are prohibited
-        my_path = tcod.path_new_using_map(fov, 1.41)
+        # The blocking entities on the shared cost array are synced once per enemy turn,
+        # and every monster that moves updates its own cell afterwards
 
-        # Compute the path between self's coordinates and the target's coordinates
-        tcod.path_compute(my_path, self.x, self.y, target.x, target.y)
+        # The cells of self and the target are opened up for the query, so that the start and the end points are free
+        path: List[Point] = navigation.path(start=self.position, goal=target.position)
 
         # Check if the path exists, and in this case, also the path is shorter than 25 tiles
         # The path size matters if you want the monster to use alternative longer paths (for
         # example through other rooms) if for example the player is in a corridor
         # It makes sense to keep the path size relatively low to keep monsters from running around
         # the map if there's an alternative path really far away
-        if not tcod.path_is_empty(my_path) and tcod.path_size(my_path) < 25:
-            # Find the next coordinates in the computed full path
-            x, y = tcod.path_walk(my_path, True)
-            if x or y:
-                # Set self's coordinates to the next path tile
-                self.x = x
-                self.y = y
+        if path and len(path) < 25:
+            # Set self's coordinates to the next path tile
+            self.position = path[0]
         else:
             # Keep the old move function as a backup so that is there are no paths (for example
             # another monster blocks a corridor it will still try to move towards the player
@@ -165,14 +205,36 @@ class Entity:
                 target_position=target.position, game_map=game_map, entities=entities
             )
 
-        # Delete the path to free memory
-        tcod.path_delete(my_path)
+        navigation.update(self)
+
+    def move_downhill(self, target: "Entity", entities: List["Entity"], game_map: GameMap):
+        """
+        Steps along the shared chase map towards the target
+
+        Like move_astar this does not sync the blocking entities itself, the
+        enemy turn syncs them once and every monster that moves updates its own cell.
+        """
+        navigation = game_map.navigation
+        distance = navigation.chase_map(target.position)[self.x, self.y]
+
+        # A weighted walking distance, not a step count like move_astar's limit
+        step: Optional[Point] = None
+        if distance < MAX_CHASE_DISTANCE:
+            step = navigation.downhill_step(start=self.position, goal=target.position)
+
+        if step:
+            self.position = step
+            navigation.update(self)
+        else:
+            self.move_towards(
+                target_position=target.position, game_map=game_map, entities=entities
+            )
 
     def draw(self, point: Point = None):
         """ Draw the entity to the terminal """
         if point is None:
             point = self.position
-        color = blt.color_from_argb(*self.color.argb)
+        color = PALETTE[self.color]
         blt.layer(self.render_order.value)
         blt.printf(
             x=point.x * 2,
@@ -231,7 +293,7 @@ class Entity:
         ai_json: dict = json_data.get("ai")
         item_json: dict = json_data.get("item")
         inventory_json: dict = json_data.get("inventory")
-        stairs_json: int = json_data.get("stairs")
+        stairs_json: dict = json_data.get("stairs")
         level_json: dict = json_data.get("level")
         equipment_json: dict = json_data.get("equipment")
         equippable_json: dict = json_data.get("equippable")
@@ -252,7 +314,7 @@ class Entity:
             inventory = None
 
         if stairs_json:
-            stairs = components.Stairs(stairs_json)
+            stairs = components.Stairs.from_json(json_data=stairs_json)
         else:
             stairs = None
 
@@ -309,6 +371,9 @@ class Entity:
 def get_blocking_entities_at_location(
     entities: List[Entity], destination: Point
 ) -> Optional[Entity]:
+    if isinstance(entities, EntityRegistry):
+        return entities.blocker_at(destination)
+
     for entity in entities:
         if entity.blocks and entity.position == destination:
             return entity
@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+from components.fighter import FIGHTER_COLUMNS
+from map_objects.point import Point
+
+if TYPE_CHECKING:
+    from components import Fighter
+    from entity import Entity
+
+
+class EntityRegistry(list):
+    """
+    The entities of one floor, indexed by position
+
+    Behaves like the plain list it replaces. Entities added to it report every
+    change of position back through Entity.position, so the index is kept up to
+    date without ever being rebuilt.
+
+    Every entity also owns a slot in a set of NumPy arrays holding its
+    coordinates, so the radius queries are one distance computation over all
+    slots. Freed slots are reused, and the arrays double when they run out.
+    The sequence number of a slot keeps results in the order entities were added.
+
+    The fighters of registered entities keep their hp, stats and xp in one
+    column per attribute, indexed by slot, and Fighter reads and writes them
+    there. Area damage and the fighter queries are then operations on whole
+    columns rather than loops over entities.
+
+    Entities that were added, removed, moved, hurt or had their fighter or ai
+    swapped are collected in changed, for the save journal to pick up.
+    """
+
+    def __init__(self, entities: Iterable[Entity] = ()):
+        super(EntityRegistry, self).__init__()
+        self.cells: Dict[Point, List[Entity]] = {}
+
+        self.slots: Dict[Entity, int] = {}
+        self.slot_entities: List[Optional[Entity]] = []
+        self.free_slots: List[int] = []
+        self.coordinates: np.ndarray = np.zeros((0, 2), dtype=np.int32)
+        self.occupied: np.ndarray = np.zeros(0, dtype=bool)
+        self.sequence: np.ndarray = np.zeros(0, dtype=np.int64)
+        self.next_sequence: int = 0
+        self.fighters: np.ndarray = np.zeros(0, dtype=bool)
+        self.columns: Dict[str, np.ndarray] = {name: np.zeros(0, dtype=np.int64) for name in FIGHTER_COLUMNS}
+        self.changed: Set[Entity] = set()
+
+        self.extend(entities)
+
+    def _grow(self):
+        capacity = max(2 * len(self.slot_entities), 16)
+        extra = capacity - len(self.slot_entities)
+
+        self.coordinates = np.concatenate([self.coordinates, np.zeros((extra, 2), dtype=np.int32)])
+        self.occupied = np.concatenate([self.occupied, np.zeros(extra, dtype=bool)])
+        self.sequence = np.concatenate([self.sequence, np.zeros(extra, dtype=np.int64)])
+        self.fighters = np.concatenate([self.fighters, np.zeros(extra, dtype=bool)])
+        for name, column in self.columns.items():
+            self.columns[name] = np.concatenate([column, np.zeros(extra, dtype=np.int64)])
+        self.free_slots.extend(reversed(range(len(self.slot_entities), capacity)))
+        self.slot_entities.extend([None] * extra)
+
+    def _add(self, entity: Entity):
+        entity.registry = self
+        self.changed.add(entity)
+        self.cells.setdefault(entity.position, []).append(entity)
+
+        if not self.free_slots:
+            self._grow()
+        slot = self.free_slots.pop()
+
+        self.slots[entity] = slot
+        self.slot_entities[slot] = entity
+        self.coordinates[slot] = entity.position.x, entity.position.y
+        self.occupied[slot] = True
+        self.sequence[slot] = self.next_sequence
+        self.next_sequence += 1
+        self.fighters[slot] = False
+        if entity.fighter:
+            self._attach_fighter(entity.fighter, slot)
+
+    def _discard(self, entity: Entity):
+        if entity.registry is self:
+            entity.registry = None
+        self.changed.add(entity)
+        self._unindex(entity, entity.position)
+
+        slot = self.slots.pop(entity)
+        if self.fighters[slot]:
+            self._detach_fighter(entity.fighter)
+        self.slot_entities[slot] = None
+        self.occupied[slot] = False
+        self.fighters[slot] = False
+        self.free_slots.append(slot)
+
+    def _attach_fighter(self, fighter: Fighter, slot: int):
+        fighter.attach(self.columns, slot)
+        self.fighters[slot] = True
+
+    def _detach_fighter(self, fighter: Fighter):
+        # an entity handed on to a newer registry keeps its fighter there
+        if fighter.columns is self.columns:
+            fighter.detach()
+
+    def _unindex(self, entity: Entity, point: Point):
+        cell = self.cells[point]
+        cell.remove(entity)
+        if not cell:
+            del self.cells[point]
+
+    def touch(self, entity: Entity):
+        """ Notes a change to entity that the registry cannot see itself """
+        self.changed.add(entity)
+
+    def take_changed(self) -> Set[Entity]:
+        """ Returns the entities changed since the last call, and starts collecting afresh """
+        changed, self.changed = self.changed, set()
+        return changed
+
+    def moved(self, entity: Entity, old: Point, new: Point):
+        self.changed.add(entity)
+        self._unindex(entity, old)
+        self.cells.setdefault(new, []).append(entity)
+        self.coordinates[self.slots[entity]] = new.x, new.y
+
+    def fighter_changed(self, entity: Entity, old: Optional[Fighter]):
+        self.changed.add(entity)
+        slot = self.slots[entity]
+        if old is not None and self.fighters[slot]:
+            self._detach_fighter(old)
+
+        self.fighters[slot] = False
+        if entity.fighter:
+            self._attach_fighter(entity.fighter, slot)
+
+    def append(self, entity: Entity):
+        super(EntityRegistry, self).append(entity)
+        self._add(entity)
+
+    def extend(self, entities: Iterable[Entity]):
+        for entity in entities:
+            self.append(entity)
+
+    def __iadd__(self, entities: Iterable[Entity]) -> EntityRegistry:
+        self.extend(entities)
+        return self
+
+    def insert(self, index: int, entity: Entity):
+        super(EntityRegistry, self).insert(index, entity)
+        self._add(entity)
+
+    def remove(self, entity: Entity):
+        super(EntityRegistry, self).remove(entity)
+        self._discard(entity)
+
+    def pop(self, index: int = -1) -> Entity:
+        entity = super(EntityRegistry, self).pop(index)
+        self._discard(entity)
+        return entity
+
+    def clear(self):
+        for entity in self:
+            self._discard(entity)
+        super(EntityRegistry, self).clear()
+
+    def __setitem__(self, index, value):
+        removed = self[index] if isinstance(index, slice) else [self[index]]
+        added = list(value) if isinstance(index, slice) else [value]
+
+        super(EntityRegistry, self).__setitem__(index, added if isinstance(index, slice) else value)
+        for entity in removed:
+            self._discard(entity)
+        for entity in added:
+            self._add(entity)
+
+    def __delitem__(self, index):
+        removed = self[index] if isinstance(index, slice) else [self[index]]
+
+        super(EntityRegistry, self).__delitem__(index)
+        for entity in removed:
+            self._discard(entity)
+
+    def at(self, point: Point) -> List[Entity]:
+        """ Returns the entities standing on point, in the order they were added there """
+        return list(self.cells.get(point, ()))
+
+    def blocker_at(self, point: Point) -> Optional[Entity]:
+        for entity in self.cells.get(point, ()):
+            if entity.blocks:
+                return entity
+
+        return None
+
+    def items_at(self, point: Point) -> List[Entity]:
+        return [entity for entity in self.cells.get(point, ()) if entity.item]
+
+    def _slots_within(
+        self, center: Point, radius: float, strict: bool = False
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """ Returns the fighter slots at most radius from center, and the squared distance of every slot """
+        offsets = self.coordinates - (center.x, center.y)
+        squared = np.einsum("ij,ij->i", offsets, offsets)
+
+        if strict:
+            mask = self.fighters & (squared < radius ** 2)
+        else:
+            mask = self.fighters & (squared <= radius ** 2)
+
+        return np.flatnonzero(mask), squared
+
+    def fighters_within(self, center: Point, radius: float) -> List[Entity]:
+        """ Returns the entities with a fighter component at most radius away from center """
+        slots, _ = self._slots_within(center=center, radius=radius)
+        slots = slots[np.argsort(self.sequence[slots])]
+
+        return [self.slot_entities[slot] for slot in slots.tolist()]
+
+    def damage_within(self, center: Point, radius: float, amount: int) -> List[Entity]:
+        """ Takes amount hp from every fighter at most radius away from center, and returns them in order """
+        slots, _ = self._slots_within(center=center, radius=radius)
+        slots = slots[np.argsort(self.sequence[slots])]
+        self.columns["hp"][slots] -= amount
+
+        hit = [self.slot_entities[slot] for slot in slots.tolist()]
+        self.changed.update(hit)
+        return hit
+
+    def nearest_fighter(
+        self,
+        center: Point,
+        radius: float,
+        visible: Optional[np.ndarray] = None,
+        exclude: Optional[Entity] = None,
+    ) -> Optional[Entity]:
+        """
+        Returns the closest entity with a fighter component less than radius away from center
+
+        Only cells where visible is True count when it is given. Ties go to the
+        entity added first.
+        """
+        slots, squared = self._slots_within(center=center, radius=radius, strict=True)
+
+        if visible is not None and len(slots):
+            x, y = self.coordinates[slots].T
+            slots = slots[visible[x, y]]
+
+        for slot in slots[np.lexsort((self.sequence[slots], squared[slots]))].tolist():
+            entity = self.slot_entities[slot]
+            if entity is not exclude:
+                return entity
+
+        return None
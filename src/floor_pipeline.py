@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import json
+import multiprocessing
+import random
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from map_objects import GameMap, MapGenerator, Point, PointArray
+from entity import Entity
+from entity_registry import EntityRegistry
+from rng import RandomStreams
+
+
+def floor_seed(game_seed: int, dungeon_level: int) -> int:
+    """ Derives the seed for one floor, so every floor of a game can be rebuilt on its own """
+    return random.Random(f"{game_seed}:{dungeon_level}").getrandbits(32)
+
+
+class Floor:
+    """
+    A finished dungeon floor, ready to be swapped into a running game
+    """
+
+    def __init__(
+        self,
+        game_map: GameMap,
+        cave: PointArray,
+        entities: List[Entity],
+        player_start: Point,
+    ):
+        self.game_map: GameMap = game_map
+        self.cave: PointArray = cave
+        self.entities: List[Entity] = entities
+        self.player_start: Point = player_start
+
+
+def build_floor(
+    seed: int, dungeon_level: int, width: int, height: int, min_monsters: int
+) -> Tuple[MapGenerator, List[Entity], Point]:
+    """
+    Generates a floor from its own random streams, so the same seed always gives the same floor
+    """
+    map_generator = MapGenerator(map_width=width, map_height=height, rng=RandomStreams(seed))
+    entities: EntityRegistry = EntityRegistry()
+
+    map_generator.generate_caves(width=width, height=height, entities=entities)
+    map_generator.dungeon_level = dungeon_level
+    map_generator.place_entities(entities=entities, min_monsters=min_monsters)
+    player_start: Point = map_generator.player_start_point
+
+    return map_generator, entities, player_start
+
+
+def _generate_in_worker(
+    connection: Connection,
+    shared_memory_name: str,
+    seed: int,
+    dungeon_level: int,
+    width: int,
+    height: int,
+    min_monsters: int,
+):
+    map_generator, entities, player_start = build_floor(
+        seed=seed,
+        dungeon_level=dungeon_level,
+        width=width,
+        height=height,
+        min_monsters=min_monsters,
+    )
+
+    shared_memory = SharedMemory(name=shared_memory_name)
+
+    tile_map = np.ndarray(
+        (width, height), dtype=np.uint8, buffer=shared_memory.buf, order="F"
+    )
+    tile_map[:] = map_generator.game_map.tile_map
+    del tile_map
+    shared_memory.close()
+
+    json_data = {
+        "entities": [entity.to_json() for entity in entities],
+        "player_start": [player_start.x, player_start.y],
+        "cave": map_generator.cave.coordinates.tolist(),
+    }
+    connection.send_bytes(json.dumps(json_data).encode())
+    connection.close()
+
+
+class PendingFloor:
+    def __init__(
+        self,
+        seed: int,
+        dungeon_level: int,
+        process: multiprocessing.Process,
+        connection: Connection,
+        shared_memory: SharedMemory,
+    ):
+        self.seed: int = seed
+        self.dungeon_level: int = dungeon_level
+        self.process: multiprocessing.Process = process
+        self.connection: Connection = connection
+        self.shared_memory: SharedMemory = shared_memory
+
+    @property
+    def ready(self) -> bool:
+        return self.connection.poll()
+
+    def release(self):
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
+        self.connection.close()
+        self.shared_memory.close()
+        self.shared_memory.unlink()
+
+
+class FloorPipeline:
+    """
+    Generates the next floor in a worker process while the current one is played
+
+    The tile layer comes back through shared memory and the entities and the
+    ordered cave cells as JSON, so nothing is pickled on the way back. If the worker has not finished when the
+    floor is needed, it is dropped and the floor is generated right away instead.
+    Both paths build the floor from the same seed, so the result is identical.
+
+    With background set to False nothing is prefetched, for callers that already
+    run one game per process.
+    """
+
+    def __init__(self, width: int, height: int, min_monsters: int, background: bool = True):
+        self.width: int = width
+        self.height: int = height
+        self.min_monsters: int = min_monsters
+        self.background: bool = background
+        self.pending: Optional[PendingFloor] = None
+        self.context = multiprocessing.get_context("spawn")
+
+    def prefetch(self, seed: int, dungeon_level: int):
+        if not self.background:
+            return
+
+        if self.pending:
+            if self.pending.seed == seed and self.pending.dungeon_level == dungeon_level:
+                return
+            self.cancel()
+
+        shared_memory = SharedMemory(create=True, size=self.width * self.height)
+        receiver, sender = self.context.Pipe(duplex=False)
+        process = self.context.Process(
+            target=_generate_in_worker,
+            args=(
+                sender,
+                shared_memory.name,
+                seed,
+                dungeon_level,
+                self.width,
+                self.height,
+                self.min_monsters,
+            ),
+            daemon=True,
+        )
+        process.start()
+        sender.close()
+
+        self.pending = PendingFloor(
+            seed=seed,
+            dungeon_level=dungeon_level,
+            process=process,
+            connection=receiver,
+            shared_memory=shared_memory,
+        )
+
+    @property
+    def ready(self) -> bool:
+        return self.pending is not None and self.pending.ready
+
+    def take(self, seed: int, dungeon_level: int) -> Floor:
+        floor: Optional[Floor] = None
+
+        pending = self.pending
+        if (
+            pending
+            and pending.seed == seed
+            and pending.dungeon_level == dungeon_level
+            and pending.ready
+        ):
+            try:
+                floor = self._receive(pending)
+            except EOFError:
+                # the worker died before sending anything back
+                floor = None
+
+        self.cancel()
+
+        if floor is None:
+            floor = self.generate(seed=seed, dungeon_level=dungeon_level)
+
+        return floor
+
+    def generate(self, seed: int, dungeon_level: int) -> Floor:
+        map_generator, entities, player_start = build_floor(
+            seed=seed,
+            dungeon_level=dungeon_level,
+            width=self.width,
+            height=self.height,
+            min_monsters=self.min_monsters,
+        )
+
+        return Floor(
+            game_map=map_generator.game_map,
+            cave=map_generator.cave,
+            entities=entities,
+            player_start=player_start,
+        )
+
+    def _receive(self, pending: PendingFloor) -> Floor:
+        json_data = json.loads(pending.connection.recv_bytes().decode())
+
+        tile_map = np.ndarray(
+            (self.width, self.height),
+            dtype=np.uint8,
+            buffer=pending.shared_memory.buf,
+            order="F",
+        ).copy(order="F")
+
+        game_map = GameMap.from_tile_map(
+            tile_map=tile_map, dungeon_level=pending.dungeon_level
+        )
+        entities = [
+            Entity.from_json(json_data=entity_json_data)
+            for entity_json_data in json_data["entities"]
+        ]
+        x, y = json_data["player_start"]
+
+        return Floor(
+            game_map=game_map,
+            cave=PointArray(json_data["cave"], points=game_map.points),
+            entities=entities,
+            player_start=Point(x=x, y=y),
+        )
+
+    def cancel(self):
+        if self.pending:
+            self.pending.release()
+            self.pending = None
+
+    def close(self):
+        self.cancel()
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import numpy as np
 import tcod.map
 
 from map_objects.game_map import GameMap
 from map_objects.point import Point
-from map_objects.tile import Tile
+from profiler import PROFILER
 
 
 def initialize_fov(game_map: GameMap):
@@ -12,9 +16,8 @@ def initialize_fov(game_map: GameMap):
         width=game_map.width, height=game_map.height, order="F"
     )
 
-    for tile in game_map.tiles:
-        fov_map.walkable[tile.x, tile.y] = tile.walkable
-        fov_map.transparent[tile.x, tile.y] = tile.transparent
+    fov_map.walkable[:] = game_map.walkable
+    fov_map.transparent[:] = game_map.transparent
 
     return fov_map
 
@@ -30,3 +33,73 @@ def recompute_fov(
         algorithm=algorithm,
     )
     # tcod.map_compute_fov(fov_map, point.x, point.y, radius, light_walls, algorithm)
+
+
+class FovCache:
+    """
+    Recently computed fields of view, bit packed and evicted least recently used first
+
+    Masks are keyed by the viewer's position, the fov settings and the revision
+    of the game map, which changes whenever its transparency does, so a mask
+    is never served for walls that have since moved. Stepping back onto a tile
+    or waiting in place copies the stored mask instead of casting rays again.
+    The cache holds one game map at a time and empties itself for a new one.
+    """
+
+    def __init__(self, size: int = 256):
+        self.size: int = size
+        self.masks: OrderedDict[Tuple, np.ndarray] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+        self.game_map: Optional[GameMap] = None
+        self.revision: int = -1
+
+    def __len__(self) -> int:
+        return len(self.masks)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self):
+        self.masks.clear()
+        self.game_map = None
+        self.revision = -1
+
+    def compute(
+        self,
+        fov_map: tcod.map.Map,
+        game_map: GameMap,
+        point: Point,
+        radius,
+        light_walls=True,
+        algorithm=0,
+    ):
+        """ Fills fov_map.fov for point, from the cache when it can """
+        if game_map is not self.game_map:
+            self.clear()
+            self.game_map = game_map
+        if game_map.revision != self.revision:
+            fov_map.transparent[:] = game_map.transparent
+            self.revision = game_map.revision
+
+        key = (game_map.revision, point.x, point.y, radius, light_walls, algorithm)
+        packed = self.masks.get(key)
+
+        if packed is not None:
+            self.masks.move_to_end(key)
+            self.hits += 1
+            PROFILER.count("fov.cache_hits")
+            fov_map.fov[:] = np.unpackbits(packed, count=fov_map.fov.size).reshape(fov_map.fov.shape)
+            return
+
+        self.misses += 1
+        PROFILER.count("fov.cache_misses")
+        recompute_fov(
+            fov_map=fov_map, point=point, radius=radius, light_walls=light_walls, algorithm=algorithm
+        )
+
+        self.masks[key] = np.packbits(fov_map.fov)
+        if len(self.masks) > self.size:
+            self.masks.popitem(last=False)
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import time
+from typing import Optional
+
+from bearlibterminal import terminal as blt
+
+# how long wait_for_input sleeps between checks when it has a timeout, in milliseconds
+POLL_INTERVAL = 5
+
+
+def wait_for_input(timeout: Optional[int] = None) -> Optional[int]:
+    """
+    Returns the next terminal event, blocking until there is one
+
+    With a timeout in milliseconds it gives up after that long and returns None,
+    sleeping in between checks instead of spinning.
+    """
+    if timeout is None:
+        return blt.read()
+
+    deadline = time.perf_counter() + timeout / 1000
+    while not blt.has_input():
+        if time.perf_counter() >= deadline:
+            return None
+        blt.delay(POLL_INTERVAL)
+
+    return blt.read()
+
+
+class FrameLimiter:
+    """
+    Decides when the main loop redraws the screen
+
+    A frame is only drawn after something asked for it, and at most max_fps
+    times a second while more input is already queued, so a burst of mouse
+    moves or repeated keys is handled first and drawn once. Every pass through
+    the loop that does not draw counts as a skipped frame.
+    """
+
+    def __init__(self, max_fps: int = 0):
+        self.frame_time: float = 1 / max_fps if max_fps else 0.0
+        self.last_frame: float = float("-inf")
+        self.dirty: bool = True
+        self.frames_rendered: int = 0
+        self.frames_skipped: int = 0
+
+    def request(self):
+        self.dirty = True
+
+    def should_render(self, input_pending: bool = False) -> bool:
+        if self.dirty and not (
+            input_pending and time.perf_counter() - self.last_frame < self.frame_time
+        ):
+            return True
+
+        self.frames_skipped += 1
+        return False
+
+    def rendered(self):
+        self.dirty = False
+        self.last_frame = time.perf_counter()
+        self.frames_rendered += 1
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import json
 import os
+import random
 from typing import List, Optional, TYPE_CHECKING
 
 from camera import Camera
@@ -9,11 +10,18 @@ from colors import Colors
 from components import Equipment, Equippable, Fighter, Inventory, Level
 from constants import CONSTANTS
 from entity import Entity
+from entity_registry import EntityRegistry
 from equipment_slots import EquipmentSlots
+from floor_pipeline import Floor, FloorPipeline, floor_seed
+from fov_functions import FovCache
 from game_messages import MessageLog, Message
 from game_states import GameStates
 from map_objects import GameMap, MapGenerator, Point
 from render_functions import RenderLayer
+from rng import RandomStreams
+from save_format import JSON_SAVE_FILE, SAVE_DIRECTORY, read_save, recover_save, write_save
+from save_journal import SaveJournal, replay_journal
+from turn_scheduler import TurnScheduler
 
 if TYPE_CHECKING:
     import tcod.map
@@ -29,11 +37,22 @@ class Game:
         self.current_state: Optional[GameStates] = None
         self.previous_state: Optional[GameStates] = None
         self.player: Optional[Entity] = None
-        self.entities: Optional[List[Entity]] = None
+        self.entities: Optional[EntityRegistry] = None
         self.message_log: Optional[MessageLog] = None
         self.fov_map: Optional[tcod.map.Map] = None
+        self.fov_cache: FovCache = FovCache(size=CONSTANTS.fov_cache_size)
         self.game_running: bool = True
         self.camera: Optional[Camera] = None
+        self.seed: Optional[int] = None
+        self.rng: Optional[RandomStreams] = None
+        self.journal: Optional[SaveJournal] = None
+        self.targeting_item: Optional[Entity] = None
+        self.scheduler: Optional[TurnScheduler] = None
+        self.floor_pipeline: FloorPipeline = FloorPipeline(
+            width=CONSTANTS.map_width,
+            height=CONSTANTS.map_height,
+            min_monsters=CONSTANTS.min_monsters,
+        )
 
     @property
     def game_map(self) -> GameMap:
@@ -51,7 +70,23 @@ class Game:
     def game_state(self, new_state: GameStates):
         self.current_state = new_state
 
-    def save_game(self):
+    def save_game(self, path: str = SAVE_DIRECTORY):
+        if self.journal and self.journal.path == path:
+            self.journal.compact(self)
+        else:
+            write_save(game=self, path=path)
+
+    def start_journal(self, path: str = SAVE_DIRECTORY, compact_every: int = 200):
+        """ Saves the game in full and from then on appends every turn's changes to it """
+        self.journal = SaveJournal(path=path, compact_every=compact_every)
+        self.journal.compact(self)
+
+    def export_json(self, path: str = JSON_SAVE_FILE):
+        """ Writes the whole game as one JSON document, the format saves used before the binary one """
+        with open(path, "w") as save_file:
+            json.dump(self.to_json(), save_file, indent=4)
+
+    def to_json(self) -> dict:
         player_index = self.entities.index(self.player)
         entities_json_data = [entity.to_json() for entity in self.entities]
         game_map_json_data = self.game_map.to_json()
@@ -66,26 +101,49 @@ class Game:
             "message_log": message_log_json_data,
             "game_state": game_state_json_data,
             "camera": camera_json_data,
+            "seed": self.seed,
+            "rng": self.rng.to_json(),
         }
 
-        with open("save_game.json", "w") as save_file:
-            json.dump(json_data, save_file, indent=4)
+        return json_data
 
     @classmethod
-    def load_game(cls):
-        if not os.path.isfile("save_game.json"):
+    def load_game(cls, path: str = SAVE_DIRECTORY, json_path: str = JSON_SAVE_FILE) -> Game:
+        recover_save(path)
+        if os.path.isdir(path):
+            game = read_save(game_class=cls, path=path)
+            replay_journal(game=game, path=path)
+            return game
+
+        if not os.path.isfile(json_path):
             raise FileNotFoundError
 
-        with open("save_game.json") as save_file:
+        with open(json_path) as save_file:
             json_data = json.load(save_file)
 
-        entities = [
+        return cls.from_json(json_data=json_data)
+
+    @classmethod
+    def from_json(cls, json_data: dict) -> Game:
+        entities = EntityRegistry(
             Entity.from_json(json_data=entity_json_data)
             for entity_json_data in json_data["entities"]
-        ]
-        player = entities[json_data["player_index"]]
+        )
+
+        return cls.restore(
+            entities=entities,
+            player_index=json_data["player_index"],
+            game_map=GameMap.from_json(json_data=json_data["game_map"]),
+            json_data=json_data,
+        )
+
+    @classmethod
+    def restore(
+        cls, entities: EntityRegistry, player_index: int, game_map: GameMap, json_data: dict
+    ) -> Game:
+        """ Puts a loaded game back together, json_data holds everything but the map and entities """
+        player = entities[player_index]
 
-        game_map = GameMap.from_json(json_data=json_data["game_map"])
         message_log = MessageLog.from_json(json_data=json_data["message_log"])
         game_state = GameStates(json_data["game_state"])
 
@@ -99,16 +157,25 @@ class Game:
         game.map_generator.game_map = game_map
         game.message_log = message_log
         game.current_state = game_state
+        game.seed = json_data.get("seed", random.getrandbits(32))
+        if "rng" in json_data:
+            game.rng = RandomStreams.from_json(json_data=json_data["rng"])
+        else:
+            game.rng = RandomStreams(seed=game.seed)
 
         game.camera: Camera = Camera.from_json(json_data=json_data, player=player)
 
         return game
 
     @classmethod
-    def new_game(cls) -> Game:
+    def new_game(cls, seed: Optional[int] = None) -> Game:
         game = cls()
+        if seed is None:
+            seed = random.getrandbits(32)
+        game.seed = seed
+        game.rng = RandomStreams(seed=seed)
         game.map_generator: Optional[MapGenerator] = MapGenerator(
-            map_width=CONSTANTS.map_width, map_height=CONSTANTS.map_height
+            map_width=CONSTANTS.map_width, map_height=CONSTANTS.map_height, rng=game.rng
         )
         game.current_state: Optional[GameStates] = GameStates.PLAYER_TURN
         game.previous_state: Optional[GameStates] = GameStates.PLAYER_TURN
@@ -134,7 +201,7 @@ class Game:
             equipment=equipment_component
         )
         game.player: Optional[Entity] = player
-        game.entities: Optional[List[Entity]] = [player]
+        game.entities: Optional[EntityRegistry] = EntityRegistry([player])
 
         equippable_component = Equippable(slot=EquipmentSlots.MAIN_HAND, power_bonus=2)
         dagger = Entity(position=Point(0, 0), char="-", color=Colors.SKY, name="Dagger", equippable=equippable_component)
@@ -151,23 +218,37 @@ class Game:
 
         return game
 
-    def next_floor(self):
-        entities = [self.player]
-        dungeon_level = self.map_generator.dungeon_level
+    def first_floor(self):
+        floor = self.take_floor(dungeon_level=1)
+        self.enter_floor(floor)
 
-        self.map_generator.generate_caves(width=CONSTANTS.map_width, height=CONSTANTS.map_height, entities=entities)
+    def next_floor(self):
+        floor = self.take_floor(dungeon_level=self.map_generator.dungeon_level + 1)
+        self.enter_floor(floor)
 
-        self.game_map.dungeon_level = dungeon_level + 1
+        self.player.fighter.heal(self.player.fighter.max_hp // 2)
+        self.message_log.add_message(Message("You take a moment to rest, and recover your strength.", Colors.LIGHT_VIOLET))
 
-        self.map_generator.place_entities(
-            entities=entities,
-            min_monsters=CONSTANTS.min_monsters,
+    def take_floor(self, dungeon_level: int) -> Floor:
+        return self.floor_pipeline.take(
+            seed=floor_seed(self.seed, dungeon_level), dungeon_level=dungeon_level
         )
 
-        self.player.fighter.heal(self.player.fighter.max_hp // 2)
-        self.player.position = self.map_generator.player_start_point
-
-        self.message_log.add_message(Message("You take a moment to rest, and recover your strength.", Colors.LIGHT_VIOLET))
+    def enter_floor(self, floor: Floor, prefetch: bool = True):
+        self.map_generator.game_map = floor.game_map
+        self.map_generator.cave = floor.cave
 
-        self.entities = entities
+        self.player.position = floor.player_start
+        self.entities = EntityRegistry([self.player] + floor.entities)
+        self.scheduler = TurnScheduler(self.entities)
         self.camera.recenter()
+
+        if prefetch:
+            self.prefetch_next_floor()
+
+    def prefetch_next_floor(self):
+        """ Starts generating the floor below this one in the background """
+        dungeon_level = self.map_generator.dungeon_level + 1
+        self.floor_pipeline.prefetch(
+            seed=floor_seed(self.seed, dungeon_level), dungeon_level=dungeon_level
+        )
@@ -31,6 +31,8 @@ class MessageLog:
         self.x: int = x
         self.width: int = width
         self.height: int = height
+        # lines added since the log was created, including the ones scrolled out
+        self.added: int = 0
 
     def add_message(self, message: Message):
         # Split the message if necessary, among multiple lines
@@ -43,6 +45,7 @@ class MessageLog:
 
             # Add the new line as a Message object, with the text and the color
             self.messages.append(Message(line, message.color))
+            self.added += 1
 
     def to_json(self) -> dict:
         messages = []
@@ -0,0 +1,290 @@
+"""
+Plays the game without a terminal, driven by a scripted policy
+
+    python headless.py --turns 5000 --seed 1234
+    python headless.py --floors 3 --profile trace.json
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import List, Optional, Tuple, TYPE_CHECKING
+
+from game import Game
+from game_states import GameStates
+from item_functions import heal
+from map_objects import Point
+from profiler import PROFILER
+from turn_functions import start_play, take_turn, update_fov
+
+if TYPE_CHECKING:
+    from entity import Entity
+
+
+DIRECTIONS: List[Point] = [
+    Point(x, y) for x in (-1, 0, 1) for y in (-1, 0, 1) if (x, y) != (0, 0)
+]
+
+MENU_STATES = (
+    GameStates.SHOW_INVENTORY,
+    GameStates.DROP_INVENTORY,
+    GameStates.CHARACTER_SCREEN,
+    GameStates.TARGETING,
+)
+
+
+class Policy(ABC):
+    """
+    Decides the player's next action in place of the keyboard and mouse
+
+    next_action returns the same action and mouse action dicts as the input
+    handlers, or None once the policy has nothing left to do.
+    """
+
+    @abstractmethod
+    def next_action(self, game: Game) -> Optional[Tuple[dict, dict]]:
+        pass
+
+
+class ExplorerPolicy(Policy):
+    """
+    Heads for the stairs, picking up items and fighting whatever stands next to it on the way
+
+    Below half health in a fight it uses whatever it carries, healing first.
+    Targeted scrolls are aimed at the nearest visible monster.
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        self.random: random.Random = random.Random(seed)
+        self.route: List[Point] = []
+        self.using: Optional[int] = None
+
+    def next_action(self, game: Game) -> Tuple[dict, dict]:
+        if game.game_state == GameStates.LEVEL_UP:
+            return {"level_up": self.random.choice(("hp", "str", "dex"))}, {}
+
+        if game.game_state == GameStates.SHOW_INVENTORY and self.using is not None:
+            inventory_index, self.using = self.using, None
+            return {"inventory_index": inventory_index}, {}
+
+        if game.game_state == GameStates.TARGETING:
+            target = game.entities.nearest_fighter(
+                center=game.player.position,
+                radius=game.camera.width,
+                visible=game.fov_map.fov,
+                exclude=game.player,
+            )
+            if target:
+                return {}, {"left_click": target.position - game.camera.top_left}
+
+        if game.game_state in MENU_STATES:
+            return {"exit": True}, {}
+
+        player = game.player
+        here = game.entities.at(player.position)
+
+        if any(entity.stairs for entity in here):
+            self.route = []
+            return {"take_stairs": True}, {}
+
+        if (
+            any(entity.item for entity in here)
+            and len(player.inventory.items) < player.inventory.capacity
+        ):
+            return {"pickup": True}, {}
+
+        # every neighbor, diagonals included, is less than 2 away
+        target = game.entities.nearest_fighter(
+            center=player.position, radius=2, exclude=player
+        )
+        if target:
+            if player.fighter.hp < player.fighter.max_hp // 2:
+                self.using = self.item_to_use(game)
+                if self.using is not None:
+                    return {"show_inventory": True}, {}
+
+            return {"move": target.position - player.position}, {}
+
+        step = self.next_step(game)
+        if step is None:
+            step = self.random.choice(DIRECTIONS)
+
+        return {"move": step}, {}
+
+    @staticmethod
+    def item_to_use(game: Game) -> Optional[int]:
+        """ Returns the inventory index of the item to use, healing items before anything else """
+        usable = [
+            (item.item.use_function is not heal, index)
+            for index, item in enumerate(game.player.inventory.items)
+            if item.item.use_function is not None
+        ]
+        if not usable:
+            return None
+
+        return min(usable)[1]
+
+    def next_step(self, game: Game) -> Optional[Point]:
+        """ Returns the next move along the route to the stairs, finding a new route if needed """
+        player = game.player
+
+        if not self.route or player.position.distance_to(self.route[0]) >= 2:
+            stairs: Optional[Entity] = next(
+                (entity for entity in game.entities if entity.stairs), None
+            )
+            if stairs is None:
+                return None
+            self.route = game.game_map.navigation.path(
+                start=player.position, goal=stairs.position
+            )
+            if not self.route:
+                return None
+
+        return self.route.pop(0) - player.position
+
+
+class NullRenderer:
+    """ Stands in for render_all when there is no terminal """
+
+    def render(self, game: Game):
+        pass
+
+
+class RunStats:
+    def __init__(
+        self,
+        seed: int,
+        turns: int,
+        floors: int,
+        dungeon_level: int,
+        seconds: float,
+        player_died: bool,
+        kills: Counter,
+        items_used: Counter,
+    ):
+        self.seed: int = seed
+        self.turns: int = turns
+        self.floors: int = floors
+        self.dungeon_level: int = dungeon_level
+        self.seconds: float = seconds
+        self.player_died: bool = player_died
+        self.kills: Counter = kills
+        self.items_used: Counter = items_used
+
+    @property
+    def turns_per_second(self) -> float:
+        if self.seconds <= 0:
+            return 0.0
+        return self.turns / self.seconds
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.turns} turns, {self.floors} floors descended in {self.seconds:.2f}s "
+            f"({self.turns_per_second:.0f} turns/s){', player died' if self.player_died else ''}"
+        )
+
+
+def run(
+    game: Game,
+    policy: Policy,
+    renderer: Optional[NullRenderer] = None,
+    max_turns: Optional[int] = None,
+    max_floors: Optional[int] = None,
+) -> RunStats:
+    """
+    Plays game until the player dies, the policy stops, max_turns actions were
+    taken or max_floors floors were descended
+
+    Goes through the same turn logic as play_game, so only reading input and
+    drawing are left out. Nothing is saved.
+    """
+    if renderer is None:
+        renderer = NullRenderer()
+
+    start_play(game)
+    first_level = game.map_generator.dungeon_level
+    turns = 0
+    kills: Counter = Counter()
+    items_used: Counter = Counter()
+
+    start = time.perf_counter()
+    while game.game_running and game.game_state != GameStates.PLAYER_DEAD:
+        floors = game.map_generator.dungeon_level - first_level
+        if (max_turns is not None and turns >= max_turns) or (
+            max_floors is not None and floors >= max_floors
+        ):
+            break
+
+        update_fov(game)
+        renderer.render(game)
+
+        with PROFILER.phase("policy"):
+            next_action = policy.next_action(game)
+        if next_action is None:
+            break
+
+        action, mouse_action = next_action
+        with PROFILER.phase("turn"):
+            events = take_turn(game=game, action=action, mouse_action=mouse_action)
+
+        for event in events:
+            if "killed" in event:
+                kills[event["killed"]] += 1
+            if "item_used" in event:
+                items_used[event["item_used"]] += 1
+        turns += 1
+
+    return RunStats(
+        seed=game.seed,
+        turns=turns,
+        floors=game.map_generator.dungeon_level - first_level,
+        dungeon_level=game.map_generator.dungeon_level,
+        seconds=time.perf_counter() - start,
+        player_died=game.game_state == GameStates.PLAYER_DEAD,
+        kills=kills,
+        items_used=items_used,
+    )
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--turns", type=int, default=None)
+    parser.add_argument("--floors", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--profile", default=None, help="file to write a Chrome trace of the run to")
+    args = parser.parse_args(argv)
+
+    if args.turns is None and args.floors is None:
+        args.turns = 1000
+
+    if args.profile:
+        PROFILER.enable()
+
+    game = Game.new_game(seed=args.seed)
+    game.first_floor()
+
+    try:
+        stats = run(
+            game=game,
+            policy=ExplorerPolicy(seed=game.seed),
+            max_turns=args.turns,
+            max_floors=args.floors,
+        )
+    finally:
+        game.floor_pipeline.close()
+
+    print(f"seed {stats.seed}: {stats}")
+
+    if args.profile:
+        PROFILER.export_chrome_trace(args.profile)
+        print(f"{'phase':<20}{'mean':>7}{'p95':>7}")
+        for line in PROFILER.overlay_lines():
+            print(line)
+        print(f"fov cache: {game.fov_cache.hits} hits, {game.fov_cache.misses} misses ({game.fov_cache.hit_rate:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,7 @@ if TYPE_CHECKING:
     import tcod.map
 
     from entity import Entity
+    from entity_registry import EntityRegistry
     from map_objects import Point
 
 
@@ -40,23 +41,19 @@ def heal(*args, **kwargs) -> List[dict]:
 
 def cast_lightning(*args, **kwargs) -> List[dict]:
     caster: Entity = args[0]
-    entities: List[Entity] = kwargs.get("entities")
+    entities: EntityRegistry = kwargs.get("entities")
     fov_map: tcod.map.Map = kwargs.get("fov_map")
     damage: int = kwargs.get("damage")
     maximum_range: int = kwargs.get("maximum_range")
 
     results: List[dict] = []
 
-    target: Optional[Entity] = None
-    closest_distance = maximum_range + 1
-
-    for entity in entities:
-        if entity.fighter and entity != caster and fov_map.fov[entity.x, entity.y]:
-            distance: float = caster.distance_to(entity.position)
-
-            if distance < closest_distance:
-                target: Entity = entity
-                closest_distance = distance
+    target: Optional[Entity] = entities.nearest_fighter(
+        center=caster.position,
+        radius=maximum_range + 1,
+        visible=fov_map.fov,
+        exclude=caster,
+    )
 
     if target:
         results.append(
@@ -82,7 +79,7 @@ def cast_lightning(*args, **kwargs) -> List[dict]:
 
 
 def cast_fireball(*args, **kwargs) -> List[dict]:
-    entities: Optional[List[Entity]] = kwargs.get("entities")
+    entities: Optional[EntityRegistry] = kwargs.get("entities")
     fov_map: Optional[tcod.map.Map] = kwargs.get("fov_map")
     damage: Optional[int] = kwargs.get("damage")
     radius: Optional[int] = kwargs.get("radius")
@@ -112,22 +109,22 @@ def cast_fireball(*args, **kwargs) -> List[dict]:
         }
     )
 
-    for entity in entities:
-        if entity.distance_to(target_position) <= radius and entity.fighter:
-            results.append(
-                {
-                    "message": Message(
-                        f"The {entity.name} gets burned for {damage} hit points."
-                    )
-                }
-            )
-            results.extend(entity.fighter.take_damage(damage))
+    for entity in entities.damage_within(center=target_position, radius=radius, amount=damage):
+        results.append(
+            {
+                "message": Message(
+                    f"The {entity.name} gets burned for {damage} hit points."
+                )
+            }
+        )
+        if entity.fighter.hp <= 0:
+            results.append({"dead": entity, "xp": entity.fighter.xp})
 
     return results
 
 
 def cast_confuse(*args, **kwargs) -> List[dict]:
-    entities: Optional[List[Entity]] = kwargs.get("entities")
+    entities: Optional[EntityRegistry] = kwargs.get("entities")
     fov_map: Optional[tcod.map.Map] = kwargs.get("fov_map")
     target_position: Optional[Point] = kwargs.get("target_position")
 
@@ -145,8 +142,8 @@ def cast_confuse(*args, **kwargs) -> List[dict]:
         )
         return results
 
-    for entity in entities:
-        if entity.position == target_position and entity.ai:
+    for entity in entities.at(target_position):
+        if entity.ai:
             confused_ai = ConfusedMonster(entity.ai, 10)
 
             confused_ai.owner = entity
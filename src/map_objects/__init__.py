@@ -1,4 +1,5 @@
 from map_objects.game_map import GameMap
 from map_objects.map_generator import MapGenerator
-from map_objects.point import Point
+from map_objects.point import Point, PointTable
+from map_objects.point_array import PointArray
 from map_objects.tile import Tile, TileType
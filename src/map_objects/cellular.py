@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import numpy as np
+
+# scan states are (cell to the left, cell two to the left), numbered left * 2 + far_left
+STATES = np.arange(4)
+LEFT = STATES >> 1
+FAR_LEFT = STATES & 1
+
+# a transition maps each of the four states to the next one, packed two bits per state
+TRANSITIONS = np.arange(256)
+# COMPOSE[later << 8 | earlier] is the transition of applying earlier and then later
+COMPOSE = np.zeros((256, 256), dtype=np.intp)
+for state in STATES:
+    middle = (TRANSITIONS[None, :] >> (2 * state)) & 3
+    COMPOSE |= ((TRANSITIONS[:, None] >> (2 * middle)) & 3) << (2 * state)
+COMPOSE = COMPOSE.ravel()
+
+
+def transition_table(min_count: int, max_count: int) -> np.ndarray:
+    """
+    Returns the packed transition for every (one step, two step) count that
+    does not include the cells to the left
+    """
+    count1 = np.arange(9)[:, None, None]
+    count2 = np.arange(14)[None, :, None]
+
+    filled = ((count1 + LEFT) >= min_count) | ((count2 + LEFT + FAR_LEFT) <= max_count)
+    next_states = filled * 2 + LEFT
+
+    return (next_states << (2 * STATES)).sum(axis=2)
+
+
+def smooth_step(cave: np.ndarray, min_count: int, max_count: int) -> np.ndarray:
+    """
+    Runs one cave smoothing step over a (width, height) array of cave cells
+
+    Matches the original cell by cell loop exactly, including that it updated
+    the map in place: a cell sees the new values of the rows above it and of the
+    cells to its left, and the old values everywhere else. Everything except the
+    left neighbors is summed for a whole row at once. The left neighbors make
+    each row a small state machine, which is resolved with a prefix scan over
+    the per-cell transitions instead of a Python loop.
+
+    A cell becomes cave when its 3x3 count is at least min_count or its two step
+    count is at most max_count. The outer border is never changed.
+    """
+    width, height = cave.shape
+    table = transition_table(min_count=min_count, max_count=max_count)
+
+    # columns are padded by two so every offset in a row is a plain slice
+    grid = np.zeros((height, width + 4), dtype=np.int8)
+    grid[:, 2:-2] = cave.T
+
+    def three_wide(rows: np.ndarray) -> np.ndarray:
+        return rows[..., 2:-4] + rows[..., 3:-3] + rows[..., 4:-2]
+
+    # the row below and the cell itself plus its right neighbor are always old values
+    old = grid[:, 3:-3] + grid[:, 4:-2]
+    old[:-1] += three_wide(grid[1:])
+    old_two_step = old.copy()
+    old_two_step[:-1] += grid[1:, 1:-5]
+
+    above = np.zeros(width - 2, dtype=np.int8)
+
+    for y in range(1, height - 1):
+        previous_row = grid[y - 1]
+        previous = three_wide(previous_row)
+        count1 = old[y] + previous
+        count2 = old_two_step[y] + previous + previous_row[1:-5] + above
+
+        transitions = table[count1, count2]
+        step = 1
+        while step < len(transitions):
+            transitions[step:] = COMPOSE.take((transitions[step:] << 8) | transitions[:-step])
+            step *= 2
+
+        start = grid[y, 2] * 2
+        grid[y, 3:-3] = ((transitions >> (2 * start)) & 3) >> 1
+        above = previous
+
+    return grid[:, 2:-2].T != 0
@@ -1,46 +1,157 @@
 from __future__ import annotations
 
-import random
-from typing import Iterator, TYPE_CHECKING, Optional
+from typing import Iterator, TYPE_CHECKING, Optional, Tuple, Union
 
 import numpy as np
-import tcod
-from bearlibterminal import terminal as blt
-from tcod.map import Map
 
-from map_objects.point import Point
-from map_objects.tile import Tile, TileType
+from map_objects.navigation import NavigationMap
+from map_objects.point import Point, PointTable
+from map_objects.tile import (
+    EXPLORED,
+    LABEL_FLAGS,
+    Tile,
+    TileType,
+    TRANSPARENT,
+    VISIBLE,
+    WALKABLE,
+    tile_key,
+)
 from rect import Rect
 
 if TYPE_CHECKING:
+    import tcod.map
+
     from camera import Camera
 
 FILLED = 1
 EMPTY = 0
 
+ONE_STEP_OFFSETS = [(j, i) for i in [-1, 0, 1] for j in [-1, 0, 1]]
+
+
+class GameMap:
+    """
+    The tiles of one floor, stored as two (width, height) uint8 arrays
+
+    tile_map holds the TileType value of every cell and flags its WALKABLE,
+    TRANSPARENT, EXPLORED and VISIBLE bits. The bool layers are read through
+    properties and written with set_flag or place_tiles, which take a mask or
+    slices so whole areas change in one operation. revision goes up with every
+    write that can change which cells are transparent, so data derived from
+    them, like a cached field of view, can tell when it has gone stale.
+    """
 
-class GameMap(tcod.map.Map):
     def __init__(self, width: int, height: int, dungeon_level: int = 1):
-        super(GameMap, self).__init__(width=width, height=height, order="F")
+        self.width: int = width
+        self.height: int = height
 
-        self.cave_map: np.array = np.zeros((width, height), order="F")
-        self._explored: np.array = np.full((width, height), order="F", fill_value=False)
-        self.tile_map: np.array = np.zeros((width, height), order="F")
+        self.tile_map: np.ndarray = np.zeros((width, height), dtype=np.uint8, order="F")
+        self.flags: np.ndarray = np.zeros((width, height), dtype=np.uint8, order="F")
 
         self.dungeon_level: int = dungeon_level
+        self.revision: int = 0
+        self.points: PointTable = PointTable(width=width, height=height)
+
+        # (left, right, top, bottom) bounds, right and bottom exclusive
+        self.visible_window: Optional[Tuple[int, int, int, int]] = None
+        self.explored_window: Optional[Tuple[int, int, int, int]] = None
+        self._navigation: Optional[NavigationMap] = None
+
+    @property
+    def navigation(self) -> NavigationMap:
+        """ Pathfinding data for this floor, built the first time a monster needs it """
+        if self._navigation is None:
+            self._navigation = NavigationMap(self)
+        return self._navigation
+
+    def has_flag(self, flag: int) -> np.ndarray:
+        """ Returns a read only bool array of the cells with flag set """
+        layer = (self.flags & flag) != 0
+        layer.flags.writeable = False
+        return layer
+
+    def set_flag(self, flag: int, value: Union[bool, np.ndarray], where=np.s_[:, :]):
+        """ Sets or clears flag on the cells selected by where, a mask or slices """
+        flags = self.flags[where]
+        self.flags[where] = np.where(value, flags | flag, flags & ~np.uint8(flag))
+        if flag & TRANSPARENT:
+            self.revision += 1
+
+    @property
+    def walkable(self) -> np.ndarray:
+        return self.has_flag(WALKABLE)
+
+    @property
+    def transparent(self) -> np.ndarray:
+        return self.has_flag(TRANSPARENT)
+
+    @property
+    def explored(self) -> np.ndarray:
+        return self.has_flag(EXPLORED)
+
+    @property
+    def visible(self) -> np.ndarray:
+        return self.has_flag(VISIBLE)
+
+    @property
+    def cave_map(self) -> np.ndarray:
+        return (self.tile_map == TileType.CAVE.value).astype(np.uint8)
 
     def is_explored(self, point: Point) -> bool:
-        return self._explored[point.x, point.y]
+        return bool(self.flags[point.x, point.y] & EXPLORED)
 
     def explore(self, point: Point) -> None:
-        self._explored[point.x, point.y] = True
+        self.flags[point.x, point.y] |= EXPLORED
+        self._widen_explored_window((point.x, point.x + 1, point.y, point.y + 1))
+
+    def _widen_explored_window(self, window: Tuple[int, int, int, int]):
+        if self.explored_window is not None:
+            left, right, top, bottom = self.explored_window
+            window = (
+                min(left, window[0]), max(right, window[1]), min(top, window[2]), max(bottom, window[3])
+            )
+        self.explored_window = window
+
+    def take_explored_window(self) -> Optional[Tuple[int, int, int, int]]:
+        """ Returns the bounds of all cells explored since the last call, or None if there were none """
+        window, self.explored_window = self.explored_window, None
+        return window
+
+    def update_fov(self, fov: np.ndarray, center: Optional[Point] = None, radius: int = 0):
+        """
+        Makes the cells of fov, and only those, visible, and marks them explored
+
+        Given the center and radius fov was computed with, only the square the
+        fov can reach and the square visible before are written.
+        """
+        if center is None or radius <= 0:
+            window = (0, self.width, 0, self.height)
+        else:
+            window = (
+                max(center.x - radius, 0),
+                min(center.x + radius + 1, self.width),
+                max(center.y - radius, 0),
+                min(center.y + radius + 1, self.height),
+            )
+
+        if self.visible_window is None:
+            self.flags &= ~np.uint8(VISIBLE)
+        else:
+            left, right, top, bottom = self.visible_window
+            self.flags[left:right, top:bottom] &= ~np.uint8(VISIBLE)
+
+        left, right, top, bottom = window
+        self.flags[left:right, top:bottom] |= fov[left:right, top:bottom] * np.uint8(VISIBLE | EXPLORED)
+
+        self.visible_window = window
+        self._widen_explored_window(window)
 
     @property
     def tiles(self) -> Iterator[Tile]:
         for i in range(self.height):
             for j in range(self.width):
-                point = Point(x=j, y=i)
-                if self.cave_map[j, i]:
+                point = self.points.get(j, i)
+                if self.tile_map[j, i] == TileType.CAVE.value:
                     label = TileType.CAVE
                 else:
                     label = TileType.FLOOR
@@ -48,26 +159,21 @@ class GameMap(tcod.map.Map):
                 yield tile
 
     def is_blocked(self, point: Point) -> bool:
-        if not self.walkable[point.x, point.y]:
+        if not self.flags[point.x, point.y] & WALKABLE:
             return True
 
         return False
 
     def create_room(self, room: Rect):
-        for x in range(room.x + 1, room.right):
-            for y in range(room.y + 1, room.bottom):
-                self.walkable[x, y] = True
-                self.transparent[x, y] = True
+        self.set_flag(
+            WALKABLE | TRANSPARENT, True, np.s_[room.x + 1 : room.right, room.y + 1 : room.bottom]
+        )
 
     def create_h_tunnel(self, x1: int, x2: int, y):
-        for x in range(min(x1, x2), max(x1, x2) + 1):
-            self.walkable[x, y] = True
-            self.transparent[x, y] = True
+        self.set_flag(WALKABLE | TRANSPARENT, True, np.s_[min(x1, x2) : max(x1, x2) + 1, y])
 
     def create_v_tunnel(self, x: int, y1: int, y2: int):
-        for y in range(min(y1, y2), max(y1, y2) + 1):
-            self.walkable[x, y] = True
-            self.transparent[x, y] = True
+        self.set_flag(WALKABLE | TRANSPARENT, True, np.s_[x, min(y1, y2) : max(y1, y2) + 1])
 
     def in_bounds(self, point: Point) -> bool:
         return 0 <= point.x < self.width and 0 <= point.y < self.height
@@ -82,7 +188,7 @@ class GameMap(tcod.map.Map):
                 neighbor = Point(x=point.x + j, y=point.y + i)
                 if not self.in_bounds(neighbor):
                     continue
-                if self.cave_map[neighbor.x, neighbor.y]:
+                if self.tile_map[neighbor.x, neighbor.y] == TileType.CAVE.value:
                     count += 1
 
         return count
@@ -96,7 +202,7 @@ class GameMap(tcod.map.Map):
                 point = Point(x=center.x + j, y=center.y + i)
                 if not self.in_bounds(point=point):
                     continue
-                if self.cave_map[point.x, point.y]:
+                if self.tile_map[point.x, point.y] == TileType.CAVE.value:
                     count += 1
 
         return count
@@ -112,56 +218,90 @@ class GameMap(tcod.map.Map):
                 point = Point(x=center.x + j, y=center.y + i)
                 if not self.in_bounds(point):
                     continue
-                if self.cave_map[point.x, point.y]:
+                if self.tile_map[point.x, point.y] == TileType.CAVE.value:
                     count += 1
 
         return count
 
+    def count_one_step_neighbor_map(self) -> np.ndarray:
+        """ Array version of count_one_step_neighbors for every cell at once """
+        # cells outside the map are padded as empty, matching the in_bounds check above
+        padded = np.pad(self.tile_map == TileType.CAVE.value, 1).astype(np.int8)
+        counts = np.zeros((self.width, self.height), dtype=np.int8, order="F")
+
+        for j, i in ONE_STEP_OFFSETS:
+            counts += padded[1 + j : 1 + j + self.width, 1 + i : 1 + i + self.height]
+
+        return counts
+
     def place_tile(self, point: Point, tile: Tile):
         x, y = point
-        self.walkable[x, y] = tile.walkable
-        self.transparent[x, y] = tile.transparent
         self.tile_map[x, y] = tile.label.value
-
-        if tile.label == TileType.CAVE:
-            self.cave_map[x, y] = FILLED
-        elif tile.label == TileType.FLOOR:
-            self.cave_map[x, y] = EMPTY
+        self.flags[x, y] = (
+            self.flags[x, y] & ~np.uint8(WALKABLE | TRANSPARENT)
+            | WALKABLE * tile.walkable
+            | TRANSPARENT * tile.transparent
+        )
+        self.revision += 1
+
+    def place_tiles(self, mask, label: TileType):
+        """ Bulk version of place_tile for every cell selected by mask, a bool mask or slices """
+        self.tile_map[mask] = label.value
+        self.flags[mask] = self.flags[mask] & ~np.uint8(WALKABLE | TRANSPARENT) | LABEL_FLAGS[label.value]
+        self.revision += 1
 
     def get_tile(self, point: Point, fov_map: tcod.map.Map) -> Optional[Tile]:
         if not self.in_bounds(point):
             return None
 
-        label = TileType(self.tile_map[point.x, point.y])
-        tile = Tile.from_label(point=point, label=label)
+        flags = self.flags[point.x, point.y]
+        tile = Tile(
+            x=point.x,
+            y=point.y,
+            label=TileType(self.tile_map[point.x, point.y]),
+            walkable=bool(flags & WALKABLE),
+            transparent=bool(flags & TRANSPARENT),
+        )
+        tile.explored = bool(flags & EXPLORED)
         tile.visible = fov_map.fov[point.x, point.y]
         return tile
 
-    def render(self, fov_map: tcod.map.Map, camera: Camera):
-        for row, y in enumerate(range(camera.top, camera.bottom)):
-            for col, x in enumerate(range(camera.left, camera.right)):
-                point = Point(x, y)
-                if not self.in_bounds(point):
-                    continue
+    def camera_window(self, layer: np.ndarray, camera: Camera) -> np.ndarray:
+        """ Returns a copy of the part of layer under the camera window, zero where it runs off the map """
+        window = np.zeros((camera.right - camera.left, camera.bottom - camera.top), dtype=layer.dtype)
+
+        left, right = max(camera.left, 0), min(camera.right, self.width)
+        top, bottom = max(camera.top, 0), min(camera.bottom, self.height)
+        if left < right and top < bottom:
+            window[
+                left - camera.left : right - camera.left, top - camera.top : bottom - camera.top
+            ] = layer[left:right, top:bottom]
+
+        return window
 
-                tile = self.get_tile(point, fov_map=fov_map)
-                tile.visible = fov_map.fov[x, y]
-                if tile.visible:
-                    self.explore(point)
-                tile.explored = self.is_explored(point)
+    def view_masks(self, camera: Camera) -> Tuple[np.ndarray, np.ndarray]:
+        """ Returns the visible and the remembered, explored but out of sight, cells of the camera window """
+        flags = self.camera_window(self.flags, camera)
+        visible = (flags & VISIBLE) != 0
+        return visible, ((flags & EXPLORED) != 0) & ~visible
 
-                if tile.explored:
-                    blt.printf(
-                        x=col * 2,
-                        y=row * 2,
-                        s=f"[font=map][color={tile.color}]{tile.char}[/color][/font]",
-                    )
+    def view_keys(self, camera: Camera) -> np.ndarray:
+        """
+        Returns what each cell of the camera window shows as a small integer:
+        0 for cells that are unexplored or off the map, their tile_key otherwise
+
+        Which cells are visible and explored comes from the last update_fov.
+        """
+        flags = self.camera_window(self.flags, camera)
+        labels = self.camera_window(self.tile_map, camera).astype(np.int16)
+
+        return np.where(flags & EXPLORED, tile_key(labels, (flags & VISIBLE) != 0), 0).astype(np.int16)
 
     def to_json(self) -> dict:
         json_data = {
             "width": self.width,
             "height": self.height,
-            "explored": self._explored.tolist(),
+            "explored": self.explored.tolist(),
             "tile_map": self.tile_map.tolist(),
             "dungeon_level": self.dungeon_level
         }
@@ -169,18 +309,23 @@ class GameMap(tcod.map.Map):
         return json_data
 
     @classmethod
-    def from_json(cls, json_data) -> GameMap:
-        game_map = cls(width=json_data["width"], height=json_data["height"])
-
-        for i in range(game_map.height):
-            for j in range(game_map.width):
-                point = Point(x=j, y=i)
-                label = TileType(int(json_data["tile_map"][j][i]))
-                tile = Tile.from_label(point=point, label=label)
-                game_map.place_tile(point=point, tile=tile)
-                if json_data["explored"][j][i]:
-                    game_map.explore(point)
+    def from_tile_map(
+        cls, tile_map: np.ndarray, dungeon_level: int = 1, explored: Optional[np.ndarray] = None
+    ) -> GameMap:
+        width, height = tile_map.shape
+        game_map = cls(width=width, height=height, dungeon_level=dungeon_level)
 
-        game_map.dungeon_level = json_data["dungeon_level"]
+        game_map.tile_map[:] = tile_map
+        game_map.flags[:] = LABEL_FLAGS[game_map.tile_map]
+        if explored is not None:
+            game_map.set_flag(EXPLORED, explored)
 
         return game_map
+
+    @classmethod
+    def from_json(cls, json_data) -> GameMap:
+        return cls.from_tile_map(
+            tile_map=np.array(json_data["tile_map"], dtype=np.uint8),
+            dungeon_level=json_data["dungeon_level"],
+            explored=np.array(json_data["explored"], dtype=bool),
+        )
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from typing import Tuple
+
+import numpy as np
+
+
+def label_regions(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Labels the 8-connected regions of True cells in a (width, height) mask
+
+    The mask is split into horizontal runs of True cells, runs that touch a run
+    in the row above are joined, and the joined runs are painted back into a
+    label array. Regions are numbered from 1 in the order their first cell is
+    reached scanning row by row, the same order the old flood fill found them.
+
+    Returns:
+        labels: int array shaped like mask, 0 for cells outside any region
+        sizes: number of cells per label, sizes[0] is always 0
+    """
+    width, height = mask.shape
+    stride = width + 2
+
+    padded = np.zeros((height, stride), dtype=np.int8)
+    padded[:, 1:-1] = mask.T
+    edges = np.diff(padded, axis=1)
+
+    # np.nonzero walks row by row, so runs come out sorted by y then x
+    run_y, run_start = np.nonzero(edges == 1)
+    _, run_end = np.nonzero(edges == -1)
+    run_count = len(run_y)
+
+    labels = np.zeros((height, width), dtype=np.int32)
+    if run_count == 0:
+        return labels.T, np.zeros(1, dtype=np.int64)
+
+    # a run touches a run in the row above when their x ranges overlap or meet diagonally
+    start_keys = run_y * stride + run_start
+    end_keys = run_y * stride + run_end
+    first = np.searchsorted(end_keys, start_keys - stride, side="left")
+    last = np.searchsorted(start_keys, end_keys - stride, side="right")
+    touching = np.clip(last - first, 0, None)
+
+    lower = np.repeat(np.arange(run_count), touching)
+    upper = np.repeat(first, touching) + (
+        np.arange(touching.sum()) - np.repeat(np.cumsum(touching) - touching, touching)
+    )
+
+    roots = _connect(run_count, lower, upper)
+
+    # roots are the lowest run index of each region, so sorting them keeps scan order
+    _, run_labels = np.unique(roots, return_inverse=True)
+    run_labels = run_labels + 1
+
+    lengths = run_end - run_start
+    cells = np.repeat(run_y * width + run_start - np.cumsum(lengths) + lengths, lengths)
+    cells += np.arange(lengths.sum())
+    labels.flat[cells] = np.repeat(run_labels, lengths)
+
+    sizes = np.bincount(run_labels, weights=lengths, minlength=run_labels.max() + 1)
+
+    return labels.T, sizes.astype(np.int64)
+
+
+def _connect(count: int, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """ Returns the lowest connected index for each of count nodes joined by edges a-b """
+    parent = np.arange(count)
+
+    while len(a):
+        root_a = parent[a]
+        root_b = parent[b]
+        if np.array_equal(root_a, root_b):
+            break
+
+        # hook the higher root onto the lower one, then flatten the trees
+        np.minimum.at(parent, np.maximum(root_a, root_b), np.minimum(root_a, root_b))
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+
+    return parent
@@ -1,8 +1,7 @@
 from __future__ import annotations
 
 import random
-from queue import Queue
-from typing import List, Dict
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 
@@ -11,14 +10,20 @@ from components import BasicMonster, Equippable, Fighter, Item, Stairs
 # from components.item import Item
 from constants import CONSTANTS
 from entity import Entity
+from entity_registry import EntityRegistry
 from equipment_slots import EquipmentSlots
 from game_messages import Message, MessageLog
 from item_functions import cast_confuse, cast_fireball, cast_lightning, heal
 from map_objects.point import Point
-from map_objects.game_map import GameMap
-from map_objects.tile import Tile
+from map_objects.point_array import PointArray
+from map_objects.cellular import smooth_step
+from map_objects.game_map import EMPTY, GameMap
+from map_objects.labelling import label_regions
+from map_objects.tile import Tile, TileType, TRANSPARENT, WALKABLE
+from profiler import PROFILER
 from random_utils import from_dungeon_level, random_choice_from_dict
 from render_functions import RenderLayer
+from rng import RandomStreams
 
 
 INITIAL_CHANCE = 0.4
@@ -32,17 +37,15 @@ MIN_CAVE_SIZE = 20
 
 
 class MapGenerator:
-    cave: List[Point]
+    cave: PointArray
 
-    def __init__(self, map_width: int, map_height: int):
+    def __init__(self, map_width: int, map_height: int, rng: Optional[RandomStreams] = None):
         self.game_map: GameMap = GameMap(width=map_width, height=map_height)
-        self.visited_map: np.array = np.full_like(
-            self.game_map.transparent, fill_value=False, order="F"
-        )
+        self.rng: RandomStreams = rng if rng is not None else RandomStreams()
 
     @property
     def player_start_point(self) -> Point:
-        return random.choice(self.cave)
+        return self.random_cave_point()
 
     @property
     def map_width(self):
@@ -67,19 +70,23 @@ class MapGenerator:
         )
 
     def generate_caves(self, width: int, height: int, entities: List[Entity]):
-        self.initialize_cave(width=width, height=height)
-        for _ in range(FIRST_STEP_REPEATS):
-            self.cave_smooth_step(min_count=FIRST_STEP_MIN, max_count=FIRST_STEP_MAX)
-        for _ in range(SECOND_STEP_REPEATS):
-            self.cave_smooth_step(min_count=SECOND_STEP_MIN, max_count=SECOND_STEP_MAX)
+        with PROFILER.phase("generate.initialize"):
+            self.initialize_cave(width=width, height=height)
+
+        with PROFILER.phase("generate.smooth"):
+            for _ in range(FIRST_STEP_REPEATS):
+                self.cave_smooth_step(min_count=FIRST_STEP_MIN, max_count=FIRST_STEP_MAX)
+            for _ in range(SECOND_STEP_REPEATS):
+                self.cave_smooth_step(min_count=SECOND_STEP_MIN, max_count=SECOND_STEP_MAX)
 
-        caves: List[List[Point]] = self.find_caves()
+        with PROFILER.phase("generate.caves"):
+            labels, sizes = self.find_caves()
 
-        cave: List[Point] = self.isolate_main_cave(caves)
-        self.cave = self.remove_small_walls(cave)
+            cave: np.ndarray = self.isolate_main_cave(labels=labels, sizes=sizes)
+            self.cave = PointArray(self.remove_small_walls(cave), points=self.game_map.points)
 
         stairs_component = Stairs(self.dungeon_level + 1)
-        point: Point = random.choice(self.cave)
+        point: Point = self.random_cave_point()
         down_stairs: Entity = Entity(position=point, char=">", color=Colors.WHITE, name="Stairs", render_order=RenderLayer.STAIRS, stairs=stairs_component)
         entities.append(down_stairs)
 
@@ -91,115 +98,79 @@ class MapGenerator:
     def dungeon_level(self, value: int):
         self.game_map.dungeon_level = value
 
-    def find_caves(self) -> List[List[Point]]:
-        caves: List[List[Point]] = list()
-        self.visited_map[:] = False
+    def find_caves(self) -> Tuple[np.ndarray, np.ndarray]:
+        """ Returns a label array of the open caves and the size of each label """
+        return label_regions(self.game_map.walkable)
 
-        for i in range(1, self.map_height - 1):
-            for j in range(1, self.map_width - 1):
-                point = Point(x=j, y=i)
-                wall = self.game_map.is_blocked(point)
-                visited = self.visited_map[j, i]
-                if visited or wall:
-                    continue
-
-                current_cave = self.explore_cave(start_point=point)
-                caves.append(current_cave)
+    def cave_smooth_step(self, min_count: int, max_count: int):
+        cave = smooth_step(
+            cave=self.game_map.cave_map != EMPTY, min_count=min_count, max_count=max_count
+        )
+        interior = np.full_like(cave, fill_value=False)
+        interior[1:-1, 1:-1] = True
 
-        return caves
+        self.game_map.place_tiles(mask=interior & cave, label=TileType.CAVE)
+        self.game_map.place_tiles(mask=interior & ~cave, label=TileType.FLOOR)
 
-    def explore_cave(self, start_point: Point) -> List[Point]:
-        cave: List[Point] = [start_point]
+    def initialize_cave(self, width: int, height: int):
+        game_map = GameMap(width=width, height=height)
+        game_map.set_flag(WALKABLE | TRANSPARENT, True)
 
-        unexplored = Queue()
-        unexplored.put(start_point)
-        self.visited_map[start_point.x, start_point.y] = True
+        # rolls are drawn in the same row by row order as the original cell loop
+        rolls = np.array([self.rng.map.random() for _ in range(width * height)])
+        cave = rolls.reshape((height, width)).T < INITIAL_CHANCE
+        cave[0, :] = True
+        cave[-1, :] = True
+        cave[:, 0] = True
+        cave[:, -1] = True
 
-        while not unexplored.empty():
-            current: Point = unexplored.get()
-            for neighbor in current.all_neighbors:
-                visited = self.visited_map[neighbor.x, neighbor.y]
-                blocked = self.game_map.is_blocked(point=neighbor)
-                if not visited and not blocked:
-                    unexplored.put(neighbor)
-                    cave.append(neighbor)
-                    self.visited_map[neighbor.x, neighbor.y] = True
+        game_map.place_tiles(mask=cave, label=TileType.CAVE)
 
-        return cave
+        self.game_map = game_map
 
-    def cave_smooth_step(self, min_count: int, max_count: int):
-        for i in range(1, self.map_height - 1):
-            for j in range(1, self.map_width - 1):
-                point = Point(x=j, y=i)
-                count1 = self.game_map.count_one_step_neighbors(center=point)
-                count2 = self.game_map.count_two_step_neighbors(center=point)
-
-                if count1 >= min_count:
-                    self.game_map.place_tile(point=point, tile=Tile.cave(point=point))
-                elif count2 <= max_count:
-                    self.game_map.place_tile(point=point, tile=Tile.cave(point=point))
-                else:
-                    self.game_map.place_tile(point=point, tile=Tile.floor(point=point))
+    def isolate_main_cave(self, labels: np.ndarray, sizes: np.ndarray) -> np.ndarray:
+        """ Fills in every cave but the largest and returns the (x, y) cells of the one left """
+        largest = np.argmax(sizes[1:]) + 1
+        self.game_map.place_tiles(mask=(labels != 0) & (labels != largest), label=TileType.CAVE)
 
-    def initialize_cave(self, width: int, height: int):
-        game_map = GameMap(width=width, height=height)
-        game_map.walkable[:] = True
-        game_map.transparent[:] = True
+        return np.argwhere(labels == largest)
 
-        for i in range(height):
-            for j in range(width):
-                point = Point(x=j, y=i)
-                if i == 0 or j == 0 or i == height - 1 or j == width - 1:
-                    game_map.place_tile(point, Tile.cave(point=point))
+    def remove_small_walls(self, cave: np.ndarray) -> np.ndarray:
+        # a wall with no other walls around it only counts itself
+        small_walls = ~self.game_map.walkable & (self.game_map.count_one_step_neighbor_map() == 1)
+        small_walls[[0, -1], :] = False
+        small_walls[:, [0, -1]] = False
 
-                if random.random() < INITIAL_CHANCE:
-                    game_map.place_tile(point, Tile.cave(point=point))
+        self.game_map.place_tiles(mask=small_walls, label=TileType.FLOOR)
 
-        self.game_map = game_map
+        return np.concatenate([cave, np.argwhere(small_walls)])
 
-    def isolate_main_cave(self, caves: List[List[Point]]) -> List[Point]:
-        if len(caves) == 1:
-            return caves[0]
-
-        cave_sort: List[List[Point]] = sorted(caves, key=len, reverse=True)
-        largest = cave_sort[0]
-        for cave in cave_sort[1:]:
-            for point in cave:
-                self.game_map.place_tile(point, tile=Tile.cave(point=point))
-        return largest
-
-    def remove_small_walls(self, cave: List[Point]) -> List[Point]:
-        for i in range(1, self.map_height - 1):
-            for j in range(1, self.map_width - 1):
-                point = Point(x=j, y=i)
-                wall = self.game_map.is_blocked(point)
-                if not wall:
-                    continue
-                if self.game_map.count_one_step_neighbors(point) == 1:
-                    cave.append(point)
-                    self.game_map.place_tile(point=point, tile=Tile.floor(point=point))
-        return cave
+    def random_cave_point(self, rng: Optional[random.Random] = None) -> Point:
+        if rng is None:
+            rng = self.rng.map
+        return rng.choice(self.cave)
 
     def find_tile(self, point: Point) -> Tile:
-        label = self.game_map.cave_map[point.x, point.y]
-        if label == "CAVE":
+        label = self.game_map.tile_map[point.x, point.y]
+        if label == TileType.CAVE.value:
             tile = Tile.cave(point)
-        elif label == "FLOOR":
+        elif label == TileType.FLOOR.value:
             tile = Tile.floor(point)
         else:
             tile = Tile.empty(point)
         return tile
 
+    @PROFILER.timed("generate.entities")
     def place_entities(
         self,
-        entities: List[Entity],
+        entities: EntityRegistry,
         min_monsters: int,
     ):
         max_monsters: int = from_dungeon_level(table=[[10, 1], [14, 4], [18, 6]], dungeon_level=self.dungeon_level)
         max_items: int = from_dungeon_level(table=[[8, 1], [16, 4]], dungeon_level=self.dungeon_level)
 
-        number_of_monsters: int = random.randint(min_monsters, max_monsters)
-        number_of_items: int = random.randint(1, max_items)
+        number_of_monsters: int = self.rng.spawns.randint(min_monsters, max_monsters)
+        number_of_items: int = self.rng.loot.randint(1, max_items)
 
         monster_chances: Dict[str, int] = {
             "orc": 80,
@@ -216,10 +187,10 @@ class MapGenerator:
         }
 
         for i in range(number_of_monsters):
-            point: Point = random.choice(self.cave)
+            point: Point = self.random_cave_point(rng=self.rng.spawns)
 
-            if not any([entity for entity in entities if entity.position == point]):
-                monster_choice = random_choice_from_dict(monster_chances)
+            if not entities.at(point):
+                monster_choice = random_choice_from_dict(monster_chances, rng=self.rng.spawns)
                 if monster_choice == "orc":
                     fighter_component: Fighter = Fighter(hp=20, defense=0, power=4, xp=35)
                     ai_component: BasicMonster = BasicMonster()
@@ -250,10 +221,10 @@ class MapGenerator:
                 entities.append(monster)
 
         for i in range(number_of_items):
-            point: Point = random.choice(self.cave)
+            point: Point = self.random_cave_point(rng=self.rng.loot)
 
-            if not any([entity for entity in entities if entity.position == point]):
-                item_choice: str = random_choice_from_dict(item_chances)
+            if not entities.at(point):
+                item_choice: str = random_choice_from_dict(item_chances, rng=self.rng.loot)
 
                 if item_choice == "healing_potion":
                     item_component: Item = Item(use_function=heal, amount=40)
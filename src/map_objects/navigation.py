@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional, TYPE_CHECKING
+
+import numpy as np
+import tcod.path
+
+from map_objects.point import Point
+
+if TYPE_CHECKING:
+    from entity import Entity
+    from map_objects.game_map import GameMap
+
+
+DIAGONAL_COST = 1.41
+
+# integer step costs for the chase map, keeping roughly the same diagonal ratio
+CHASE_CARDINAL_COST = 2
+CHASE_DIAGONAL_COST = 3
+UNREACHABLE = np.iinfo(np.int32).max
+
+
+class NavigationMap:
+    """
+    Pathfinding data for one floor, shared by every monster on it
+
+    Keeps a cost array built once from the map's walkable layer, with the cells
+    of blocking entities zeroed out on top of it. The overlay is updated only for
+    the entities that moved, and a single A* pathfinder reads the cost array in
+    place, so a path query never copies the map.
+    """
+
+    def __init__(self, game_map: GameMap):
+        self.walkable_cost: np.ndarray = np.asfortranarray(game_map.walkable, dtype=np.int8)
+        self.blockers: np.ndarray = np.zeros_like(self.walkable_cost, dtype=np.int16)
+        self.cost: np.ndarray = self.walkable_cost.copy(order="F")
+        self.positions: Dict[Entity, Point] = {}
+
+        self.astar: tcod.path.AStar = tcod.path.AStar(self.cost, diagonal=DIAGONAL_COST)
+
+        self.chase_goal: Optional[Point] = None
+        self.chase_distance: Optional[np.ndarray] = None
+
+    def add_blocker(self, point: Point):
+        self.blockers[point.x, point.y] += 1
+        self.cost[point.x, point.y] = 0
+
+    def remove_blocker(self, point: Point):
+        self.blockers[point.x, point.y] -= 1
+        self._reset_cost(point)
+
+    def _reset_cost(self, point: Point):
+        if self.blockers[point.x, point.y]:
+            self.cost[point.x, point.y] = 0
+        else:
+            self.cost[point.x, point.y] = self.walkable_cost[point.x, point.y]
+
+    def update(self, entity: Entity):
+        """ Moves the entity's blocker to where it is now, or drops it if it no longer blocks """
+        old: Optional[Point] = self.positions.get(entity)
+        new: Optional[Point] = entity.position if entity.blocks else None
+
+        if old == new:
+            return
+
+        if old is not None:
+            self.remove_blocker(old)
+            del self.positions[entity]
+
+        if new is not None:
+            self.add_blocker(new)
+            self.positions[entity] = new
+
+    def sync(self, entities: Iterable[Entity]):
+        """ Applies the changes since the last sync, touching only entities that moved """
+        present = set()
+        for entity in entities:
+            present.add(entity)
+            self.update(entity)
+
+        for entity in [entity for entity in self.positions if entity not in present]:
+            self.remove_blocker(self.positions.pop(entity))
+
+    def path(self, start: Point, goal: Point) -> List[Point]:
+        """
+        Returns the steps from start to goal, not including start
+
+        The start and goal cells are usually held by the mover and its target,
+        so they are opened up for the duration of the query.
+        """
+        self.cost[start.x, start.y] = self.walkable_cost[start.x, start.y]
+        self.cost[goal.x, goal.y] = self.walkable_cost[goal.x, goal.y]
+
+        path = self.astar.get_path(start.x, start.y, goal.x, goal.y)
+
+        self._reset_cost(start)
+        self._reset_cost(goal)
+
+        return [Point(x=x, y=y) for x, y in path]
+
+    def chase_map(self, goal: Point) -> np.ndarray:
+        """
+        Returns the walking distance from every cell to goal
+
+        The distances ignore blocking entities, so one map serves every monster
+        chasing the same goal. It is only recomputed when the goal moves.
+        """
+        if goal != self.chase_goal:
+            distance = np.full_like(self.walkable_cost, fill_value=UNREACHABLE, dtype=np.int32)
+            distance[goal.x, goal.y] = 0
+            tcod.path.dijkstra2d(
+                distance,
+                self.walkable_cost,
+                cardinal=CHASE_CARDINAL_COST,
+                diagonal=CHASE_DIAGONAL_COST,
+                out=distance,
+            )
+
+            self.chase_goal = goal
+            self.chase_distance = distance
+
+        return self.chase_distance
+
+    def downhill_step(self, start: Point, goal: Point) -> Optional[Point]:
+        """
+        Returns the free neighbor of start that is closest to goal on the chase map,
+        or None if no free neighbor gets any closer
+        """
+        distance = self.chase_map(goal)
+        x, y = start
+
+        window = np.where(
+            self.cost[x - 1 : x + 2, y - 1 : y + 2] > 0,
+            distance[x - 1 : x + 2, y - 1 : y + 2],
+            UNREACHABLE,
+        )
+        i, j = np.unravel_index(np.argmin(window), window.shape)
+
+        if window[i, j] >= distance[x, y]:
+            return None
+
+        return Point(x=x + int(i) - 1, y=y + int(j) - 1)
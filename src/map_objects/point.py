@@ -2,9 +2,8 @@ from __future__ import annotations
 
 import math
 from collections import namedtuple
-from dataclasses import dataclass
 from enum import Enum
-from typing import Generator, Iterator
+from typing import Iterator, List, Optional
 
 
 POINT = namedtuple("POINT", ["x", "y"])
@@ -22,20 +21,57 @@ class Direction(Enum):
     ORIGIN = POINT(0, 0)
 
 
-@dataclass(init=True, repr=True, eq=True, order=False, frozen=True)
+# offsets of the eight neighbors in the order all_neighbors returns them, and of the four direct ones
+NEIGHBOR_OFFSETS = tuple(Direction[name].value for name in ("N", "NE", "E", "SE", "S", "SW", "W", "NW"))
+DIRECT_OFFSETS = tuple(Direction[name].value for name in ("N", "E", "S", "W"))
+
+
+_set_attribute = object.__setattr__
+
+
 class Point:
     """
     A simple container to represent a single point in the map's grid
     added functionality for adding, subtracting, or comparing equality of two points
     can be iterated to get x- and y-coordinates
 
+    Points are created all the time, so this is a plain slotted class rather
+    than a frozen dataclass. They are shared and used as dict keys, so
+    assigning to a point raises AttributeError.
+
     Args:
         x- and y-coordinate for the point
     """
 
+    __slots__ = ("x", "y")
+
     x: int
     y: int
 
+    def __init__(self, x: int, y: int):
+        _set_attribute(self, "x", x)
+        _set_attribute(self, "y", y)
+
+    def __setattr__(self, name: str, value):
+        raise AttributeError(f"Point is immutable, cannot set {name}")
+
+    def __delattr__(self, name: str):
+        raise AttributeError(f"Point is immutable, cannot delete {name}")
+
+    def __reduce__(self):
+        return self.__class__, (self.x, self.y)
+
+    def __eq__(self, other) -> bool:
+        if other.__class__ is not Point:
+            return NotImplemented
+        return self.x == other.x and self.y == other.y
+
+    def __hash__(self) -> int:
+        return hash((self.x, self.y))
+
+    def __repr__(self) -> str:
+        return f"Point(x={self.x!r}, y={self.y!r})"
+
     def __add__(self, other: "Point") -> "Point":
         return Point(self.x + other.x, self.y + other.y)
 
@@ -49,44 +85,43 @@ class Point:
         return f"({self.x}, {self.y})"
 
     def __iter__(self) -> Iterator[int]:
-        yield self.x
-        yield self.y
+        return iter((self.x, self.y))
 
     @property
     def NW(self) -> "Point":
-        return self._direction(Direction.NW.value)
+        return Point(self.x - 1, self.y + 1)
 
     @property
     def N(self) -> "Point":
-        return self._direction(Direction.N.value)
+        return Point(self.x, self.y + 1)
 
     @property
     def NE(self) -> "Point":
-        return self._direction(Direction.NE.value)
+        return Point(self.x + 1, self.y + 1)
 
     @property
     def W(self) -> "Point":
-        return self._direction(Direction.W.value)
+        return Point(self.x - 1, self.y)
 
     @property
     def E(self) -> "Point":
-        return self._direction(Direction.E.value)
+        return Point(self.x + 1, self.y)
 
     @property
     def SW(self) -> "Point":
-        return self._direction(Direction.SW.value)
+        return Point(self.x - 1, self.y - 1)
 
     @property
     def S(self) -> "Point":
-        return self._direction(Direction.S.value)
+        return Point(self.x, self.y - 1)
 
     @property
     def SE(self) -> "Point":
-        return self._direction(Direction.SE.value)
+        return Point(self.x + 1, self.y - 1)
 
     @property
     def ORIGIN(self) -> "Point":
-        return self._direction(Direction.ORIGIN.value)
+        return Point(self.x, self.y)
 
     def _direction(self, point) -> "Point":
         return Point(self.x + point.x, self.y + point.y)
@@ -95,24 +130,45 @@ class Point:
     #     return Point(abs(self.x - point.x), abs(self.y - point.y))
 
     @property
-    def all_neighbors(self) -> Generator[Point]:
-        for direction in [
-            self.N,
-            self.NE,
-            self.E,
-            self.SE,
-            self.S,
-            self.SW,
-            self.W,
-            self.NW,
-        ]:
-            yield direction
+    def all_neighbors(self) -> List[Point]:
+        x, y = self.x, self.y
+        return [Point(x + dx, y + dy) for dx, dy in NEIGHBOR_OFFSETS]
 
     @property
-    def direct_neighbors(self) -> Point:
-        for direction in [self.N, self.E, self.S, self.W]:
-            yield direction
+    def direct_neighbors(self) -> List[Point]:
+        x, y = self.x, self.y
+        return [Point(x + dx, y + dy) for dx, dy in DIRECT_OFFSETS]
 
     def distance_to(self, p2) -> float:
-        x, y = self - p2
+        x, y = self.x - p2.x, self.y - p2.y
         return math.sqrt(x ** 2 + y ** 2)
+
+
+class PointTable:
+    """
+    One shared Point for every cell of a width by height grid
+
+    A point is made the first time its cell is asked for and handed out again
+    after that, so code that walks the map over and over does not allocate a
+    new Point per cell each time. Coordinates off the grid get a fresh Point.
+    """
+
+    __slots__ = ("width", "height", "columns")
+
+    def __init__(self, width: int, height: int):
+        self.width: int = width
+        self.height: int = height
+        self.columns: List[Optional[List[Optional[Point]]]] = [None] * width
+
+    def get(self, x: int, y: int) -> Point:
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return Point(x, y)
+
+        column = self.columns[x]
+        if column is None:
+            column = self.columns[x] = [None] * self.height
+
+        point = column[y]
+        if point is None:
+            point = column[y] = Point(x, y)
+        return point
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from typing import Iterator, Optional, Union
+
+import numpy as np
+
+from map_objects.point import DIRECT_OFFSETS, NEIGHBOR_OFFSETS, Point, PointTable
+
+
+class PointArray:
+    """
+    Many points at once, as an (N, 2) array of x and y coordinates
+
+    Arithmetic, distances and neighbors work on the whole array without making
+    a Point per row. Indexing with an int or iterating still hands out Points,
+    the shared ones of points when the array was given a PointTable.
+    """
+
+    __slots__ = ("coordinates", "points")
+
+    def __init__(self, coordinates, points: Optional[PointTable] = None):
+        self.coordinates: np.ndarray = np.asarray(coordinates, dtype=np.int64).reshape(-1, 2)
+        self.points: Optional[PointTable] = points
+
+    @classmethod
+    def from_mask(cls, mask: np.ndarray, points: Optional[PointTable] = None) -> PointArray:
+        """ Returns the cells where mask is True, ordered by x and then y """
+        return cls(np.argwhere(mask), points=points)
+
+    @property
+    def x(self) -> np.ndarray:
+        return self.coordinates[:, 0]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self.coordinates[:, 1]
+
+    def __len__(self) -> int:
+        return len(self.coordinates)
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        return self.coordinates if dtype is None else self.coordinates.astype(dtype)
+
+    def point(self, x: int, y: int) -> Point:
+        if self.points is None:
+            return Point(x, y)
+        return self.points.get(x, y)
+
+    def __getitem__(self, index) -> Union[Point, PointArray]:
+        if isinstance(index, (int, np.integer)):
+            x, y = self.coordinates[index].tolist()
+            return self.point(x, y)
+        return PointArray(self.coordinates[index], points=self.points)
+
+    def __iter__(self) -> Iterator[Point]:
+        for x, y in self.coordinates.tolist():
+            yield self.point(x, y)
+
+    def __contains__(self, point: Point) -> bool:
+        return bool(((self.coordinates[:, 0] == point.x) & (self.coordinates[:, 1] == point.y)).any())
+
+    def _offsets(self, other) -> np.ndarray:
+        if isinstance(other, PointArray):
+            return other.coordinates
+        if isinstance(other, Point):
+            return np.array([other.x, other.y])
+        return np.asarray(other)
+
+    def __add__(self, other) -> PointArray:
+        return PointArray(self.coordinates + self._offsets(other), points=self.points)
+
+    def __sub__(self, other) -> PointArray:
+        return PointArray(self.coordinates - self._offsets(other), points=self.points)
+
+    def __repr__(self) -> str:
+        return f"PointArray({self.coordinates.tolist()!r})"
+
+    def distance_to(self, point: Point) -> np.ndarray:
+        """ Returns the distance of every point to point, like Point.distance_to """
+        offsets = self.coordinates - (point.x, point.y)
+        return np.sqrt(np.einsum("ij,ij->i", offsets, offsets))
+
+    def neighbors(self, direct: bool = False) -> PointArray:
+        """
+        Returns the eight neighbors of every point, or the four direct ones, as
+        all_neighbors and direct_neighbors order them, one point after the other
+        """
+        offsets = np.array(DIRECT_OFFSETS if direct else NEIGHBOR_OFFSETS)
+        return PointArray(self.coordinates[:, np.newaxis, :] + offsets, points=self.points)
+
+    def in_bounds(self, width: int, height: int) -> np.ndarray:
+        x, y = self.coordinates.T
+        return (0 <= x) & (x < width) & (0 <= y) & (y < height)
+
+    def mask(self, width: int, height: int) -> np.ndarray:
+        """ Returns a (width, height) bool array that is True on the points inside it """
+        mask = np.zeros((width, height), dtype=bool)
+        x, y = self.coordinates[self.in_bounds(width, height)].T
+        mask[x, y] = True
+        return mask
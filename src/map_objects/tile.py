@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 from enum import auto, Enum
+from typing import Tuple
 
-from bearlibterminal import terminal as blt
+import numpy as np
 
 from colors import Colors
 from map_objects.point import Point
+from palette import PALETTE
 
 
 class TileType(Enum):
@@ -15,7 +17,42 @@ class TileType(Enum):
     WALL = auto()
 
 
+# bits of GameMap.flags
+WALKABLE = 1
+TRANSPARENT = 2
+EXPLORED = 4
+VISIBLE = 8
+
+
+def tile_key(label: int, visible: int) -> int:
+    """ Index into the tile tables, the same value GameMap.view_keys uses for explored cells """
+    return label * 2 + visible
+
+
+def _tile_tables() -> Tuple[np.ndarray, np.ndarray]:
+    size = tile_key(len(TileType) + 1, 0)
+    glyphs = np.zeros(size, dtype=np.uint32)
+    colors = np.zeros(size, dtype=np.uint32)
+
+    for label in TileType:
+        solid = label in (TileType.WALL, TileType.CAVE)
+        dark, light = tile_key(label.value, 0), tile_key(label.value, 1)
+
+        glyphs[dark] = glyphs[light] = ord("#" if solid else ".")
+        colors[dark] = PALETTE[Colors.DARK_WALL if solid else Colors.DARK_GROUND]
+        colors[light] = PALETTE[Colors.LIGHT_WALL if solid else Colors.LIGHT_GROUND]
+
+    return glyphs, colors
+
+
+# glyph code point and terminal color of every (label, visible) pair, indexed by tile_key
+# index 0 stands for an unexplored cell and has no glyph
+TILE_GLYPHS, TILE_COLORS = _tile_tables()
+
+
 class Tile:
+    __slots__ = ("_point", "label", "walkable", "transparent", "_visible", "_explored")
+
     def __init__(
         self,
         x: int,
@@ -52,28 +89,12 @@ class Tile:
         self._explored = value
 
     @property
-    def color(self):
-        if self.label == TileType.WALL or self.label == TileType.CAVE:
-            label = "WALL"
-        else:
-            label = "GROUND"
-
-        if self.visible:
-            light = "LIGHT"
-        else:
-            light = "DARK"
-
-        return blt.color_from_argb(*Colors[f"{light}_{label}"].argb)
+    def color(self) -> int:
+        return int(TILE_COLORS[tile_key(self.label.value, self.visible)])
 
     @property
     def char(self) -> str:
-        chars = {
-            TileType.FLOOR: ".",
-            TileType.EMPTY: ".",
-            TileType.CAVE: "#",
-            TileType.WALL: "#",
-        }
-        return chars[self.label]
+        return chr(TILE_GLYPHS[tile_key(self.label.value, 0)])
 
     @property
     def visible(self) -> bool:
@@ -150,3 +171,17 @@ class Tile:
 
     def __repr__(self):
         return f"({self.__class__.__name__}) x={self.x}, y={self.y}, label={self.label}"
+
+
+def _label_flags() -> np.ndarray:
+    flags = np.zeros(len(TileType) + 1, dtype=np.uint8)
+
+    for label in TileType:
+        tile = Tile.from_label(point=Point(0, 0), label=label)
+        flags[label.value] = WALKABLE * tile.walkable | TRANSPARENT * tile.transparent
+
+    return flags
+
+
+# walkable and transparent bits of every tile label, indexed by TileType value
+LABEL_FLAGS: np.ndarray = _label_flags()
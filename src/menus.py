@@ -9,6 +9,7 @@ from bearlibterminal import terminal as blt
 from colors import Colors
 from constants import CONSTANTS
 from map_objects.point import Point
+from palette import PALETTE
 from rect import Rect
 # from render_functions import RenderLayer
 
@@ -120,7 +121,7 @@ def level_up_menu(header, player: Entity, menu_width, screen_width, screen_heigh
 
 
 def character_screen(player: Entity, character_screen_width: int, character_screen_height: int, screen_width: int, screen_height: int):
-    blt.bkcolor(blt.color_from_argb(*Colors.DARK_GREY.argb))
+    blt.bkcolor(PALETTE[Colors.DARK_GREY])
     for i in range(5):
         blt.layer(i)
         blt.clear_area(0, 0, character_screen_width * 2, character_screen_height * 2)
@@ -0,0 +1,10 @@
+from __future__ import annotations
+
+from typing import Dict
+
+from bearlibterminal import terminal as blt
+
+from colors import Colors
+
+# every color as the packed value the terminal takes, resolved once at import
+PALETTE: Dict[Colors, int] = {color: blt.color_from_argb(*color.argb) for color in Colors}
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+from contextlib import nullcontext
+from typing import Callable, Deque, Dict, List, Tuple
+
+import numpy as np
+
+# a profiler that is switched off hands out this one context manager for every phase
+NO_PHASE = nullcontext()
+
+
+class Phase:
+    def __init__(self, profiler: Profiler, name: str):
+        self.profiler: Profiler = profiler
+        self.name: str = name
+        self.start: int = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+
+    def __exit__(self, *exc_info):
+        self.profiler.record(self.name, self.start, time.perf_counter_ns())
+
+
+class Profiler:
+    """
+    Opt-in timers and counters for the phases of a turn
+
+    Code wraps its phases in `with PROFILER.phase(name):`. While the profiler is
+    disabled that costs one attribute check. Enabled, the last window durations
+    of every phase are kept for a rolling histogram, and the last max_events
+    timings as Chrome trace events, which chrome://tracing and Perfetto open.
+    Phase names are dotted, like render.map, so related phases sort together.
+    """
+
+    def __init__(self, window: int = 300, max_events: int = 100_000):
+        self.enabled: bool = False
+        self.window: int = window
+        self.durations: Dict[str, Deque[int]] = {}
+        self.counters: Counter = Counter()
+        self.events: Deque[Tuple[str, int, int, int]] = deque(maxlen=max_events)
+        self.origin: int = time.perf_counter_ns()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        self.durations = {}
+        self.counters = Counter()
+        self.events.clear()
+        self.origin = time.perf_counter_ns()
+
+    def phase(self, name: str):
+        if not self.enabled:
+            return NO_PHASE
+        return Phase(self, name)
+
+    def timed(self, name: str) -> Callable[[Callable], Callable]:
+        """ Decorates a function so every call to it is timed as the phase name """
+
+        def decorate(function: Callable) -> Callable:
+            @functools.wraps(function)
+            def timed_function(*args, **kwargs):
+                with self.phase(name):
+                    return function(*args, **kwargs)
+
+            return timed_function
+
+        return decorate
+
+    def count(self, name: str, amount: int = 1):
+        if self.enabled:
+            self.counters[name] += amount
+
+    def record(self, name: str, start: int, end: int):
+        durations = self.durations.get(name)
+        if durations is None:
+            durations = self.durations[name] = deque(maxlen=self.window)
+        durations.append(end - start)
+        self.events.append((name, start, end, threading.get_ident()))
+
+    def histogram(self, name: str, bins: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        """ Returns the counts and the bin edges in milliseconds of the phase's recent durations """
+        durations = np.array(self.durations.get(name, ()), dtype=np.float64) / 1e6
+        return np.histogram(durations, bins=bins)
+
+    def summary(self) -> Dict[str, dict]:
+        """ Returns the mean, median, 95th percentile and worst duration in milliseconds of every phase """
+        summary = {}
+        for name in sorted(self.durations):
+            durations = np.array(self.durations[name], dtype=np.float64) / 1e6
+            summary[name] = {
+                "count": len(durations),
+                "mean_ms": float(durations.mean()),
+                "p50_ms": float(np.percentile(durations, 50)),
+                "p95_ms": float(np.percentile(durations, 95)),
+                "max_ms": float(durations.max()),
+            }
+
+        return summary
+
+    def chrome_trace(self) -> dict:
+        trace_events = [
+            {
+                "name": name,
+                "cat": name.split(".")[0],
+                "ph": "X",
+                "ts": (start - self.origin) / 1000,
+                "dur": (end - start) / 1000,
+                "pid": os.getpid(),
+                "tid": thread,
+            }
+            for name, start, end, thread in self.events
+        ]
+        trace_events.extend(
+            {
+                "name": name,
+                "ph": "C",
+                "ts": (time.perf_counter_ns() - self.origin) / 1000,
+                "pid": os.getpid(),
+                "args": {name: value},
+            }
+            for name, value in self.counters.items()
+        )
+
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path: str):
+        with open(path, "w") as trace_file:
+            json.dump(self.chrome_trace(), trace_file)
+
+    def overlay_lines(self) -> List[str]:
+        """ Returns one line per phase for drawing on screen, slowest mean first """
+        summary = self.summary()
+        names = sorted(summary, key=lambda name: summary[name]["mean_ms"], reverse=True)
+        return [
+            f"{name:<20}{summary[name]['mean_ms']:>7.2f}{summary[name]['p95_ms']:>7.2f}"
+            for name in names
+        ]
+
+
+PROFILER = Profiler()
@@ -12,8 +12,8 @@ def from_dungeon_level(table, dungeon_level: int):
     return 0
 
 
-def random_choice_index(chances: Iterable):
-    random_chance = random.randint(1, sum(chances))
+def random_choice_index(chances: Iterable, rng: random.Random):
+    random_chance = rng.randint(1, sum(chances))
 
     running_sum = 0
     choice = 0
@@ -25,9 +25,9 @@ def random_choice_index(chances: Iterable):
         choice += 1
 
 
-def random_choice_from_dict(choice_dict: dict):
+def random_choice_from_dict(choice_dict: dict, rng: random.Random):
     choices = list(choice_dict.keys())
     chances = list(choice_dict.values())
     # choices, chances = choice_dict.items()
 
-    return choices[random_choice_index(chances)]
+    return choices[random_choice_index(chances, rng=rng)]
@@ -1,20 +1,27 @@
 from __future__ import annotations
 
+from collections import defaultdict
 from enum import Enum, auto
-from typing import List, TYPE_CHECKING
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
 
+import numpy as np
 from bearlibterminal import terminal as blt
 
 from colors import Colors
+from constants import CONSTANTS
 from game_states import GameStates
 from map_objects.point import Point
+from map_objects.tile import TILE_COLORS, TILE_GLYPHS
 from menus import character_screen, inventory_menu, level_up_menu
+from palette import PALETTE
+from profiler import PROFILER
 
 if TYPE_CHECKING:
     import tcod.map
 
     from camera import Camera
     from entity import Entity
+    from entity_registry import EntityRegistry
     from game_messages import MessageLog
     from game_states import GameStates
     from map_objects import GameMap
@@ -40,8 +47,89 @@ class RenderLayer(Enum):
     ACTOR = auto()
 
 
+class ScreenBuffer:
+    """
+    Remembers what is on screen, so a frame only redraws the cells that changed
+
+    The map window is kept as the view keys of GameMap.view_keys and the
+    entities as the glyphs drawn on each (layer, x, y) cell. Anything that draws
+    over the map window behind its back, like the menus, has to invalidate the
+    buffer so the next frame starts again from a cleared window.
+    """
+
+    def __init__(self):
+        self.map_keys: Optional[np.ndarray] = None
+        self.entity_cells: Optional[Dict[Tuple[int, int, int], List[Tuple[str, int]]]] = None
+
+    def invalidate(self):
+        self.map_keys = None
+        self.entity_cells = None
+
+    def draw_map(self, game_map: GameMap, camera: Camera):
+        keys = game_map.view_keys(camera=camera)
+
+        blt.layer(0)
+        if self.map_keys is None or self.map_keys.shape != keys.shape:
+            blt.clear_area(0, 0, camera.width * 2, camera.height * 2)
+            changed = np.argwhere(keys)
+        else:
+            changed = np.argwhere(keys != self.map_keys)
+
+        glyphs = TILE_GLYPHS[keys]
+        colors = TILE_COLORS[keys]
+
+        blt.font("map")
+        for col, row in changed.tolist():
+            blt.clear_area(col * 2, row * 2, 1, 1)
+
+            if glyphs[col, row]:
+                blt.color(int(colors[col, row]))
+                blt.put(col * 2, row * 2, int(glyphs[col, row]))
+        blt.font("")
+        blt.color("white")
+
+        self.map_keys = keys
+
+    def draw_entities(self, entities: List[Entity], game_map: GameMap, camera: Camera):
+        visible, remembered = game_map.view_masks(camera=camera)
+
+        cells: Dict[Tuple[int, int, int], List[Tuple[str, int]]] = defaultdict(list)
+        for entity in entities:
+            if camera.in_bounds(entity.position):
+                point = entity.position - camera.top_left
+                if visible[point.x, point.y] or (entity.stairs and remembered[point.x, point.y]):
+                    cells[entity.render_order.value, point.x, point.y].append(
+                        (entity.char, PALETTE[entity.color])
+                    )
+
+        if self.entity_cells is None:
+            for layer in RenderLayer:
+                blt.layer(layer.value)
+                blt.clear_area(0, 0, camera.width * 2, camera.height * 2)
+            self.entity_cells = {}
+
+        for layer, x, y in self.entity_cells.keys() - cells.keys():
+            blt.layer(layer)
+            blt.clear_area(x * 2, y * 2, 1, 1)
+
+        blt.font("map")
+        for (layer, x, y), glyphs in cells.items():
+            if self.entity_cells.get((layer, x, y)) == glyphs:
+                continue
+
+            blt.layer(layer)
+            blt.clear_area(x * 2, y * 2, 1, 1)
+            for char, color in glyphs:
+                blt.color(color)
+                blt.put(x * 2, y * 2, char)
+        blt.font("")
+        blt.color("white")
+
+        self.entity_cells = dict(cells)
+
+
 def get_names_under_mouse(
-    mouse_position: Point, entities: List[Entity], fov_map: tcod.map.Map, camera: Camera
+    mouse_position: Point, entities: EntityRegistry, fov_map: tcod.map.Map, camera: Camera
 ) -> str:
     if not (
         0 <= mouse_position.x < camera.width - 1
@@ -54,8 +142,8 @@ def get_names_under_mouse(
 
     names = [
         entity.name
-        for entity in entities
-        if entity.position == map_point and fov_map.fov[entity.x, entity.y]
+        for entity in entities.at(map_point)
+        if fov_map.fov[entity.x, entity.y]
     ]
     names = ", ".join(names)
 
@@ -75,8 +163,8 @@ def render_bar(
     bar_width = int(float(value) / maximum * total_width)
 
     blt.composition = True
-    bk_color = blt.color_from_argb(*back_color.argb)
-    bar_color = blt.color_from_argb(*bar_color.argb)
+    bk_color = PALETTE[back_color]
+    bar_color = PALETTE[bar_color]
     bar_text = format(
         f"[font=bar_font][spacing=2x2]{name}: {value:02}/{maximum:02}[/font]",
         f"^{total_width}",
@@ -89,6 +177,14 @@ def render_bar(
     blt.puts(x=int(x + total_width / 2), y=y, s=bar_text, align=blt.TK_ALIGN_CENTER)
 
 
+def render_profile(x: int, y: int):
+    """ Draws the mean and 95th percentile time of every profiled phase, in milliseconds """
+    color = PALETTE[Colors.LIGHT_GRAY]
+    blt.printf(x, y, s=f"[color={color}]{'phase':<20}{'mean':>7}{'p95':>7}")
+    for i, line in enumerate(PROFILER.overlay_lines(), 1):
+        blt.printf(x, y + i * 2, s=f"[color={color}]{line}")
+
+
 def render_all(
     entities: List[Entity],
     player: Entity,
@@ -100,53 +196,55 @@ def render_all(
     bar_width: int,
     mouse_position: Point,
     game_state: GameStates,
+    screen_buffer: ScreenBuffer,
 ):
 
-    # Draw the map
-    blt.clear()
-    # blt.clear_area(x=0, y=0, w=camera.width, h=camera.height)
-    blt.layer(0)
-    game_map.render(fov_map=fov_map, camera=camera)
-
-    # Draw all entities in the list
-    # entities_in_render_order = sorted(entities, key=lambda x: x.render_order.value)
-    for entity in entities:
-        if camera.in_bounds(entity.position):
-            if fov_map.fov[entity.x, entity.y] or (entity.stairs and game_map.is_explored(entity.position)):
-                point = entity.position - camera.top_left
-                entity.draw(point)
-
+    # Only the interface is cleared, the map and the entities redraw the cells that changed
     blt.layer(0)
-    render_bar(
-        x=ui_panel.x,
-        y=ui_panel.y,
-        total_width=bar_width,
-        name="HP",
-        value=player.fighter.hp,
-        maximum=player.fighter.max_hp,
-        bar_color=Colors.RED,
-        back_color=Colors.DARK_RED,
-    )
+    blt.clear_area(camera.width * 2, 0, CONSTANTS.screen_width, CONSTANTS.screen_height)
+    blt.clear_area(0, camera.height * 2, CONSTANTS.screen_width, CONSTANTS.screen_height)
+
+    with PROFILER.phase("render.map"):
+        screen_buffer.draw_map(game_map=game_map, camera=camera)
+    with PROFILER.phase("render.entities"):
+        screen_buffer.draw_entities(entities=entities, game_map=game_map, camera=camera)
+
+    with PROFILER.phase("render.panel"):
+        blt.layer(0)
+        render_bar(
+            x=ui_panel.x,
+            y=ui_panel.y,
+            total_width=bar_width,
+            name="HP",
+            value=player.fighter.hp,
+            maximum=player.fighter.max_hp,
+            bar_color=Colors.RED,
+            back_color=Colors.DARK_RED,
+        )
 
-    blt.printf(ui_panel.x, ui_panel.y + 2, s=f"Dungeon level: {game_map.dungeon_level}")
+        blt.printf(ui_panel.x, ui_panel.y + 2, s=f"Dungeon level: {game_map.dungeon_level}")
 
-    names = get_names_under_mouse(
-        mouse_position=mouse_position, entities=entities, fov_map=fov_map, camera=camera
-    )
-    color = blt.color_from_argb(*Colors.LIGHT_GRAY.argb)
-    blt.printf(ui_panel.x, ui_panel.y + 4, s=f"[color={color}]{names}")
-
-    for i, message in enumerate(message_log.messages, 0):
-        color = blt.color_from_argb(*message.color.argb)
-        blt.printf(
-            x=message_log.x,
-            y=ui_panel.y + (i * 2),
-            s=f"[color={color}]{message.text}",
+        names = get_names_under_mouse(
+            mouse_position=mouse_position, entities=entities, fov_map=fov_map, camera=camera
         )
+        color = PALETTE[Colors.LIGHT_GRAY]
+        blt.printf(ui_panel.x, ui_panel.y + 4, s=f"[color={color}]{names}")
+
+    with PROFILER.phase("render.messages"):
+        for i, message in enumerate(message_log.messages, 0):
+            color = PALETTE[message.color]
+            blt.printf(
+                x=message_log.x,
+                y=ui_panel.y + (i * 2),
+                s=f"[color={color}]{message.text}",
+            )
 
-    fg_color = blt.color_from_argb(*Colors.RED.argb)
-    bk_color = blt.color_from_argb(*Colors.YELLOW.argb)
+    fg_color = PALETTE[Colors.RED]
+    bk_color = PALETTE[Colors.YELLOW]
     blt.printf(camera.width * 2 + 2, 4, f"[color={fg_color}]A[/color][+][color={bk_color}][U+2588][/color]")
+
+    if PROFILER.enabled and CONSTANTS.profile_overlay:
+        render_profile(x=camera.width * 2 + 2, y=6)
     # map_point = Point(x=abs(mouse_position.x - camera.center.x), y=abs(mouse_position.y - camera.center.y))
     # blt.printf(camera.width * 2 + 2, 6, f"Map point: {map_point}")
     # blt.printf((camera.width + 1) * 2, 8, f"Player position: {player.position}")
@@ -175,4 +273,13 @@ def render_all(
     elif game_state == GameStates.CHARACTER_SCREEN:
         character_screen(player, 30, 10, screen_width=camera.width, screen_height=camera.height)
 
+    if game_state in (
+        GameStates.SHOW_INVENTORY,
+        GameStates.DROP_INVENTORY,
+        GameStates.LEVEL_UP,
+        GameStates.CHARACTER_SCREEN,
+    ):
+        # the menus draw over the map window
+        screen_buffer.invalidate()
+
     blt.refresh()
@@ -0,0 +1,117 @@
+"""
+Plays back a session recorded with CONSTANTS.record_actions
+
+    python replay.py session.jsonl
+    python replay.py session.jsonl --fps 20 --skip 5000
+
+Without --fps the actions run headless, as fast as they go. With it the game
+is drawn at that many turns a second, after the first --skip turns were played
+without drawing.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Iterator, List, Optional, Tuple
+
+from bearlibterminal import terminal as blt
+
+from action_recorder import read_recording
+from constants import CONSTANTS
+from engine import open_terminal
+from game import Game
+from headless import MENU_STATES, NullRenderer, Policy, run
+from map_objects import Point
+from render_functions import ScreenBuffer, render_all
+
+
+class RecordedPolicy(Policy):
+    """ Takes the recorded actions in order, and stops where the player quit """
+
+    def __init__(self, actions: List[Tuple[dict, dict]]):
+        self.actions: Iterator[Tuple[dict, dict]] = iter(actions)
+
+    def next_action(self, game: Game) -> Optional[Tuple[dict, dict]]:
+        action, mouse_action = next(self.actions, (None, None))
+        if action is None:
+            return None
+
+        # quitting from the map saves the game, which a replay must not do
+        if action.get("exit") and game.game_state not in MENU_STATES:
+            return None
+
+        return action, mouse_action
+
+
+class TerminalRenderer(NullRenderer):
+    """ Draws every turn after the first skip turns, at most fps turns a second """
+
+    def __init__(self, fps: float, skip: int = 0):
+        self.frame_time: float = 1 / fps
+        self.skip: int = skip
+        self.turns: int = 0
+        self.next_frame: float = 0.0
+        self.screen_buffer: ScreenBuffer = ScreenBuffer()
+
+    def render(self, game: Game):
+        self.turns += 1
+        if self.turns <= self.skip:
+            return
+
+        render_all(
+            entities=game.entities,
+            player=game.player,
+            game_map=game.game_map,
+            fov_map=game.fov_map,
+            camera=game.camera,
+            message_log=game.message_log,
+            ui_panel=CONSTANTS.ui_panel,
+            bar_width=CONSTANTS.bar_width,
+            mouse_position=Point(-1, -1),
+            game_state=game.game_state,
+            screen_buffer=self.screen_buffer,
+        )
+
+        while blt.has_input():
+            if blt.read() in (blt.TK_CLOSE, blt.TK_ESCAPE):
+                game.game_running = False
+
+        now = time.perf_counter()
+        if now < self.next_frame:
+            time.sleep(self.next_frame - now)
+        self.next_frame = max(now, self.next_frame) + self.frame_time
+
+
+def load_recording(path: str) -> Tuple[Game, RecordedPolicy]:
+    header, actions = read_recording(path)
+    game = Game.from_json(json_data=header["game"])
+    return game, RecordedPolicy(actions)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("recording")
+    parser.add_argument("--fps", type=float, default=None, help="draw the replay at this many turns a second")
+    parser.add_argument("--skip", type=int, default=0, help="turns to play without drawing first")
+    parser.add_argument("--turns", type=int, default=None, help="stop after this many turns")
+    args = parser.parse_args(argv)
+
+    game, policy = load_recording(args.recording)
+
+    renderer = NullRenderer()
+    if args.fps:
+        open_terminal()
+        renderer = TerminalRenderer(fps=args.fps, skip=args.skip)
+
+    try:
+        stats = run(game=game, policy=policy, renderer=renderer, max_turns=args.turns)
+    finally:
+        game.floor_pipeline.close()
+        if args.fps:
+            blt.close()
+
+    print(f"seed {stats.seed}: {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import random
+from typing import Dict, Optional, Tuple
+
+SUBSYSTEMS: Tuple[str, ...] = ("map", "spawns", "loot", "ai")
+
+
+class RandomStreams:
+    """
+    One random.Random per subsystem, all derived from a single seed
+
+    map shapes the caves and places the stairs and the player, spawns places
+    the monsters, loot the items and ai drives monster behaviour. A subsystem
+    drawing more or fewer numbers never shifts what the others see, and nothing
+    touches the global random module, so a seed always gives the same game.
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        if seed is None:
+            seed = random.getrandbits(32)
+        self.seed: int = seed
+
+        self.map: random.Random = random.Random(f"{seed}:map")
+        self.spawns: random.Random = random.Random(f"{seed}:spawns")
+        self.loot: random.Random = random.Random(f"{seed}:loot")
+        self.ai: random.Random = random.Random(f"{seed}:ai")
+
+    def states(self) -> Dict[str, tuple]:
+        return {name: getattr(self, name).getstate() for name in SUBSYSTEMS}
+
+    def to_json(self) -> dict:
+        json_data = {"seed": self.seed, "streams": {}}
+
+        for name, (version, internal_state, gauss_next) in self.states().items():
+            json_data["streams"][name] = [version, list(internal_state), gauss_next]
+
+        return json_data
+
+    @classmethod
+    def from_json(cls, json_data: dict) -> RandomStreams:
+        streams = cls(seed=json_data["seed"])
+
+        for name, (version, internal_state, gauss_next) in json_data["streams"].items():
+            getattr(streams, name).setstate((version, tuple(internal_state), gauss_next))
+
+        return streams
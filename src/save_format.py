@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from typing import List, Type, TYPE_CHECKING
+
+import numpy as np
+
+from map_objects import GameMap
+from map_objects.tile import EXPLORED
+from colors import Colors
+from entity import Entity
+from entity_registry import EntityRegistry
+
+if TYPE_CHECKING:
+    from game import Game
+
+
+SAVE_VERSION = 1
+SAVE_DIRECTORY = "save_game"
+JSON_SAVE_FILE = "save_game.json"
+
+MANIFEST_FILE = "manifest.json"
+TILE_MAP_FILE = "tile_map.npy"
+FLAGS_FILE = "flags.npy"
+ENTITIES_FILE = "entities.npy"
+
+COLORS: List[Colors] = list(Colors)
+
+# the fixed size part of every entity, the rest of Entity.to_json goes in the manifest
+ENTITY_DTYPE = np.dtype(
+    [
+        ("x", np.int32),
+        ("y", np.int32),
+        ("char", "U1"),
+        ("color", np.uint8),
+        ("blocks", np.bool_),
+        ("render_order", np.uint8),
+    ]
+)
+
+
+def write_save(game: Game, path: str = SAVE_DIRECTORY):
+    """
+    Writes game as a save directory
+
+    The map layers are raw .npy files and the entities a structured array, so
+    neither goes through Python lists. The message log, camera and the
+    variable parts of the entities, like names and components, go in a compact
+    JSON manifest. The directory is written next to the old save and swapped
+    in at the end, so a failed save never leaves half a game behind. The old
+    save is moved aside before the swap and only deleted after it.
+    """
+    recover_save(path)
+
+    table = np.zeros(len(game.entities), dtype=ENTITY_DTYPE)
+    details = []
+
+    for row, entity in enumerate(game.entities):
+        json_data = entity.to_json()
+        table[row] = (
+            json_data.pop("x"),
+            json_data.pop("y"),
+            json_data.pop("char"),
+            COLORS.index(Colors[json_data.pop("color")]),
+            json_data.pop("blocks"),
+            json_data.pop("render_order"),
+        )
+        details.append(json_data)
+
+    manifest = {
+        "version": SAVE_VERSION,
+        "player_index": game.entities.index(game.player),
+        "entities": details,
+        "dungeon_level": game.game_map.dungeon_level,
+        "message_log": game.message_log.to_json(),
+        "game_state": game.game_state.value,
+        "camera": game.camera.to_json(),
+        "seed": game.seed,
+        "rng": game.rng.to_json(),
+    }
+
+    temporary_path = f"{path}.tmp"
+    shutil.rmtree(temporary_path, ignore_errors=True)
+    os.makedirs(temporary_path)
+
+    np.save(os.path.join(temporary_path, TILE_MAP_FILE), game.game_map.tile_map)
+    np.save(os.path.join(temporary_path, FLAGS_FILE), game.game_map.flags)
+    np.save(os.path.join(temporary_path, ENTITIES_FILE), table)
+    with open(os.path.join(temporary_path, MANIFEST_FILE), "w") as manifest_file:
+        json.dump(manifest, manifest_file, separators=(",", ":"))
+
+    old_path = f"{path}.old"
+    if os.path.isdir(path):
+        os.replace(path, old_path)
+    os.replace(temporary_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+
+
+def recover_save(path: str = SAVE_DIRECTORY):
+    """ Puts the old save back if a crash came between moving it aside and swapping in the new one """
+    old_path = f"{path}.old"
+    if not os.path.isdir(old_path):
+        return
+
+    if os.path.isdir(path):
+        shutil.rmtree(old_path)
+    else:
+        os.replace(old_path, path)
+
+
+def read_save(game_class: Type[Game], path: str = SAVE_DIRECTORY) -> Game:
+    with open(os.path.join(path, MANIFEST_FILE)) as manifest_file:
+        manifest = json.load(manifest_file)
+
+    if manifest.get("version") != SAVE_VERSION:
+        raise ValueError(f"Unsupported save version {manifest.get('version')}")
+
+    tile_map = np.load(os.path.join(path, TILE_MAP_FILE), mmap_mode="r")
+    flags = np.load(os.path.join(path, FLAGS_FILE), mmap_mode="r")
+    game_map = GameMap.from_tile_map(
+        tile_map=tile_map,
+        dungeon_level=manifest["dungeon_level"],
+        explored=(flags & EXPLORED) != 0,
+    )
+
+    table = np.load(os.path.join(path, ENTITIES_FILE))
+    entities = EntityRegistry()
+    for row, details in zip(table.tolist(), manifest["entities"]):
+        x, y, char, color, blocks, render_order = row
+        json_data = dict(
+            details,
+            x=x,
+            y=y,
+            char=char,
+            color=COLORS[color].name,
+            blocks=blocks,
+            render_order=render_order,
+        )
+        entities.append(Entity.from_json(json_data=json_data))
+
+    return game_class.restore(
+        entities=entities,
+        player_index=manifest["player_index"],
+        game_map=game_map,
+        json_data=manifest,
+    )
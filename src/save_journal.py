@@ -0,0 +1,307 @@
+from __future__ import annotations
+
+import json
+import os
+import struct
+from enum import IntEnum
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+from colors import Colors
+from entity import Entity
+from game_messages import Message
+from game_states import GameStates
+from map_objects.point import Point
+from map_objects.tile import EXPLORED
+from rng import RandomStreams
+from save_format import SAVE_DIRECTORY, write_save
+
+if TYPE_CHECKING:
+    from game import Game
+    from map_objects import GameMap
+
+
+JOURNAL_FILE = "journal.bin"
+
+COLORS: List[Colors] = list(Colors)
+
+# every record is a kind and a payload length, followed by the payload
+HEADER = struct.Struct("<BI")
+TURN = struct.Struct("<I")
+MOVE = struct.Struct("<Iii")
+HP = struct.Struct("<Ii")
+ENTITY_ID = struct.Struct("<I")
+MESSAGE_COLOR = struct.Struct("<B")
+STATE = struct.Struct("<B")
+
+
+class Record(IntEnum):
+    TURN = 0
+    MOVE = 1
+    HP = 2
+    ENTITY = 3
+    REMOVE = 4
+    EXPLORED = 5
+    MESSAGE = 6
+    STATE = 7
+    RNG = 8
+
+
+def pack(kind: Record, payload: bytes) -> bytes:
+    return HEADER.pack(kind, len(payload)) + payload
+
+
+def only_hp_changed(old: dict, new: dict) -> bool:
+    """ Returns True if the two entity states differ in nothing but position and fighter hp """
+    if old.keys() != new.keys() or "fighter" not in new:
+        return False
+
+    keep = {"x", "y", "fighter"}
+    if any(old[key] != new[key] for key in new if key not in keep):
+        return False
+
+    return dict(old["fighter"], hp=new["fighter"]["hp"]) == new["fighter"]
+
+
+class SaveJournal:
+    """
+    Appends what changed every turn to the save directory, between full saves
+
+    The journal starts from a full save, where an entity's id is its index in
+    the saved entity list. Each turn then appends small binary records: entity
+    moves, hp changes, newly explored cells, new message lines and the game
+    state. Any other change to an entity writes that one entity as JSON, and a
+    turn that drew random numbers writes the state of the random streams.
+    What is written grows with what changed in the turn, not with the size of
+    the map or the number of entities, and so does the work of finding it:
+    only the entities the registry reports as changed, and the player, are
+    compared, and explored cells only inside the window the fov touched.
+
+    A turn only counts once its TURN record is written, so a crash loses at
+    most the turn in progress. Entering a new floor, or compact_every turns,
+    writes a full save again and starts a fresh journal.
+    """
+
+    def __init__(self, path: str = SAVE_DIRECTORY, compact_every: int = 200):
+        self.path: str = path
+        self.compact_every: int = compact_every
+
+        self.file: Optional[BinaryIO] = None
+        self.turns: int = 0
+        self.ids: Dict[Entity, int] = {}
+        self.states: Dict[int, dict] = {}
+        self.next_id: int = 0
+        self.game_map: Optional[GameMap] = None
+        self.explored: Optional[np.ndarray] = None
+        self.messages_recorded: int = 0
+        self.game_state: Optional[GameStates] = None
+        self.rng_states: Dict[str, tuple] = {}
+
+    @property
+    def journal_path(self) -> str:
+        return os.path.join(self.path, JOURNAL_FILE)
+
+    def compact(self, game: Game):
+        """ Writes a full save and starts an empty journal on top of it """
+        self.close()
+        write_save(game=game, path=self.path)
+
+        self.ids = {entity: entity_id for entity_id, entity in enumerate(game.entities)}
+        self.states = {self.ids[entity]: entity.to_json() for entity in game.entities}
+        self.next_id = len(game.entities)
+        self.game_map = game.game_map
+        self.explored = game.game_map.explored.copy()
+        game.game_map.take_explored_window()
+        game.entities.take_changed()
+        self.messages_recorded = game.message_log.added
+        self.game_state = game.game_state
+        self.rng_states = game.rng.states()
+        self.turns = 0
+
+        self.file = open(self.journal_path, "ab")
+
+    def record_turn(self, game: Game):
+        if self.file is None or game.game_map is not self.game_map or self.turns >= self.compact_every:
+            self.compact(game)
+            return
+
+        records = self.entity_records(game) + self.map_records(game) + self.log_records(game)
+        if not records:
+            return
+
+        self.turns += 1
+        records.append(pack(Record.TURN, TURN.pack(self.turns)))
+        self.file.write(b"".join(records))
+        self.file.flush()
+
+    def entity_records(self, game: Game) -> List[bytes]:
+        records = []
+        entities = game.entities
+
+        changed = entities.take_changed()
+        changed.add(game.player)
+
+        removed = [entity for entity in changed if entity not in entities.slots and entity in self.ids]
+        present = sorted(
+            (entity for entity in changed if entity in entities.slots),
+            key=lambda entity: entities.sequence[entities.slots[entity]],
+        )
+
+        for entity in present:
+            state = entity.to_json()
+            entity_id = self.ids.get(entity)
+
+            if entity_id is None:
+                entity_id = self.ids[entity] = self.next_id
+                self.next_id += 1
+                records.append(self.entity_record(entity_id, state))
+            else:
+                old = self.states[entity_id]
+                if state == old:
+                    pass
+                elif only_hp_changed(old, state):
+                    if (old["x"], old["y"]) != (state["x"], state["y"]):
+                        records.append(pack(Record.MOVE, MOVE.pack(entity_id, state["x"], state["y"])))
+                    if old["fighter"]["hp"] != state["fighter"]["hp"]:
+                        records.append(pack(Record.HP, HP.pack(entity_id, state["fighter"]["hp"])))
+                elif dict(old, x=state["x"], y=state["y"]) == state:
+                    records.append(pack(Record.MOVE, MOVE.pack(entity_id, state["x"], state["y"])))
+                else:
+                    records.append(self.entity_record(entity_id, state))
+
+            self.states[entity_id] = state
+
+        for entity_id in sorted(self.ids[entity] for entity in removed):
+            del self.states[entity_id]
+            records.append(pack(Record.REMOVE, ENTITY_ID.pack(entity_id)))
+        for entity in removed:
+            del self.ids[entity]
+
+        return records
+
+    @staticmethod
+    def entity_record(entity_id: int, state: dict) -> bytes:
+        payload = json.dumps(state, separators=(",", ":")).encode()
+        return pack(Record.ENTITY, ENTITY_ID.pack(entity_id) + payload)
+
+    def map_records(self, game: Game) -> List[bytes]:
+        game_map = game.game_map
+        window = game_map.take_explored_window()
+        if window is None:
+            return []
+
+        left, right, top, bottom = window
+        known = self.explored[left:right, top:bottom]
+        new = (game_map.flags[left:right, top:bottom] & EXPLORED != 0) & ~known
+        if not new.any():
+            return []
+
+        known |= new
+        x, y = np.nonzero(new)
+        new_cells = np.sort(np.ravel_multi_index((x + left, y + top), self.explored.shape, order="F"))
+        return [pack(Record.EXPLORED, new_cells.astype("<u4").tobytes())]
+
+    def log_records(self, game: Game) -> List[bytes]:
+        records = []
+
+        message_log = game.message_log
+        new_lines = min(message_log.added - self.messages_recorded, len(message_log.messages))
+        for message in message_log.messages[len(message_log.messages) - new_lines :]:
+            payload = MESSAGE_COLOR.pack(COLORS.index(message.color)) + message.text.encode()
+            records.append(pack(Record.MESSAGE, payload))
+        self.messages_recorded = message_log.added
+
+        if game.game_state != self.game_state:
+            self.game_state = game.game_state
+            records.append(pack(Record.STATE, STATE.pack(game.game_state.value)))
+
+        rng_states = game.rng.states()
+        if rng_states != self.rng_states:
+            self.rng_states = rng_states
+            payload = json.dumps(game.rng.to_json(), separators=(",", ":")).encode()
+            records.append(pack(Record.RNG, payload))
+
+        return records
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+def read_records(path: str) -> Iterator[Tuple[Record, bytes]]:
+    """ Yields the records of every complete turn in the journal at path """
+    with open(path, "rb") as journal_file:
+        data = journal_file.read()
+
+    turn: List[Tuple[Record, bytes]] = []
+    offset = 0
+    while offset + HEADER.size <= len(data):
+        kind, length = HEADER.unpack_from(data, offset)
+        offset += HEADER.size
+        if offset + length > len(data):
+            break
+
+        payload = data[offset : offset + length]
+        offset += length
+
+        if kind == Record.TURN:
+            yield from turn
+            turn = []
+        else:
+            turn.append((Record(kind), payload))
+
+
+def replay_journal(game: Game, path: str = SAVE_DIRECTORY):
+    """ Applies the journal in the save directory to a game loaded from the same directory """
+    journal_path = os.path.join(path, JOURNAL_FILE)
+    if not os.path.isfile(journal_path):
+        return
+
+    entities: Dict[int, Entity] = dict(enumerate(game.entities))
+    game_map = game.game_map
+
+    for kind, payload in read_records(journal_path):
+        if kind == Record.MOVE:
+            entity_id, x, y = MOVE.unpack(payload)
+            entities[entity_id].position = Point(x=x, y=y)
+
+        elif kind == Record.HP:
+            entity_id, hp = HP.unpack(payload)
+            entities[entity_id].fighter.hp = hp
+
+        elif kind == Record.ENTITY:
+            (entity_id,) = ENTITY_ID.unpack_from(payload)
+            entity = Entity.from_json(json_data=json.loads(payload[ENTITY_ID.size :].decode()))
+
+            old = entities.get(entity_id)
+            if old is None:
+                game.entities.append(entity)
+            else:
+                game.entities[game.entities.index(old)] = entity
+                if old is game.player:
+                    game.player = entity
+                    game.camera.player = entity
+            entities[entity_id] = entity
+
+        elif kind == Record.REMOVE:
+            (entity_id,) = ENTITY_ID.unpack(payload)
+            game.entities.remove(entities.pop(entity_id))
+
+        elif kind == Record.EXPLORED:
+            cells = np.frombuffer(payload, dtype="<u4")
+            where = np.unravel_index(cells, (game_map.width, game_map.height), order="F")
+            game_map.set_flag(EXPLORED, True, where)
+
+        elif kind == Record.MESSAGE:
+            (color,) = MESSAGE_COLOR.unpack_from(payload)
+            text = payload[MESSAGE_COLOR.size :].decode()
+            game.message_log.add_message(Message(text, COLORS[color]))
+
+        elif kind == Record.STATE:
+            (value,) = STATE.unpack(payload)
+            game.current_state = GameStates(value)
+
+        elif kind == Record.RNG:
+            game.rng = RandomStreams.from_json(json_data=json.loads(payload.decode()))
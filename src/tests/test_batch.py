@@ -0,0 +1,15 @@
+import map_objects
+from batch import BatchSummary, run_batch
+
+
+def test_run_batch_plays_every_seed():
+    summary = BatchSummary()
+    seeds = set()
+
+    for stats in run_batch(seeds=[1, 2, 3], max_turns=30, workers=2):
+        summary.add(stats)
+        seeds.add(stats.seed)
+
+    assert seeds == {1, 2, 3}
+    assert summary.games == 3
+    assert sum(summary.dungeon_levels.values()) == 3
@@ -0,0 +1,35 @@
+import pytest
+
+import map_objects
+from benchmarks.suite import BASELINE_VERSION, RecordingTerminal, compare
+from bearlibterminal import terminal as blt
+
+
+def results(**times) -> dict:
+    return {
+        "version": BASELINE_VERSION,
+        "results": {name: {"min_ms": min_ms} for name, min_ms in times.items()},
+    }
+
+
+def test_compare_reports_only_slower_benchmarks():
+    baseline = results(fov=1.0, render=2.0)
+    current = results(fov=1.1, render=4.0, new=5.0)
+
+    assert compare(baseline=baseline, current=current, threshold=1.5) == [("render", 2.0)]
+
+
+def test_compare_rejects_other_versions():
+    with pytest.raises(ValueError):
+        compare(baseline={"version": 0}, current=results(), threshold=1.5)
+
+
+def test_recording_terminal_restores_bearlibterminal():
+    put = blt.put
+
+    with RecordingTerminal() as terminal:
+        blt.put(0, 0, "@")
+        blt.put(1, 0, "@")
+
+    assert terminal.calls["put"] == 2
+    assert blt.put is put
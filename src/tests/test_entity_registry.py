@@ -0,0 +1,90 @@
+import numpy as np
+
+from map_objects.point import Point
+from colors import Colors
+from components import Fighter, Item
+from entity import Entity
+from entity_registry import EntityRegistry
+from render_functions import RenderLayer
+
+
+def orc(point: Point) -> Entity:
+    return Entity(position=point, char="o", color=Colors.LIGHT_GREEN, name="Orc", blocks=True, render_order=RenderLayer.ACTOR, fighter=Fighter(hp=20, defense=0, power=4))
+
+
+def potion(point: Point) -> Entity:
+    return Entity(position=point, char="!", color=Colors.VIOLET, name="Healing Potion", render_order=RenderLayer.ITEM, item=Item())
+
+
+def test_index_follows_moves():
+    monster = orc(Point(1, 1))
+    entities = EntityRegistry([monster])
+
+    monster.move(Point(1, 0))
+    assert entities.at(Point(1, 1)) == []
+    assert entities.blocker_at(Point(2, 1)) is monster
+
+    monster.position = Point(5, 5)
+    assert entities.at(Point(5, 5)) == [monster]
+    assert list(entities.cells) == [Point(5, 5)]
+
+
+def test_removed_entities_leave_the_index():
+    item = potion(Point(3, 3))
+    entities = EntityRegistry([orc(Point(3, 3)), item])
+
+    assert entities.items_at(Point(3, 3)) == [item]
+
+    entities.remove(item)
+    item.position = Point(4, 4)
+
+    assert item.registry is None
+    assert entities.items_at(Point(3, 3)) == []
+    assert entities.at(Point(4, 4)) == []
+
+
+def test_fighters_within_radius():
+    near, far = orc(Point(10, 10)), orc(Point(15, 10))
+    entities = EntityRegistry([near, far, potion(Point(10, 11))])
+    entities.extend(orc(Point(x, 30)) for x in range(40))
+
+    assert entities.fighters_within(center=Point(11, 10), radius=3) == [near]
+    assert len(entities.fighters_within(center=Point(11, 10), radius=100)) == 42
+
+
+def test_nearest_fighter_skips_hidden_and_excluded():
+    player, close, hidden, far = orc(Point(5, 5)), orc(Point(6, 6)), orc(Point(5, 4)), orc(Point(9, 5))
+    entities = EntityRegistry([player, close, hidden, far])
+    visible = np.full((20, 20), True)
+    visible[5, 4] = False
+
+    assert entities.nearest_fighter(center=Point(5, 5), radius=6, visible=visible, exclude=player) is close
+
+    close.fighter = None
+    assert entities.nearest_fighter(center=Point(5, 5), radius=6, visible=visible, exclude=player) is far
+    assert entities.nearest_fighter(center=Point(5, 5), radius=4, visible=visible, exclude=player) is None
+
+
+def test_fighters_keep_their_stats_in_columns():
+    monster = orc(Point(2, 2))
+    entities = EntityRegistry([monster])
+    slot = entities.slots[monster]
+
+    monster.fighter.hp -= 5
+    assert entities.columns["hp"][slot] == 15
+
+    entities.remove(monster)
+    monster.fighter.hp -= 5
+    assert monster.fighter.hp == 10
+    assert monster.fighter.to_json()["base_power"] == 4
+
+
+def test_damage_within_hits_every_fighter_in_range_at_once():
+    near, edge, far = orc(Point(10, 10)), orc(Point(12, 10)), orc(Point(13, 10))
+    entities = EntityRegistry([near, potion(Point(10, 10)), edge, far])
+
+    assert entities.damage_within(center=Point(10, 10), radius=2, amount=7) == [near, edge]
+    assert [monster.fighter.hp for monster in (near, edge, far)] == [13, 13, 20]
+
+    edge.fighter = None
+    assert entities.damage_within(center=Point(10, 10), radius=2, amount=7) == [near]
@@ -0,0 +1,64 @@
+import time
+
+import numpy as np
+import pytest
+
+from floor_pipeline import FloorPipeline, build_floor, floor_seed
+
+
+def summarize(entities):
+    return [(entity.name, entity.x, entity.y) for entity in entities]
+
+
+@pytest.fixture
+def floor_pipeline():
+    floor_pipeline = FloorPipeline(width=40, height=30, min_monsters=5)
+    yield floor_pipeline
+    floor_pipeline.close()
+
+
+def test_floor_seed_is_stable():
+    assert floor_seed(1234, 2) == floor_seed(1234, 2)
+    assert floor_seed(1234, 2) != floor_seed(1234, 3)
+
+
+def test_build_floor_is_deterministic():
+    first, first_entities, first_start = build_floor(
+        seed=99, dungeon_level=3, width=40, height=30, min_monsters=5
+    )
+    second, second_entities, second_start = build_floor(
+        seed=99, dungeon_level=3, width=40, height=30, min_monsters=5
+    )
+
+    assert np.array_equal(first.game_map.tile_map, second.game_map.tile_map)
+    assert summarize(first_entities) == summarize(second_entities)
+    assert first_start == second_start
+
+
+def test_prefetched_floor_matches_synchronous_floor(floor_pipeline):
+    # this floor has small walls filled in, which come after the main cave in the cave cells
+    floor_pipeline.prefetch(seed=30, dungeon_level=4)
+
+    deadline = time.monotonic() + 30
+    while not floor_pipeline.ready and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert floor_pipeline.ready
+
+    prefetched = floor_pipeline.take(seed=30, dungeon_level=4)
+    generated = floor_pipeline.generate(seed=30, dungeon_level=4)
+
+    assert floor_pipeline.pending is None
+    assert np.array_equal(prefetched.game_map.tile_map, generated.game_map.tile_map)
+    assert np.array_equal(prefetched.game_map.walkable, generated.game_map.walkable)
+    assert prefetched.game_map.dungeon_level == 4
+    assert summarize(prefetched.entities) == summarize(generated.entities)
+    assert prefetched.player_start == generated.player_start
+    assert np.array_equal(prefetched.cave.coordinates, generated.cave.coordinates)
+
+
+def test_take_falls_back_when_nothing_is_pending(floor_pipeline):
+    floor = floor_pipeline.take(seed=7, dungeon_level=2)
+    generated = floor_pipeline.generate(seed=7, dungeon_level=2)
+
+    assert np.array_equal(floor.game_map.tile_map, generated.game_map.tile_map)
+    assert summarize(floor.entities) == summarize(generated.entities)
@@ -1,2 +1,58 @@
-# fov_functions.initialize_fov
-# fov_functions.recompute_fov
+import numpy as np
+
+import map_objects
+from fov_functions import FovCache, initialize_fov, recompute_fov
+from map_objects import GameMap, Point
+from map_objects.tile import TileType, TRANSPARENT, WALKABLE
+
+
+def open_map() -> GameMap:
+    game_map = GameMap(width=20, height=15)
+    game_map.set_flag(WALKABLE | TRANSPARENT, True)
+    game_map.place_tiles(mask=np.s_[10, 2:13], label=TileType.CAVE)
+    return game_map
+
+
+def test_cached_masks_match_recomputed_ones():
+    game_map = open_map()
+    fov_map = initialize_fov(game_map)
+    cache = FovCache()
+
+    cache.compute(fov_map=fov_map, game_map=game_map, point=Point(3, 7), radius=8)
+    first = fov_map.fov.copy()
+    cache.compute(fov_map=fov_map, game_map=game_map, point=Point(14, 7), radius=8)
+    cache.compute(fov_map=fov_map, game_map=game_map, point=Point(3, 7), radius=8)
+
+    assert (fov_map.fov == first).all()
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    recompute_fov(fov_map=fov_map, point=Point(3, 7), radius=8)
+    assert (fov_map.fov == first).all()
+
+
+def test_changed_walls_are_never_served_from_the_cache():
+    game_map = open_map()
+    fov_map = initialize_fov(game_map)
+    cache = FovCache()
+
+    cache.compute(fov_map=fov_map, game_map=game_map, point=Point(3, 7), radius=20)
+    assert not fov_map.fov[15, 7]
+
+    game_map.place_tiles(mask=np.s_[10, 2:13], label=TileType.FLOOR)
+    cache.compute(fov_map=fov_map, game_map=game_map, point=Point(3, 7), radius=20)
+
+    assert fov_map.fov[15, 7]
+    assert cache.hits == 0
+
+
+def test_least_recently_used_masks_are_evicted():
+    game_map = open_map()
+    fov_map = initialize_fov(game_map)
+    cache = FovCache(size=2)
+
+    for x in (1, 2, 1, 3):
+        cache.compute(fov_map=fov_map, game_map=game_map, point=Point(x, 1), radius=5)
+    cache.compute(fov_map=fov_map, game_map=game_map, point=Point(1, 1), radius=5)
+
+    assert len(cache) == 2
+    assert (cache.hits, cache.misses) == (2, 3)
@@ -0,0 +1,25 @@
+from frame_limiter import FrameLimiter
+
+
+def test_frame_limiter_renders_only_when_requested():
+    frame_limiter = FrameLimiter(max_fps=60)
+
+    assert frame_limiter.should_render()
+    frame_limiter.rendered()
+
+    assert not frame_limiter.should_render()
+    assert frame_limiter.frames_skipped == 1
+
+    frame_limiter.request()
+    assert frame_limiter.should_render()
+
+
+def test_frame_limiter_caps_frames_while_input_is_queued():
+    frame_limiter = FrameLimiter(max_fps=1)
+    frame_limiter.rendered()
+    frame_limiter.request()
+
+    assert not frame_limiter.should_render(input_pending=True)
+    assert frame_limiter.should_render(input_pending=False)
+    assert frame_limiter.frames_rendered == 1
+    assert frame_limiter.frames_skipped == 1
@@ -1,6 +1,9 @@
+import numpy as np
 import pytest
 
 from map_objects.game_map import GameMap
+from map_objects.point import Point
+from map_objects.tile import TileType
 
 
 @pytest.fixture
@@ -44,3 +47,26 @@ def test_count_neighbors():
 # game_map.in_bounds(point)
 # game_map.count_neighbors(point, steps)
 # game_map.place_tile(point, tile)
+
+
+def test_place_tiles_sets_flags(game_map):
+    game_map.place_tiles(mask=np.s_[10:20, 5:8], label=TileType.FLOOR)
+
+    assert game_map.tile_map.dtype == np.uint8
+    assert game_map.walkable[10:20, 5:8].all()
+    assert game_map.transparent[10:20, 5:8].all()
+    assert not game_map.walkable[20, 5]
+
+    game_map.place_tiles(mask=game_map.tile_map == TileType.FLOOR.value, label=TileType.CAVE)
+    assert not game_map.walkable.any()
+
+
+def test_json_round_trip_keeps_tiles_and_explored(game_map):
+    game_map.place_tiles(mask=np.s_[1:4, 1:4], label=TileType.FLOOR)
+    game_map.explore(Point(2, 2))
+
+    loaded = GameMap.from_json(json_data=game_map.to_json())
+
+    assert np.array_equal(loaded.tile_map, game_map.tile_map)
+    assert np.array_equal(loaded.flags, game_map.flags)
+    assert loaded.is_explored(Point(2, 2))
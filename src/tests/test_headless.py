@@ -0,0 +1,28 @@
+import map_objects
+from game import Game
+from headless import ExplorerPolicy, run
+
+
+def new_game(seed: int) -> Game:
+    game = Game.new_game(seed=seed)
+    game.enter_floor(game.floor_pipeline.generate(seed=seed, dungeon_level=1), prefetch=False)
+    return game
+
+
+def test_run_stops_after_max_turns():
+    game = new_game(seed=1234)
+
+    stats = run(game=game, policy=ExplorerPolicy(seed=1234), max_turns=50)
+
+    assert stats.turns == 50 or stats.player_died
+    assert game.game_running
+
+
+def test_run_reaches_the_next_floor():
+    game = new_game(seed=1234)
+
+    stats = run(game=game, policy=ExplorerPolicy(seed=1234), max_turns=2000, max_floors=1)
+    game.floor_pipeline.close()
+
+    assert stats.floors == 1
+    assert game.map_generator.dungeon_level == 2
@@ -5,3 +5,164 @@
 # remove_small_walls
 # find_tile
 # find_caves
+
+import random
+
+import numpy as np
+import pytest
+
+from map_objects.game_map import GameMap
+from map_objects.map_generator import (
+    FIRST_STEP_MAX,
+    FIRST_STEP_MIN,
+    FIRST_STEP_REPEATS,
+    INITIAL_CHANCE,
+    MapGenerator,
+    SECOND_STEP_MAX,
+    SECOND_STEP_MIN,
+    SECOND_STEP_REPEATS,
+)
+from map_objects.point import Point
+from map_objects.tile import Tile, TileType, TRANSPARENT, WALKABLE
+from rng import RandomStreams
+
+
+def legacy_streams(seed: int) -> RandomStreams:
+    # the legacy code drew from the global generator, seeded the same way
+    rng = RandomStreams(seed)
+    rng.map.seed(seed)
+    return rng
+
+
+def legacy_initialize_cave(width: int, height: int) -> GameMap:
+    game_map = GameMap(width=width, height=height)
+    game_map.set_flag(WALKABLE | TRANSPARENT, True)
+
+    for i in range(height):
+        for j in range(width):
+            point = Point(x=j, y=i)
+            if i == 0 or j == 0 or i == height - 1 or j == width - 1:
+                game_map.place_tile(point, Tile.cave(point=point))
+
+            if random.random() < INITIAL_CHANCE:
+                game_map.place_tile(point, Tile.cave(point=point))
+
+    return game_map
+
+
+def legacy_smooth_step(game_map: GameMap, min_count: int, max_count: int):
+    for i in range(1, game_map.height - 1):
+        for j in range(1, game_map.width - 1):
+            point = Point(x=j, y=i)
+            count1 = game_map.count_one_step_neighbors(center=point)
+            count2 = game_map.count_two_step_neighbors(center=point)
+
+            if count1 >= min_count:
+                game_map.place_tile(point=point, tile=Tile.cave(point=point))
+            elif count2 <= max_count:
+                game_map.place_tile(point=point, tile=Tile.cave(point=point))
+            else:
+                game_map.place_tile(point=point, tile=Tile.floor(point=point))
+
+
+@pytest.mark.parametrize("seed", [1, 7, 1234])
+def test_initialize_cave_matches_legacy(seed):
+    random.seed(seed)
+    legacy = legacy_initialize_cave(width=40, height=30)
+
+    map_generator = MapGenerator(map_width=40, map_height=30, rng=legacy_streams(seed))
+    map_generator.initialize_cave(width=40, height=30)
+
+    assert np.array_equal(map_generator.game_map.cave_map, legacy.cave_map)
+    assert np.array_equal(map_generator.game_map.tile_map, legacy.tile_map)
+    assert np.array_equal(map_generator.game_map.walkable, legacy.walkable)
+
+
+@pytest.mark.parametrize("seed", [1, 7, 1234])
+@pytest.mark.parametrize("width, height", [(40, 30), (23, 57)])
+def test_cave_smoothing_matches_legacy(seed, width, height):
+    random.seed(seed)
+    legacy = legacy_initialize_cave(width=width, height=height)
+    for _ in range(FIRST_STEP_REPEATS):
+        legacy_smooth_step(legacy, min_count=FIRST_STEP_MIN, max_count=FIRST_STEP_MAX)
+    for _ in range(SECOND_STEP_REPEATS):
+        legacy_smooth_step(legacy, min_count=SECOND_STEP_MIN, max_count=SECOND_STEP_MAX)
+
+    map_generator = MapGenerator(map_width=width, map_height=height, rng=legacy_streams(seed))
+    map_generator.initialize_cave(width=width, height=height)
+    for _ in range(FIRST_STEP_REPEATS):
+        map_generator.cave_smooth_step(min_count=FIRST_STEP_MIN, max_count=FIRST_STEP_MAX)
+    for _ in range(SECOND_STEP_REPEATS):
+        map_generator.cave_smooth_step(min_count=SECOND_STEP_MIN, max_count=SECOND_STEP_MAX)
+
+    game_map = map_generator.game_map
+    assert np.array_equal(game_map.cave_map, legacy.cave_map)
+    assert np.array_equal(game_map.tile_map, legacy.tile_map)
+    assert np.array_equal(game_map.walkable, legacy.walkable)
+    assert np.array_equal(game_map.transparent, legacy.transparent)
+
+
+def legacy_find_caves(walkable: np.ndarray):
+    # breadth first flood fill over all eight neighbors, as explore_cave used to do
+    width, height = walkable.shape
+    visited = np.full_like(walkable, fill_value=False)
+    caves = []
+    for i in range(height):
+        for j in range(width):
+            if visited[j, i] or not walkable[j, i]:
+                continue
+            cave = [(j, i)]
+            visited[j, i] = True
+            index = 0
+            while index < len(cave):
+                x, y = cave[index]
+                index += 1
+                for neighbor in Point(x, y).all_neighbors:
+                    if not (0 <= neighbor.x < width and 0 <= neighbor.y < height):
+                        continue
+                    if not visited[neighbor.x, neighbor.y] and walkable[neighbor.x, neighbor.y]:
+                        visited[neighbor.x, neighbor.y] = True
+                        cave.append((neighbor.x, neighbor.y))
+            caves.append(cave)
+
+    return caves
+
+
+@pytest.mark.parametrize("seed", [1, 7, 1234])
+def test_label_regions_matches_flood_fill(seed):
+    from map_objects.labelling import label_regions
+
+    rng = np.random.default_rng(seed)
+    walkable = rng.random((37, 23)) < 0.55
+
+    labels, sizes = label_regions(walkable)
+    caves = legacy_find_caves(walkable)
+
+    assert len(sizes) == len(caves) + 1
+    assert sizes[0] == 0
+    for label, cave in enumerate(caves, 1):
+        assert sizes[label] == len(cave)
+        assert all(labels[x, y] == label for x, y in cave)
+    assert np.array_equal(labels != 0, walkable)
+
+
+def test_generate_caves_leaves_one_cave():
+    from map_objects.labelling import label_regions
+
+    map_generator = MapGenerator(map_width=60, map_height=50, rng=RandomStreams(42))
+    map_generator.generate_caves(width=60, height=50, entities=[])
+
+    labels, sizes = label_regions(map_generator.game_map.walkable)
+    assert len(sizes) == 2
+    assert len(map_generator.cave) == sizes[1]
+    for x, y in map_generator.cave:
+        assert map_generator.game_map.walkable[x, y]
+
+
+def test_find_tile_reads_the_tile_layer():
+    map_generator = MapGenerator(map_width=10, map_height=10, rng=RandomStreams(42))
+    map_generator.game_map.place_tiles(mask=(slice(0, 5), slice(None)), label=TileType.CAVE)
+    map_generator.game_map.place_tiles(mask=(slice(5, 10), slice(None)), label=TileType.FLOOR)
+
+    assert map_generator.find_tile(Point(2, 2)).label == TileType.CAVE
+    assert map_generator.find_tile(Point(7, 2)).label == TileType.FLOOR
@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from map_objects.game_map import GameMap
+from map_objects.point import Point
+from map_objects.tile import Tile, TileType
+from colors import Colors
+from entity import Entity
+from render_functions import RenderLayer
+
+
+@pytest.fixture
+def game_map() -> GameMap:
+    """
+    0123456789
+    ##########
+    #........#
+    #.######.#
+    #........#
+    ##########
+    """
+    game_map = GameMap(width=10, height=5)
+    game_map.place_tiles(mask=np.full((10, 5), True), label=TileType.CAVE)
+
+    floor = [Point(x, y) for x in range(1, 9) for y in (1, 3)] + [Point(1, 2), Point(8, 2)]
+    for point in floor:
+        game_map.place_tile(point=point, tile=Tile.floor(point))
+
+    return game_map
+
+
+def monster(point: Point) -> Entity:
+    return Entity(position=point, char="o", color=Colors.LIGHT_GREEN, name="Orc", blocks=True, render_order=RenderLayer.ACTOR)
+
+
+def test_path_uses_walkable_cells(game_map):
+    path = game_map.navigation.path(start=Point(2, 1), goal=Point(2, 3))
+
+    assert path[-1] == Point(2, 3)
+    assert all(game_map.walkable[point.x, point.y] for point in path)
+
+
+def test_sync_only_blocks_current_positions(game_map):
+    navigation = game_map.navigation
+    blocker = monster(Point(1, 2))
+
+    navigation.sync([blocker])
+    assert navigation.cost[1, 2] == 0
+
+    blocker.position = Point(8, 2)
+    navigation.sync([blocker])
+    assert navigation.cost[1, 2] == 1
+    assert navigation.cost[8, 2] == 0
+
+    navigation.sync([])
+    assert navigation.cost[8, 2] == 1
+    assert not navigation.blockers.any()
+
+
+def test_path_goes_around_blockers(game_map):
+    navigation = game_map.navigation
+    navigation.sync([monster(Point(1, 2))])
+
+    path = navigation.path(start=Point(2, 1), goal=Point(2, 3))
+
+    assert Point(1, 2) not in path
+    assert Point(8, 2) in path
+
+
+def test_move_astar_steps_towards_target(game_map):
+    orc = monster(Point(3, 1))
+    player = monster(Point(1, 3))
+    entities = [orc, player]
+    game_map.navigation.sync(entities)
+
+    orc.move_astar(target=player, entities=entities, game_map=game_map)
+
+    assert orc.position == Point(2, 1)
+    assert game_map.navigation.cost[3, 1] == 1
+    assert game_map.navigation.cost[2, 1] == 0
+
+
+def test_chase_map_is_reused_until_goal_moves(game_map):
+    navigation = game_map.navigation
+
+    chase_map = navigation.chase_map(Point(2, 3))
+    assert chase_map[2, 3] == 0
+    assert chase_map[1, 2] < chase_map[2, 1]
+    assert navigation.chase_map(Point(2, 3)) is chase_map
+    assert navigation.chase_map(Point(3, 3)) is not chase_map
+
+
+def test_move_downhill_goes_around_blockers(game_map):
+    orc = monster(Point(2, 1))
+    troll = monster(Point(1, 2))
+    player = monster(Point(2, 3))
+    entities = [orc, troll, player]
+    game_map.navigation.sync(entities)
+
+    # the shortest step onto (1, 2) is taken by the troll, so the orc closes in beside it
+    orc.move_downhill(target=player, entities=entities, game_map=game_map)
+    assert orc.position == Point(1, 1)
+    assert game_map.navigation.cost[2, 1] == 1
+    assert game_map.navigation.cost[1, 1] == 0
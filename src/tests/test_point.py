@@ -0,0 +1,80 @@
+import copy
+import pickle
+
+import numpy as np
+import pytest
+
+import map_objects
+from colors import Colors
+from components import Fighter
+from entity import Entity
+from map_objects.point import Point, PointTable
+from map_objects.point_array import PointArray
+from map_objects.tile import Tile, TileType
+
+
+def test_points_compare_and_hash_by_coordinates():
+    assert Point(2, 3) == Point(x=2, y=3)
+    assert Point(2, 3) != (2, 3)
+    assert {Point(2, 3): "a"}[Point(2, 3)] == "a"
+    assert repr(Point(2, 3)) == "Point(x=2, y=3)"
+    assert list(Point(2, 3)) == [2, 3]
+
+
+def test_points_cannot_be_changed():
+    point = Point(2, 3)
+
+    with pytest.raises(AttributeError):
+        point.x = 1
+    with pytest.raises(AttributeError):
+        del point.y
+    assert point == Point(2, 3)
+
+
+def test_points_survive_pickling_and_copying():
+    point = Point(2, 3)
+
+    assert pickle.loads(pickle.dumps(point)) == point
+    assert copy.copy(point) == point
+    assert copy.deepcopy(point) == point
+
+
+def test_neighbors_come_from_the_offset_table():
+    center = Point(5, 5)
+
+    assert center.all_neighbors == [center.N, center.NE, center.E, center.SE, center.S, center.SW, center.W, center.NW]
+    assert center.direct_neighbors == [center.N, center.E, center.S, center.W]
+
+
+def test_game_objects_have_no_instance_dict():
+    fighter = Fighter(hp=10, defense=1, power=2)
+    entity = Entity(position=Point(1, 1), char="o", color=Colors.WHITE, name="orc", fighter=fighter)
+    tile = Tile(x=1, y=1, label=TileType.FLOOR)
+
+    for game_object in (Point(1, 1), tile, entity, fighter):
+        assert not hasattr(game_object, "__dict__")
+
+
+def test_point_table_shares_one_point_per_cell():
+    points = PointTable(width=4, height=3)
+
+    assert points.get(1, 2) is points.get(1, 2)
+    assert points.get(1, 2) == Point(1, 2)
+    assert points.get(-1, 2) == Point(-1, 2)
+    assert points.get(4, 0) is not points.get(4, 0)
+
+
+def test_point_array_matches_the_scalar_operations():
+    points = PointTable(width=10, height=10)
+    cave = PointArray.from_mask(np.eye(10, dtype=bool)[:4], points=points)
+    center = Point(3, 1)
+
+    assert list(cave) == [Point(0, 0), Point(1, 1), Point(2, 2), Point(3, 3)]
+    assert cave[1] is points.get(1, 1)
+    assert list(cave + Point(1, 0)) == [point + Point(1, 0) for point in cave]
+    assert list(cave - center) == [point - center for point in cave]
+    assert np.allclose(cave.distance_to(center), [point.distance_to(center) for point in cave])
+    assert list(cave.neighbors()) == [neighbor for point in cave for neighbor in point.all_neighbors]
+    assert list(cave.neighbors(direct=True)) == [neighbor for point in cave for neighbor in point.direct_neighbors]
+    assert Point(2, 2) in cave and Point(2, 3) not in cave
+    assert np.array_equal(cave.mask(width=4, height=4), np.eye(4, dtype=bool))
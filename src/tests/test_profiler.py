@@ -0,0 +1,36 @@
+from profiler import Profiler
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler()
+
+    with profiler.phase("turn"):
+        pass
+    profiler.count("frames")
+
+    assert profiler.summary() == {}
+    assert profiler.chrome_trace()["traceEvents"] == []
+
+
+def test_phases_become_summaries_and_trace_events():
+    profiler = Profiler(window=2)
+    profiler.enable()
+
+    @profiler.timed("turn.enemy")
+    def enemy_turn():
+        with profiler.phase("ai.BasicMonster"):
+            pass
+
+    for _ in range(3):
+        enemy_turn()
+
+    summary = profiler.summary()
+    assert summary["turn.enemy"]["count"] == 2
+    assert summary["ai.BasicMonster"]["max_ms"] <= summary["turn.enemy"]["max_ms"]
+
+    counts, edges = profiler.histogram("turn.enemy", bins=4)
+    assert counts.sum() == 2 and len(edges) == 5
+
+    events = profiler.chrome_trace()["traceEvents"]
+    assert [event["name"] for event in events] == ["ai.BasicMonster", "turn.enemy"] * 3
+    assert all(event["ph"] == "X" and event["dur"] >= 0 for event in events)
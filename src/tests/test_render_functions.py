@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+import map_objects
+import render_functions
+from map_objects.game_map import GameMap
+from map_objects.point import Point
+from map_objects.tile import TileType
+from camera import Camera
+from colors import Colors
+from entity import Entity
+from fov_functions import initialize_fov, recompute_fov
+from render_functions import RenderLayer, ScreenBuffer
+
+
+@pytest.fixture
+def game_map() -> GameMap:
+    game_map = GameMap(width=20, height=12)
+    game_map.place_tiles(mask=np.full((20, 12), True), label=TileType.CAVE)
+    game_map.place_tiles(mask=np.pad(np.full((18, 10), True), 1), label=TileType.FLOOR)
+    return game_map
+
+
+@pytest.fixture
+def puts(monkeypatch):
+    calls = []
+    monkeypatch.setattr(render_functions.blt, "put", lambda x, y, c: calls.append((x, y, c)))
+    return calls
+
+
+def test_update_fov_explores_visible_cells(game_map):
+    player = Entity(position=Point(5, 5), char="@", color=Colors.WHITE, name="Player")
+    camera = Camera(player=player, width=8, height=6)
+    camera.center = player.position
+    fov_map = initialize_fov(game_map)
+    recompute_fov(fov_map=fov_map, point=player.position, radius=2)
+
+    game_map.update_fov(fov_map.fov)
+    keys = game_map.view_keys(camera=camera)
+
+    assert keys.shape == (7, 5)
+    x, y = player.position - camera.top_left
+    assert keys[x, y] == TileType.FLOOR.value * 2 + 1
+    assert game_map.is_explored(player.position)
+    assert not game_map.is_explored(Point(19, 11))
+
+
+def test_view_masks_remember_cells_out_of_sight(game_map):
+    player = Entity(position=Point(5, 5), char="@", color=Colors.WHITE, name="Player")
+    camera = Camera(player=player, width=8, height=6)
+    camera.center = player.position
+    fov_map = initialize_fov(game_map)
+    recompute_fov(fov_map=fov_map, point=player.position, radius=2)
+    game_map.update_fov(fov_map.fov)
+
+    recompute_fov(fov_map=fov_map, point=Point(7, 5), radius=2)
+    game_map.update_fov(fov_map.fov)
+    visible, remembered = game_map.view_masks(camera=camera)
+
+    x, y = player.position - camera.top_left
+    assert visible.shape == remembered.shape == (7, 5)
+    assert np.array_equal(visible, game_map.camera_window(fov_map.fov, camera))
+    assert not (visible & remembered).any()
+    assert remembered[x - 2, y]
+    assert not remembered[x, y]
+
+
+def test_screen_buffer_only_redraws_changes(game_map, puts):
+    player = Entity(position=Point(5, 5), char="@", color=Colors.WHITE, name="Player", render_order=RenderLayer.ACTOR)
+    camera = Camera(player=player, width=12, height=10)
+    camera.center = player.position
+    fov_map = initialize_fov(game_map)
+    recompute_fov(fov_map=fov_map, point=player.position, radius=3)
+    game_map.update_fov(fov_map.fov)
+    screen_buffer = ScreenBuffer()
+
+    screen_buffer.draw_map(game_map=game_map, camera=camera)
+    screen_buffer.draw_entities(entities=[player], game_map=game_map, camera=camera)
+    assert len(puts) == np.count_nonzero(screen_buffer.map_keys) + 1
+
+    puts.clear()
+    screen_buffer.draw_map(game_map=game_map, camera=camera)
+    screen_buffer.draw_entities(entities=[player], game_map=game_map, camera=camera)
+    assert puts == []
+
+    player.move(Point(1, 0))
+    screen_buffer.draw_entities(entities=[player], game_map=game_map, camera=camera)
+    assert len(puts) == 1
@@ -0,0 +1,47 @@
+import map_objects
+from action_recorder import ActionRecorder, decode_action, encode_action
+from game import Game
+from headless import ExplorerPolicy, Policy, run
+from map_objects.point import Point
+from replay import load_recording
+from turn_functions import start_play
+
+
+class RecordingPolicy(Policy):
+    def __init__(self, policy: Policy, recorder: ActionRecorder):
+        self.policy = policy
+        self.recorder = recorder
+
+    def next_action(self, game: Game):
+        action, mouse_action = self.policy.next_action(game)
+        self.recorder.record(action=action, mouse_action=mouse_action)
+        return action, mouse_action
+
+
+def test_actions_round_trip():
+    action = {"move": Point(1, -1), "inventory_index": 3, "level_up": "hp"}
+
+    assert decode_action(encode_action(action)) == action
+
+
+def test_replay_reproduces_the_recorded_session(tmp_path):
+    path = str(tmp_path / "session.jsonl")
+
+    game = Game.new_game(seed=1234)
+    game.enter_floor(game.floor_pipeline.generate(seed=1234, dungeon_level=1), prefetch=False)
+    start_play(game)
+    recorder = ActionRecorder(path=path, game=game)
+    recorded = run(game=game, policy=RecordingPolicy(ExplorerPolicy(seed=1), recorder), max_turns=300)
+    recorder.close()
+    game.floor_pipeline.close()
+
+    replayed_game, policy = load_recording(path)
+    replayed = run(game=replayed_game, policy=policy)
+    replayed_game.floor_pipeline.close()
+
+    assert replayed.turns == recorded.turns
+    assert replayed.kills == recorded.kills
+    assert replayed_game.map_generator.dungeon_level == game.map_generator.dungeon_level
+    assert [entity.to_json() for entity in replayed_game.entities] == [
+        entity.to_json() for entity in game.entities
+    ]
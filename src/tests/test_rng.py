@@ -0,0 +1,45 @@
+import json
+import random
+
+import map_objects
+from floor_pipeline import build_floor
+from game import Game
+from rng import RandomStreams
+
+
+def test_streams_round_trip_through_json():
+    rng = RandomStreams(seed=1234)
+    rng.ai.random()
+
+    loaded = RandomStreams.from_json(json_data=json.loads(json.dumps(rng.to_json())))
+
+    assert loaded.seed == 1234
+    assert loaded.states() == rng.states()
+    assert loaded.ai.random() == rng.ai.random()
+
+
+def test_floors_only_depend_on_their_seed():
+    state = random.getstate()
+    first = build_floor(seed=99, dungeon_level=1, width=40, height=30, min_monsters=3)
+    assert random.getstate() == state
+
+    random.random()
+    second = build_floor(seed=99, dungeon_level=1, width=40, height=30, min_monsters=3)
+
+    assert (first[0].game_map.tile_map == second[0].game_map.tile_map).all()
+    assert [entity.to_json() for entity in first[1]] == [entity.to_json() for entity in second[1]]
+    assert first[2] == second[2]
+
+
+def test_saved_games_keep_their_random_streams(tmp_path):
+    game = Game.new_game(seed=1234)
+    game.enter_floor(game.floor_pipeline.generate(seed=1234, dungeon_level=1), prefetch=False)
+    game.start_journal(path=str(tmp_path / "save_game"))
+
+    game.rng.ai.random()
+    game.journal.record_turn(game)
+    game.journal.close()
+
+    loaded = Game.load_game(path=str(tmp_path / "save_game"))
+
+    assert loaded.rng.states() == game.rng.states()
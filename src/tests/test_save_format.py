@@ -0,0 +1,69 @@
+import json
+
+import numpy as np
+import pytest
+
+from game import Game
+from save_format import MANIFEST_FILE
+
+
+def summarize(game: Game):
+    return [entity.to_json() for entity in game.entities]
+
+
+@pytest.fixture
+def game() -> Game:
+    game = Game.new_game(seed=1234)
+    game.enter_floor(game.floor_pipeline.generate(seed=1234, dungeon_level=2), prefetch=False)
+    game.game_map.explore(game.player.position)
+    return game
+
+
+def test_binary_save_round_trip(game, tmp_path):
+    path = str(tmp_path / "save_game")
+    game.save_game(path=path)
+
+    loaded = Game.load_game(path=path)
+
+    assert np.array_equal(loaded.game_map.tile_map, game.game_map.tile_map)
+    assert np.array_equal(loaded.game_map.explored, game.game_map.explored)
+    assert loaded.game_map.dungeon_level == 2
+    assert summarize(loaded) == summarize(game)
+    assert loaded.player.position == game.player.position
+    assert loaded.seed == game.seed
+
+
+def test_json_export_still_loads(game, tmp_path):
+    json_path = str(tmp_path / "save_game.json")
+    game.export_json(path=json_path)
+
+    loaded = Game.load_game(path=str(tmp_path / "missing"), json_path=json_path)
+
+    assert np.array_equal(loaded.game_map.tile_map, game.game_map.tile_map)
+    assert summarize(loaded) == summarize(game)
+
+
+def test_unknown_save_version_is_rejected(game, tmp_path):
+    path = tmp_path / "save_game"
+    game.save_game(path=str(path))
+
+    manifest = json.loads((path / MANIFEST_FILE).read_text())
+    manifest["version"] = 0
+    (path / MANIFEST_FILE).write_text(json.dumps(manifest))
+
+    with pytest.raises(ValueError):
+        Game.load_game(path=str(path))
+
+
+def test_save_moved_aside_is_recovered(game, tmp_path):
+    path = tmp_path / "save_game"
+    game.save_game(path=str(path))
+    path.rename(tmp_path / "save_game.old")
+
+    loaded = Game.load_game(path=str(path))
+
+    assert summarize(loaded) == summarize(game)
+    assert not (tmp_path / "save_game.old").exists()
+
+    game.save_game(path=str(path))
+    assert sorted(entry.name for entry in tmp_path.iterdir()) == ["save_game"]
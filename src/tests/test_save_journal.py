@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+from map_objects.point import Point
+from colors import Colors
+from entity import Entity
+from game import Game
+from game_messages import Message
+from game_states import GameStates
+from headless import ExplorerPolicy
+from save_journal import JOURNAL_FILE
+from turn_functions import start_play, take_turn, update_fov
+
+
+def summarize(game: Game):
+    return [entity.to_json() for entity in game.entities]
+
+
+@pytest.fixture
+def game() -> Game:
+    game = Game.new_game(seed=1234)
+    game.enter_floor(game.floor_pipeline.generate(seed=1234, dungeon_level=1), prefetch=False)
+    return game
+
+
+def play_turn(game: Game):
+    monster = next(entity for entity in game.entities if entity.fighter and entity is not game.player)
+    monster.position = game.player.position
+    monster.fighter.take_damage(3)
+    game.player.fighter.xp += 10
+
+    item = next(entity for entity in game.entities if entity.item)
+    game.entities.remove(item)
+    game.entities.append(Entity(position=Point(2, 2), char="!", color=Colors.VIOLET, name="Potion"))
+
+    game.game_map.explore(Point(1, 1))
+    game.message_log.add_message(Message("Something happened", Colors.YELLOW))
+    game.change_state(GameStates.ENEMY_TURN)
+
+
+def test_journal_replays_onto_the_last_full_save(game, tmp_path):
+    path = str(tmp_path / "save_game")
+    game.start_journal(path=path)
+
+    play_turn(game)
+    game.journal.record_turn(game)
+    game.journal.close()
+
+    loaded = Game.load_game(path=path)
+
+    assert summarize(loaded) == summarize(game)
+    assert loaded.player.to_json() == game.player.to_json()
+    assert np.array_equal(loaded.game_map.explored, game.game_map.explored)
+    assert loaded.message_log.messages == game.message_log.messages
+    assert loaded.game_state == GameStates.ENEMY_TURN
+
+
+def test_unfinished_turn_is_ignored(game, tmp_path):
+    path = tmp_path / "save_game"
+    game.start_journal(path=str(path))
+    before = summarize(game)
+
+    play_turn(game)
+    game.journal.record_turn(game)
+    game.journal.close()
+
+    journal = path / JOURNAL_FILE
+    journal.write_bytes(journal.read_bytes()[:-1])
+
+    assert summarize(Game.load_game(path=str(path))) == before
+
+
+def test_only_changed_entities_are_compared(game, tmp_path, monkeypatch):
+    game.start_journal(path=str(tmp_path / "save_game"))
+    monster = next(entity for entity in game.entities if entity.fighter and entity is not game.player)
+    monster.position = monster.position.E
+
+    serialized = []
+    to_json = Entity.to_json
+    monkeypatch.setattr(Entity, "to_json", lambda entity: serialized.append(entity) or to_json(entity))
+    game.journal.record_turn(game)
+
+    on_map = {entity for entity in serialized if entity in game.entities.slots}
+    assert on_map == {monster, game.player}
+
+
+def test_journal_follows_a_played_game(game, tmp_path):
+    path = str(tmp_path / "save_game")
+    start_play(game)
+    game.start_journal(path=path, compact_every=10 ** 6)
+    policy = ExplorerPolicy(seed=1234)
+
+    for _ in range(150):
+        update_fov(game)
+        game.journal.record_turn(game)
+        next_action = policy.next_action(game)
+        if next_action is None or "take_stairs" in next_action[0] or game.game_state == GameStates.PLAYER_DEAD:
+            break
+        take_turn(game, *next_action)
+    game.journal.close()
+
+    assert game.journal.turns > 0
+    loaded = Game.load_game(path=path)
+
+    assert summarize(loaded) == summarize(game)
+    assert np.array_equal(loaded.game_map.explored, game.game_map.explored)
@@ -2,6 +2,8 @@ import pytest
 
 from map_objects.point import Point
 from map_objects.tile import Tile, TileType
+from colors import Colors
+from palette import PALETTE
 
 
 @pytest.fixture
@@ -51,3 +53,12 @@ def test_tile_from_string(zeros, wall, empty, cave, floor):
     assert empty == Tile.from_string(point=zeros, string="EMPTY")
     assert cave == Tile.from_string(point=zeros, string="CAVE")
     assert floor == Tile.from_string(point=zeros, string="FLOOR")
+
+
+def test_tile_char_and_color(wall, floor):
+    assert wall.char == "#"
+    assert floor.char == "."
+    assert wall.color == PALETTE[Colors.DARK_WALL]
+
+    floor.visible = True
+    assert floor.color == PALETTE[Colors.LIGHT_GROUND]
@@ -0,0 +1,52 @@
+import map_objects
+from colors import Colors
+from components import BasicMonster, Fighter
+from death_functions import kill_monster
+from entity import Entity
+from map_objects import Point
+from turn_scheduler import TurnScheduler
+
+
+def make_monster(name: str, speed: int = 100) -> Entity:
+    return Entity(
+        position=Point(0, 0),
+        char="o",
+        color=Colors.WHITE,
+        name=name,
+        blocks=True,
+        fighter=Fighter(hp=10, defense=0, power=3, speed=speed),
+        ai=BasicMonster(),
+    )
+
+
+def test_only_monsters_are_enrolled():
+    monster = make_monster("orc")
+    potion = Entity(position=Point(1, 1), char="!", color=Colors.WHITE, name="potion")
+
+    scheduler = TurnScheduler([monster, potion])
+
+    assert len(scheduler) == 1
+    assert monster in scheduler
+    assert potion not in scheduler
+
+
+def test_speed_sets_how_often_monsters_act():
+    fast = make_monster("bat", speed=200)
+    normal = make_monster("orc")
+    slow = make_monster("slug", speed=50)
+    scheduler = TurnScheduler([fast, normal, slow])
+
+    turns = [[entity.name for entity in scheduler.due()] for _ in range(2)]
+
+    assert turns == [["bat", "orc", "bat"], ["bat", "slug", "orc", "bat"]]
+
+
+def test_killed_monsters_stop_acting():
+    first = make_monster("orc")
+    second = make_monster("troll")
+    scheduler = TurnScheduler([first, second])
+
+    kill_monster(monster=first, scheduler=scheduler)
+
+    assert first not in scheduler
+    assert list(scheduler.due()) == [second]
@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+from typing import List, Optional, TYPE_CHECKING
+
+from camera import Camera
+from colors import Colors
+from constants import CONSTANTS
+from death_functions import kill_monster, kill_player
+from entity import Entity, get_blocking_entities_at_location
+from fov_functions import initialize_fov
+from game_messages import Message
+from game_states import GameStates
+from map_objects import Point
+from profiler import PROFILER
+from turn_scheduler import TurnScheduler
+
+if TYPE_CHECKING:
+    from game import Game
+
+
+def start_play(game: Game):
+    """ Prepares a new or loaded game for its first turn """
+    game.fov_map = initialize_fov(game.game_map)
+
+    game.game_state = GameStates.PLAYER_TURN
+    game.previous_state = game.game_state
+
+    game.camera = Camera(
+        player=game.player, width=CONSTANTS.camera_width, height=CONSTANTS.camera_height
+    )
+    game.camera.fov_update = True
+    game.targeting_item = None
+    game.scheduler = TurnScheduler(game.entities)
+
+
+def update_fov(game: Game):
+    if game.camera.fov_update:
+        with PROFILER.phase("fov"):
+            game.fov_cache.compute(
+                fov_map=game.fov_map,
+                game_map=game.game_map,
+                point=game.player.position,
+                radius=CONSTANTS.fov_radius,
+                light_walls=CONSTANTS.fov_light_walls,
+                algorithm=CONSTANTS.fov_algorithm,
+            )
+            game.game_map.update_fov(
+                game.fov_map.fov, center=game.player.position, radius=CONSTANTS.fov_radius
+            )
+
+    game.camera.fov_update = False
+
+
+def take_turn(game: Game, action: dict, mouse_action: dict) -> List[dict]:
+    """
+    Applies one player action and, if it used up the turn, lets the monsters act
+
+    action and mouse_action are the dicts returned by the input handlers, so
+    anything that can produce them drives the game the same way.
+
+    Returns the events the game state does not keep: a {"killed": name} for
+    every monster that died and an {"item_used": name} for every item used up.
+    """
+    events: List[dict] = []
+
+    with PROFILER.phase("turn.player"):
+        player_turn(game=game, action=action, mouse_action=mouse_action, events=events)
+
+    if game.game_state == GameStates.ENEMY_TURN:
+        with PROFILER.phase("turn.enemy"):
+            enemy_turn(game=game, events=events)
+
+    return events
+
+
+def player_turn(game: Game, action: dict, mouse_action: dict, events: List[dict]):
+    movement: Optional[Point] = action.get("move")
+    wait: bool = action.get("wait", False)
+    pickup: bool = action.get("pickup", False)
+    show_inventory: bool = action.get("show_inventory", False)
+    drop_inventory: bool = action.get("drop_inventory", False)
+    inventory_index: Optional[int] = action.get("inventory_index")
+    take_stairs: bool = action.get("take_stairs", False)
+    level_up: str = action.get("level_up")
+    show_character_screen: bool = action.get("show_character_screen", False)
+    exit_action: bool = action.get("exit", False)
+
+    left_click: Point = mouse_action.get("left_click")
+    right_click: Point = mouse_action.get("right_click")
+
+    player_turn_results: List = []
+
+    if movement and game.game_state == GameStates.PLAYER_TURN:
+        destination = game.player.position + movement
+
+        if not game.game_map.is_blocked(destination):
+            target = get_blocking_entities_at_location(
+                entities=game.entities, destination=destination
+            )
+
+            if target:
+                attack_results = game.player.fighter.attack(target=target)
+                player_turn_results.extend(attack_results)
+            else:
+                game.player.move(movement)
+                game.camera.recenter()
+
+            game.change_state(GameStates.ENEMY_TURN)
+    elif wait:
+        game.change_state(GameStates.ENEMY_TURN)
+    elif pickup and game.game_state == GameStates.PLAYER_TURN:
+        for entity in game.entities.items_at(game.player.position):
+            pickup_results = game.player.inventory.add_item(entity)
+            player_turn_results.extend(pickup_results)
+
+            break
+        else:
+            game.message_log.add_message(
+                Message("There is nothing here to pick up.")
+            )
+
+    if show_inventory:
+        game.change_state(GameStates.SHOW_INVENTORY)
+
+    if drop_inventory:
+        game.change_state(GameStates.DROP_INVENTORY)
+
+    if (
+        inventory_index is not None
+        and game.previous_state != GameStates.PLAYER_DEAD
+        and inventory_index < len(game.player.inventory.items)
+    ):
+        item = game.player.inventory.items[inventory_index]
+
+        if game.game_state == GameStates.SHOW_INVENTORY:
+            item_use_results = game.player.inventory.use(
+                item, entities=game.entities, fov_map=game.fov_map
+            )
+            if any(result.get("consumed") for result in item_use_results):
+                events.append({"item_used": item.name})
+            player_turn_results.extend(item_use_results)
+        elif game.game_state == GameStates.DROP_INVENTORY:
+            player_turn_results.extend(game.player.inventory.drop_item(item))
+
+    if take_stairs and game.game_state == GameStates.PLAYER_TURN:
+        for entity in game.entities:
+            if entity.stairs and entity.position == game.player.position:
+                game.next_floor()
+                game.fov_map = initialize_fov(game.game_map)
+                game.camera.fov_update = True
+
+                break
+
+        else:
+            game.message_log.add_message(Message("There are no stairs here.", Colors.YELLOW))
+
+    if level_up:
+        if level_up == "hp":
+            game.player.fighter.base_max_hp += 20
+            game.player.fighter.hp += 20
+        elif level_up == "str":
+            game.player.fighter.base_power += 1
+        elif level_up == "dex":
+            game.player.fighter.base_defense += 1
+
+        game.change_state(game.previous_state)
+
+    if show_character_screen:
+        game.change_state(GameStates.CHARACTER_SCREEN)
+
+    if game.game_state == GameStates.TARGETING:
+        if left_click:
+            target_position: Point = game.camera.map_point(left_click)
+
+            item_use_results = game.player.inventory.use(
+                game.targeting_item,
+                entities=game.entities,
+                fov_map=game.fov_map,
+                target_position=target_position,
+            )
+            if any(result.get("consumed") for result in item_use_results):
+                events.append({"item_used": game.targeting_item.name})
+            player_turn_results.extend(item_use_results)
+        elif right_click:
+            player_turn_results.append({"targeting_cancelled": True})
+
+    if exit_action:
+        if game.game_state in (
+            GameStates.SHOW_INVENTORY,
+            GameStates.DROP_INVENTORY,
+            GameStates.CHARACTER_SCREEN
+        ):
+            game.change_state(GameStates.PLAYER_TURN)
+        elif game.game_state == GameStates.TARGETING:
+            player_turn_results.append({"targeting_cancelled": True})
+        else:
+            game.save_game()
+            game.game_running = False
+
+    for player_turn_result in player_turn_results:
+        message: Optional[Message] = player_turn_result.get("message")
+        dead_entity: Optional[Entity] = player_turn_result.get("dead")
+        item_added: Optional[Entity] = player_turn_result.get("item_added")
+        item_consumed: Optional[Entity] = player_turn_result.get("consumed")
+        item_dropped: Optional[Entity] = player_turn_result.get("item_dropped")
+        equip: Optional[Entity] = player_turn_result.get("equip")
+        targeting: Optional[Entity] = player_turn_result.get("targeting")
+        xp: Optional[int] = player_turn_result.get("xp")
+        targeting_cancelled: bool = player_turn_result.get(
+            "targeting_cancelled", False
+        )
+
+        if message:
+            game.message_log.add_message(message)
+
+        if targeting_cancelled:
+            game.game_state = game.previous_state
+
+            game.message_log.add_message(Message("Targeting cancelled"))
+
+        if xp:
+            leveled_up = game.player.level.add_xp(xp=xp)
+            game.message_log.add_message(Message(f"You gain {xp} experience points."))
+
+            if leveled_up:
+                game.message_log.add_message(Message(f"Your battle skills grow stronger! You reached level {game.player.level.current_level}!", Colors.YELLOW))
+                game.change_state(GameStates.LEVEL_UP)
+
+        if dead_entity:
+            if dead_entity == game.player:
+                message = kill_player(player=dead_entity)
+                game.change_state(GameStates.PLAYER_DEAD)
+            else:
+                events.append({"killed": dead_entity.name})
+                message = kill_monster(monster=dead_entity, scheduler=game.scheduler)
+
+            game.message_log.add_message(message)
+
+        if item_added:
+            game.entities.remove(item_added)
+
+            game.change_state(GameStates.ENEMY_TURN)
+            game.camera.fov_update = True
+
+        if item_consumed:
+            game.change_state(GameStates.ENEMY_TURN)
+
+        if targeting:
+            game.change_state(GameStates.TARGETING)
+
+            game.targeting_item = targeting
+
+            game.message_log.add_message(game.targeting_item.item.targeting_message)
+
+        if item_dropped:
+            game.entities.append(item_dropped)
+
+            game.change_state(GameStates.ENEMY_TURN)
+
+        if equip:
+            equip_results = game.player.equipment.toggle_equip(equip)
+
+            for equip_result in equip_results:
+                equipped: Optional[Entity] = equip_result.get("equipped")
+                dequipped: Optional[Entity] = equip_result.get("dequipped")
+
+                if equipped:
+                    game.message_log.add_message(Message(f"You equipped the {equipped.name}"))
+
+                if dequipped:
+                    game.message_log.add_message(Message(f"You dequipped the {dequipped.name}"))
+
+            game.change_state(GameStates.ENEMY_TURN)
+
+
+def enemy_turn(game: Game, events: List[dict]):
+    game.game_map.navigation.sync(game.entities)
+
+    for entity in game.scheduler.due():
+        with PROFILER.phase(f"ai.{type(entity.ai).__name__}"):
+            enemy_turn_results = entity.ai.take_turn(
+                target=game.player,
+                fov_map=game.fov_map,
+                game_map=game.game_map,
+                entities=game.entities,
+                rng=game.rng.ai,
+            )
+
+        for enemy_turn_result in enemy_turn_results:
+            message: Optional[Message] = enemy_turn_result.get(
+                "message"
+            )
+            dead_entity = enemy_turn_result.get("dead")
+
+            if message:
+                game.message_log.add_message(message)
+
+            if dead_entity:
+                if dead_entity == game.player:
+                    message = kill_player(player=dead_entity)
+                    game.change_state(GameStates.PLAYER_DEAD)
+                else:
+                    events.append({"killed": dead_entity.name})
+                    message = kill_monster(monster=dead_entity, scheduler=game.scheduler)
+                game.message_log.add_message(message)
+
+        if game.game_state == GameStates.PLAYER_DEAD:
+            break
+    else:
+        game.change_state(GameStates.PLAYER_TURN)
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import heapq
+from typing import Dict, Iterable, Iterator, List, Optional, TYPE_CHECKING
+
+from components.fighter import NORMAL_SPEED
+
+if TYPE_CHECKING:
+    from entity import Entity
+
+
+# the time one action of the player takes, in scheduler ticks
+TURN_TIME = 100
+
+
+def action_delay(entity: Entity) -> int:
+    """ Returns the ticks between two actions of entity, shorter the faster it is """
+    speed = entity.fighter.speed if entity.fighter else NORMAL_SPEED
+    return max(1, TURN_TIME * NORMAL_SPEED // max(1, speed))
+
+
+class TurnScheduler:
+    """
+    The monsters of a floor, queued by when they act next
+
+    Only entities with an ai are enrolled, so items, corpses and stairs cost
+    nothing during the enemy turn. Every enemy turn moves the clock on by one
+    action of the player and pops the monsters due by then, a fast one possibly
+    more than once. Monsters due at the same time act in the order they were
+    enrolled. Removed monsters are only marked, and dropped when they come up.
+    """
+
+    def __init__(self, entities: Iterable[Entity] = ()):
+        self.time: int = 0
+        self.queue: List[list] = []
+        self.entries: Dict[Entity, list] = {}
+        self.sequence: int = 0
+
+        for entity in entities:
+            if entity.ai:
+                self.add(entity)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, entity: Entity) -> bool:
+        return entity in self.entries
+
+    def add(self, entity: Entity, delay: Optional[int] = None):
+        """ Enrolls entity to act delay ticks from now, or one action from now by default """
+        if entity in self.entries:
+            self.remove(entity)
+
+        if delay is None:
+            delay = action_delay(entity)
+
+        entry = [self.time + delay, self.sequence, entity]
+        self.sequence += 1
+        self.entries[entity] = entry
+        heapq.heappush(self.queue, entry)
+
+    def remove(self, entity: Entity):
+        entry = self.entries.pop(entity, None)
+        if entry is not None:
+            entry[-1] = None
+
+    def due(self) -> Iterator[Entity]:
+        """ Moves the clock on by one turn and yields every monster whose action falls in it """
+        self.time += TURN_TIME
+
+        while self.queue and self.queue[0][0] <= self.time:
+            time, _, entity = heapq.heappop(self.queue)
+            if entity is None:
+                continue
+
+            del self.entries[entity]
+            if not entity.ai:
+                continue
+
+            entry = [time + action_delay(entity), self.sequence, entity]
+            self.sequence += 1
+            self.entries[entity] = entry
+            heapq.heappush(self.queue, entry)
+
+            yield entity